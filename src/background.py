@@ -0,0 +1,109 @@
+"""
+    Solving in a worker thread, so that an interactive front end keeps
+    drawing and handling events while a solve runs.
+"""
+from typing import Dict, List, Optional, Tuple
+import queue
+import threading
+
+from solver import ChristofidesSolver
+
+
+class SolveCancelled(Exception):
+    """
+        Raised in the worker to abandon a solve that has been replaced.
+    """
+
+
+class BackgroundSolver():
+    """
+        Runs the solves of a ChristofidesSolver, one at a time, in a daemon
+        thread. submit hands an instance to the worker and cancels the solve
+        in flight, which stops at its next stage: a thread cannot be
+        interrupted in the middle of a stage, so the worker may be busy a
+        little longer, but nothing it publishes for a replaced solve is ever
+        returned.
+
+        poll never blocks. It returns the partial results of the current
+        solve published since the last call, as (stage, values) pairs (see
+        ChristofidesSolver.solve), followed by ("done", {"result": result})
+        or ("error", {"exception": exception}) when the solve ends.
+    """
+
+    def __init__(self, solver: ChristofidesSolver):
+        self.solver = solver
+        self.generation = 0
+        self.__condition = threading.Condition()
+        self.__pending: Optional[Tuple[int, object]] = None
+        self.__updates: "queue.Queue[Tuple[int, str, Dict]]" = queue.Queue()
+        self.__closed = False
+        self.__busy = False
+        self.__thread = threading.Thread(target=self.__work, daemon=True)
+        self.__thread.start()
+
+    def submit(self, instance) -> int:
+        """
+            Starts solving instance (anything ChristofidesSolver.solve
+            accepts) and returns the generation number of the solve.
+        """
+        with self.__condition:
+            self.generation += 1
+            self.__pending = (self.generation, instance)
+            self.__condition.notify()
+            return self.generation
+
+    def cancel(self):
+        with self.__condition:
+            self.generation += 1
+            self.__pending = None
+
+    def poll(self) -> List[Tuple[str, Dict]]:
+        updates = []
+        while True:
+            try:
+                generation, stage, values = self.__updates.get_nowait()
+            except queue.Empty:
+                return updates
+            if generation == self.generation:
+                updates.append((stage, values))
+
+    def busy(self) -> bool:
+        with self.__condition:
+            return self.__busy or self.__pending is not None
+
+    def close(self):
+        """
+            Cancels the solve in flight and stops the worker.
+        """
+        with self.__condition:
+            self.generation += 1
+            self.__pending = None
+            self.__closed = True
+            self.__condition.notify()
+
+    def __work(self):
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__closed:
+                    self.__condition.wait()
+                if self.__closed:
+                    return
+                generation, instance = self.__pending  # type: ignore
+                self.__pending = None
+                self.__busy = True
+
+            def progress(stage: str, values: Dict):
+                if generation != self.generation:
+                    raise SolveCancelled
+                self.__updates.put((generation, stage, values))
+
+            try:
+                result = self.solver.solve(instance, progress)  # type: ignore
+                self.__updates.put((generation, "done", {"result": result}))
+            except SolveCancelled:
+                pass
+            except Exception as exception:
+                self.__updates.put((generation, "error", {"exception": exception}))
+            finally:
+                with self.__condition:
+                    self.__busy = False
@@ -0,0 +1,198 @@
+"""
+    Christofides over many instances of the same size at once. The instances
+    are stacked in arrays and every stage but the euler cycle runs on the
+    whole stack in vectorized operations, so that thousands of small
+    instances do not each pay for building graph objects.
+"""
+from typing import List, Tuple
+import numpy as np
+
+from euler import EulerCycle
+from utils import shortcut
+
+
+class BatchResult():
+    """
+        The results of a batch of b instances of n vertices, as arrays.
+        tours is (b, n+1), every tour closed by repeating its first vertex,
+        costs is (b,), parents holds the parent of every vertex in its MST
+        (-1 for the root) and mates the vertex matched to every odd degree
+        vertex (-1 for the others), both (b, n).
+    """
+
+    def __init__(
+        self,
+        tours: np.ndarray,
+        costs: np.ndarray,
+        parents: np.ndarray,
+        mates: np.ndarray
+    ):
+        self.tours = tours
+        self.costs = costs
+        self.parents = parents
+        self.mates = mates
+
+    def __len__(self) -> int:
+        return len(self.tours)
+
+
+class BatchChristofidesSolver():
+    """
+        Christofides with a dense Prim MST and the greedy matching, on a
+        stack of instances: (b, n, 2) points, or (b, n, n) cost matrices of
+        complete graphs. Prim adds one vertex to all the trees per step and
+        the greedy matching matches the mutual nearest neighbours of all the
+        instances per round, so both only loop in Python over n, never over
+        b. The batch is cut in chunks whose matrices take about max_memory
+        bytes; np.float32 halves them.
+    """
+
+    def __init__(self, dtype: type = np.float64, max_memory: int = 2**28):
+        self.dtype = dtype
+        self.max_memory = max_memory
+
+    def solve(self, points: np.ndarray) -> BatchResult:
+        """
+            Solves a (b, n, 2) array of euclidean instances.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 3 or points.shape[2] != 2:
+            print(f"ERROR: Expected a (b, n, 2) array of points. Got shape {points.shape}.")
+            raise Exception
+        return self.__solve_chunks(points, batch_distance_matrices)
+
+    def solve_matrices(self, cost_matrices: np.ndarray) -> BatchResult:
+        """
+            Solves a (b, n, n) array of cost matrices of metric complete
+            graphs.
+        """
+        cost_matrices = np.asarray(cost_matrices)
+        if cost_matrices.ndim != 3 or cost_matrices.shape[1] != cost_matrices.shape[2]:
+            print("ERROR: Expected a (b, n, n) array of cost matrices. " +
+                  f"Got shape {cost_matrices.shape}.")
+            raise Exception
+        return self.__solve_chunks(cost_matrices, lambda chunk, dtype: chunk.astype(dtype))
+
+    def __solve_chunks(self, instances: np.ndarray, cost_matrices_of) -> BatchResult:
+        number_of_instances, number_of_vertices = instances.shape[:2]
+        if number_of_vertices < 3:
+            print("ERROR: The instances must have at least three vertices.")
+            raise Exception
+        # The cost matrices, the masked costs of the matching and a temporary.
+        instance_bytes = 3*number_of_vertices**2*np.dtype(self.dtype).itemsize
+        chunk_size = max(1, self.max_memory//instance_bytes)
+        results = []
+        for start in range(0, number_of_instances, chunk_size):
+            cost_matrices = cost_matrices_of(instances[start:start+chunk_size], self.dtype)
+            results.append(self.__solve_chunk(cost_matrices))
+        if not results:
+            return BatchResult(np.zeros((0, number_of_vertices + 1), dtype=np.intp),
+                               np.zeros(0), np.zeros((0, number_of_vertices), dtype=np.intp),
+                               np.zeros((0, number_of_vertices), dtype=np.intp))
+        return BatchResult(*[np.concatenate(arrays) for arrays in zip(*results)])
+
+    def __solve_chunk(self, cost_matrices: np.ndarray) -> Tuple[np.ndarray, ...]:
+        parents = batch_prim(cost_matrices)
+        degrees = batch_tree_degrees(parents)
+        mates = batch_greedy_matching(cost_matrices, degrees % 2 == 1)
+        tours = np.asarray([
+            shortcut(EulerCycle(tree_and_matching_edges(parent, mate)).euler_cycle_iterator())
+            for parent, mate in zip(parents.tolist(), mates.tolist())], dtype=np.intp)
+        rows = np.arange(len(tours))[:, None]
+        costs = cost_matrices[rows, tours[:, :-1], tours[:, 1:]].astype(np.float64).sum(axis=1)
+        return tours, costs, parents, mates
+
+
+def batch_distance_matrices(points: np.ndarray, dtype: type = np.float64) -> np.ndarray:
+    """
+        Returns the (b, n, n) euclidean distance matrices of a (b, n, 2)
+        array of points, in one vectorized pass.
+    """
+    points = np.asarray(points, dtype=dtype)
+    delta = points[:, :, None, 0] - points[:, None, :, 0]
+    distance_matrices = delta*delta
+    np.subtract(points[:, :, None, 1], points[:, None, :, 1], out=delta)
+    delta *= delta
+    distance_matrices += delta
+    np.sqrt(distance_matrices, out=distance_matrices)
+    return distance_matrices
+
+
+def batch_prim(cost_matrices: np.ndarray) -> np.ndarray:
+    """
+        Dense Prim on a (b, n, n) stack of cost matrices of complete graphs,
+        all the trees growing from vertex 0 at once. Returns the (b, n)
+        parents, -1 for the roots.
+    """
+    number_of_instances, number_of_vertices = cost_matrices.shape[:2]
+    rows = np.arange(number_of_instances)
+    in_tree = np.zeros((number_of_instances, number_of_vertices), dtype=bool)
+    key = np.full((number_of_instances, number_of_vertices), np.inf)
+    parent = np.full((number_of_instances, number_of_vertices), -1, dtype=np.intp)
+    u = np.zeros(number_of_instances, dtype=np.intp)
+    for _ in range(number_of_vertices):
+        in_tree[rows, u] = True
+        key[rows, u] = np.inf
+        u_costs = cost_matrices[rows, u]
+        better = (u_costs < key) & ~in_tree
+        key[better] = u_costs[better]
+        parent[better] = np.broadcast_to(u[:, None], better.shape)[better]
+        u = np.argmin(key, axis=1)
+    return parent
+
+
+def batch_tree_degrees(parents: np.ndarray) -> np.ndarray:
+    """
+        Returns the (b, n) degrees of the trees given by their parents.
+    """
+    number_of_instances, number_of_vertices = parents.shape
+    has_parent = parents >= 0
+    degrees = has_parent.astype(np.intp)
+    rows = np.broadcast_to(np.arange(number_of_instances)[:, None], parents.shape)
+    np.add.at(degrees, (rows[has_parent], parents[has_parent]), 1)
+    return degrees
+
+
+def batch_greedy_matching(cost_matrices: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """
+        Greedy perfect matching of the vertices selected by the (b, n)
+        boolean mask of every instance, by mutual nearest neighbours in
+        rounds as greedy_matching, all the instances in the same rounds.
+        Returns the (b, n) mates, -1 for the vertices not selected.
+    """
+    number_of_instances, number_of_vertices = vertices.shape
+    if np.any(vertices.sum(axis=1) % 2 != 0):
+        print("ERROR: A perfect matching needs an even number of vertices.")
+        raise Exception
+    mate = np.full((number_of_instances, number_of_vertices), -1, dtype=np.intp)
+    unmatched = vertices.copy()
+    identity = np.arange(number_of_vertices)
+    costs = np.empty(cost_matrices.shape, dtype=cost_matrices.dtype)
+    while unmatched.any():
+        costs.fill(np.inf)
+        both = unmatched[:, :, None] & unmatched[:, None, :]
+        np.copyto(costs, cost_matrices, where=both)
+        costs[:, identity, identity] = np.inf
+        nearest = np.argmin(costs, axis=2)
+        mutual = unmatched & (np.take_along_axis(nearest, nearest, axis=1) == identity)
+        mate[mutual] = nearest[mutual]
+        unmatched &= ~mutual
+        # Ties can leave an instance without mutual nearest neighbours; its
+        # cheapest pair is matched instead.
+        stuck = np.flatnonzero(unmatched.any(axis=1) & ~mutual.any(axis=1))
+        if len(stuck) > 0:
+            v, w = np.divmod(np.argmin(costs[stuck].reshape(len(stuck), -1), axis=1),
+                             number_of_vertices)
+            mate[stuck, v], mate[stuck, w] = w, v
+            unmatched[stuck, v], unmatched[stuck, w] = False, False
+    return mate
+
+
+def tree_and_matching_edges(parent: List[int], mate: List[int]) -> List[Tuple[int, int]]:
+    """
+        The edges of the euler multigraph of one instance: the tree edges
+        and every matched pair once.
+    """
+    edges = [(v, p) for v, p in enumerate(parent) if p >= 0]
+    edges += [(v, w) for v, w in enumerate(mate) if v < w]
+    return edges
@@ -0,0 +1,282 @@
+"""
+    Benchmarks of every pipeline stage and of the end-to-end solve on seeded
+    uniform, clustered and grid instances. Each stage only runs up to the
+    size where it is still feasible. The report is JSON and can be compared
+    against a saved baseline; regressions make the command exit with 1.
+
+    Example, from the src directory:
+        python benchmark.py --sizes 10 100 1000 --output baseline.json
+        python benchmark.py --sizes 10 100 1000 --baseline baseline.json
+"""
+from typing import Callable, Dict, List, Tuple
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from graph import EuclideanCompleteWeightedGraph
+from kruskal import Kruskal
+from mst import MinimumSpanningTree
+from mwpm import MinimumWeightPerfectMatching
+from euler import EulerCycle
+from lower_bound_1_tree import LowerBound1Tree
+from solver import ChristofidesSolver, odd_degree_vertices_of
+from partition import PartitionedChristofides
+from utils import remove_edge_pairs
+from instances import generators
+
+
+class BenchmarkInstance():
+    """
+        One instance and the intermediate results the stages depend on,
+        computed on first use and outside of the measurements.
+    """
+
+    def __init__(self, points: np.ndarray):
+        self.points = points
+        self.__minimum_spanning_tree = None
+        self.__odd_degree_vertices = None
+        self.__matching = None
+
+    def graph(self) -> EuclideanCompleteWeightedGraph:
+        # A fresh graph, so that no stage reuses a matrix computed by another.
+        return EuclideanCompleteWeightedGraph([(x, y) for x, y in self.points.tolist()])
+
+    def minimum_spanning_tree(self):
+        if self.__minimum_spanning_tree is None:
+            self.__minimum_spanning_tree = \
+                MinimumSpanningTree(self.graph()).minimum_spanning_tree()
+        return self.__minimum_spanning_tree
+
+    def odd_degree_vertices(self):
+        if self.__odd_degree_vertices is None:
+            self.__odd_degree_vertices = odd_degree_vertices_of(
+                len(self.points), self.minimum_spanning_tree())
+        return self.__odd_degree_vertices
+
+    def odd_graph(self) -> EuclideanCompleteWeightedGraph:
+        return self.graph().induced_graph(self.odd_degree_vertices())
+
+    def euler_edges(self) -> List[Tuple[int, int]]:
+        if self.__matching is None:
+            odd = self.odd_degree_vertices()
+            matching = MinimumWeightPerfectMatching(
+                self.odd_graph(), "kdtree_greedy").minimum_weight_perfect_matching()
+            self.__matching = [(odd[v], odd[w]) for v, w in matching]
+        return list(remove_edge_pairs(self.minimum_spanning_tree())) + self.__matching
+
+
+def _graph(instance: BenchmarkInstance):
+    return lambda: instance.graph().distance_matrix, None
+
+
+def _kruskal(instance: BenchmarkInstance):
+    graph = instance.graph()
+    graph.distance_matrix
+    return lambda: Kruskal(graph).minimum_spanning_tree(), (lambda tree: graph.cost(tree)/2)
+
+
+def _mst(method: str):
+    def setup(instance: BenchmarkInstance):
+        graph = instance.graph()
+        if method == "prim":
+            graph.distance_matrix
+        return lambda: MinimumSpanningTree(graph, method).minimum_spanning_tree(), \
+            (lambda tree: graph.cost(tree)/2)
+    return setup
+
+
+def _matching(method: str):
+    def setup(instance: BenchmarkInstance):
+        graph = instance.odd_graph()
+        if not method.startswith("kdtree"):
+            graph.distance_matrix
+        return lambda: MinimumWeightPerfectMatching(
+            graph, method).minimum_weight_perfect_matching(), \
+            (lambda matching: graph.cost(matching))
+    return setup
+
+
+def _euler(instance: BenchmarkInstance):
+    edges = instance.euler_edges()
+    return lambda: EulerCycle(edges).euler_cycle(), None
+
+
+def _lower_bound(instance: BenchmarkInstance):
+    graph = instance.graph()
+    tree = instance.minimum_spanning_tree()
+    graph.distance_matrix
+    return lambda: LowerBound1Tree(graph, tree).get_maximum_1_tree(), (lambda result: result[1])
+
+
+def _held_karp(instance: BenchmarkInstance):
+    graph = instance.graph()
+    tree = instance.minimum_spanning_tree()
+    graph.distance_matrix
+    return lambda: LowerBound1Tree(graph, tree).held_karp_bound(max_iterations=100), \
+        (lambda result: result[1])
+
+
+def _solve(instance: BenchmarkInstance):
+    number_of_vertices = len(instance.points)
+    solver = ChristofidesSolver(
+        matching_method="blossom" if number_of_vertices <= 200 else "kdtree_greedy",
+        lower_bound="1-tree" if number_of_vertices <= 2000 else None)
+    points = instance.points
+    return lambda: solver.solve(points), \
+        (lambda result: result.ratio if result.ratio is not None else result.cost)
+
+
+def _partitioned(instance: BenchmarkInstance):
+    solver = PartitionedChristofides()
+    points = instance.points
+    return lambda: solver.solve(points), (lambda result: result.cost)
+
+
+# Stage name -> (setup, largest feasible n). A setup prepares the inputs and
+# returns the function to measure plus an optional quality function of its result.
+stages: Dict[str, Tuple[Callable, int]] = {
+    "graph": (_graph, 5000),
+    "kruskal": (_kruskal, 1000),
+    "mst_delaunay": (_mst("delaunay"), 100000),
+    "mst_knn": (_mst("knn"), 100000),
+    "mst_prim": (_mst("prim"), 5000),
+    "matching_blossom": (_matching("blossom"), 300),
+    "matching_greedy": (_matching("greedy"), 5000),
+    "matching_greedy_2opt": (_matching("greedy_2opt"), 5000),
+    "matching_kdtree_greedy": (_matching("kdtree_greedy"), 100000),
+    "euler": (_euler, 100000),
+    "lower_bound_1_tree": (_lower_bound, 2000),
+    "lower_bound_held_karp": (_held_karp, 500),
+    "solve": (_solve, 100000),
+    "solve_partitioned": (_partitioned, 1000000),
+}
+
+
+def measure(function: Callable, repeat: int) -> Tuple[float, int, object]:
+    """
+        Returns the best wall time over repeat runs, the peak memory of one
+        extra traced run, and the result of the function.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak_memory, result
+
+
+def run_benchmarks(
+    sizes: List[int],
+    distributions: List[str],
+    stage_names: List[str],
+    repeat: int = 3,
+    seed: int = 0,
+    verbose: bool = True
+) -> Dict:
+    results = []
+    for distribution in distributions:
+        for number_of_vertices in sizes:
+            instance = BenchmarkInstance(
+                generators[distribution](number_of_vertices, seed))
+            for stage in stage_names:
+                setup, max_size = stages[stage]
+                if number_of_vertices > max_size:
+                    continue
+                function, quality = setup(instance)
+                seconds, peak_memory, result = measure(function, repeat)
+                entry = {"distribution": distribution, "n": number_of_vertices,
+                         "stage": stage, "time": seconds, "peak_memory": peak_memory,
+                         "quality": None if quality is None else float(quality(result))}
+                results.append(entry)
+                if verbose:
+                    print(f"{distribution:<10}{number_of_vertices:>8} {stage:<24}"
+                          f"{seconds:>10.4f} s{peak_memory/2**20:>10.2f} MiB", file=sys.stderr)
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    report: Dict,
+    baseline: Dict,
+    time_tolerance: float = 1.25,
+    quality_tolerance: float = 1e-6,
+    minimum_time_difference: float = 1e-3
+) -> List[str]:
+    """
+        Returns the regressions of report against baseline: entries that got
+        slower than time_tolerance times the baseline (and by more than
+        minimum_time_difference seconds, to ignore noise), or whose quality (a
+        cost or a ratio, lower is better; a bound for lower bounds, higher is
+        better) got worse by more than quality_tolerance relatively.
+    """
+    baseline_entries = {(e["distribution"], e["n"], e["stage"]): e for e in baseline["results"]}
+    regressions = []
+    for entry in report["results"]:
+        key = (entry["distribution"], entry["n"], entry["stage"])
+        if key not in baseline_entries:
+            continue
+        old = baseline_entries[key]
+        if entry["time"] > time_tolerance*old["time"] and \
+           entry["time"] - old["time"] > minimum_time_difference:
+            regressions.append(f"{key}: time {old['time']:.4f} s -> {entry['time']:.4f} s")
+        if entry["quality"] is None or old["quality"] is None:
+            continue
+        sign = -1 if entry["stage"].startswith("lower_bound") else 1
+        if sign*(entry["quality"] - old["quality"]) > quality_tolerance*abs(old["quality"]):
+            regressions.append(f"{key}: quality {old['quality']} -> {entry['quality']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--distributions", nargs="+", default=list(generators.keys()),
+                        choices=list(generators.keys()))
+    parser.add_argument("--stages", nargs="+", default=list(stages.keys()),
+                        choices=list(stages.keys()))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="where to save the JSON report")
+    parser.add_argument("--baseline", default=None, help="JSON report to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=1.25)
+    arguments = parser.parse_args()
+    report = run_benchmarks(arguments.sizes, arguments.distributions, arguments.stages,
+                            arguments.repeat, arguments.seed)
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(report, output_file, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), arguments.time_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+    Compact binary files of instances: the coordinates of the points, a
+    precomputed distance matrix and a tour, each optional, stored as raw
+    arrays behind a small JSON header. Loading memory maps the arrays, so
+    opening a large instance neither parses text nor creates a Python
+    object per element, and the pages of a distance matrix are only read
+    from disk when the solver touches them.
+
+    The header also records how the costs relate to the points: plain
+    euclidean distances, or one of the TSPLIB coordinate types, whose
+    rounded or great circle distances are not euclidean.
+
+    Layout: the 8 bytes magic, the length of the header as a little endian
+    uint64, the UTF-8 JSON header {"edge_weight_type": type, "arrays":
+    {name: {"dtype", "shape", "offset"}}}, then every array in C order at
+    its offset, aligned to 64 bytes.
+"""
+from typing import Dict, List, Optional
+import json
+import numpy as np
+
+from graph import CompleteWeightedGraph, EuclideanCompleteWeightedGraph
+from tsplib import TsplibInstance
+
+magic = b"TSPARRS1"
+alignment = 64
+edge_weight_types = ["EUCLIDEAN"] + TsplibInstance.edge_weight_types
+
+
+class BinaryInstance():
+    """
+        The arrays of a binary file, None when absent: points (n, 2),
+        distance_matrix (n, n) and tour, a closed list of vertices. They
+        are read-only memory maps unless the file was loaded with
+        mmap=False. edge_weight_type is "EUCLIDEAN" when the costs are the
+        euclidean distances between the points, otherwise the TSPLIB type
+        of the instance.
+    """
+
+    def __init__(
+        self,
+        points: Optional[np.ndarray] = None,
+        distance_matrix: Optional[np.ndarray] = None,
+        tour: Optional[np.ndarray] = None,
+        edge_weight_type: str = "EUCLIDEAN"
+    ):
+        self.edge_weight_type = edge_weight_type
+        self.points = points
+        self.distance_matrix = distance_matrix
+        self.tour = tour
+
+    @property
+    def number_of_vertices(self) -> int:
+        if self.points is not None:
+            return len(self.points)
+        if self.distance_matrix is not None:
+            return len(self.distance_matrix)
+        return max(len(self.tour) - 1, 0) if self.tour is not None else 0
+
+    def graph(self) -> CompleteWeightedGraph:
+        """
+            The graph of the instance, over the mapped arrays. Euclidean
+            points give a euclidean graph, that uses the stored distance
+            matrix if any. Every other instance gets a complete graph over
+            its distance matrix, computed from the points of TSPLIB
+            coordinate types if it was not stored, so that no stage
+            measures planar distances that are not the costs.
+        """
+        if self.points is not None and self.edge_weight_type == "EUCLIDEAN":
+            if self.distance_matrix is None:
+                return EuclideanCompleteWeightedGraph(self.points)
+            return EuclideanCompleteWeightedGraph(self.points, self.distance_matrix.dtype.type,
+                                                  self.distance_matrix)
+        if self.distance_matrix is not None:
+            return CompleteWeightedGraph(self.distance_matrix)
+        if self.points is None or self.edge_weight_type == "EXPLICIT":
+            print("ERROR: The file holds neither points nor a distance matrix.")
+            raise Exception
+        return TsplibInstance("", self.edge_weight_type, points=self.points).graph()
+
+
+def write_binary(
+    path: str,
+    points: Optional[np.ndarray] = None,
+    distance_matrix: Optional[np.ndarray] = None,
+    tour: Optional[List[int]] = None,
+    edge_weight_type: str = "EUCLIDEAN"
+):
+    """
+        Writes the given arrays. Points are stored as float64, the distance
+        matrix in its own floating dtype (float32 halves the file) and the
+        tour as int32, or int64 for more than 2^31 vertices. The points of
+        a TSPLIB instance are written with its edge_weight_type.
+    """
+    if edge_weight_type not in edge_weight_types:
+        print(f"ERROR: Unknown edge weight type {edge_weight_type}. " +
+              f"Expected one of {edge_weight_types}.")
+        raise Exception
+    arrays: Dict[str, np.ndarray] = {}
+    if points is not None:
+        arrays["points"] = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+    if distance_matrix is not None:
+        distance_matrix = np.asarray(distance_matrix)
+        if distance_matrix.ndim != 2 or distance_matrix.shape[0] != distance_matrix.shape[1]:
+            print(f"ERROR: Distance matrix must be square. Got shape {distance_matrix.shape}.")
+            raise Exception
+        if distance_matrix.dtype.kind != "f":
+            distance_matrix = distance_matrix.astype(np.float64)
+        arrays["distance_matrix"] = np.ascontiguousarray(distance_matrix)
+    if points is not None and distance_matrix is not None and \
+       len(arrays["points"]) != len(arrays["distance_matrix"]):
+        print("ERROR: The points and the distance matrix have different sizes.")
+        raise Exception
+    if tour is not None:
+        tour_array = np.asarray(tour, dtype=np.int64).reshape(-1)
+        if len(tour_array) == 0 or tour_array.max() < 2**31:
+            tour_array = tour_array.astype(np.int32)
+        arrays["tour"] = tour_array
+    entries: Dict[str, Dict] = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes//alignment)*alignment
+    # The offsets count from the start of the data, which begins after the
+    # header padded to the alignment.
+    encoded = json.dumps({"edge_weight_type": edge_weight_type, "arrays": entries}).encode("utf-8")
+    data_start = -(-(len(magic) + 8 + len(encoded))//alignment)*alignment
+    with open(path, "wb") as binary_file:
+        binary_file.write(magic)
+        binary_file.write(np.array(data_start - len(magic) - 8, dtype="<u8").tobytes())
+        binary_file.write(encoded.ljust(data_start - len(magic) - 8))
+        for name, array in arrays.items():
+            binary_file.seek(data_start + entries[name]["offset"])
+            binary_file.write(array.tobytes())
+        binary_file.truncate(data_start + offset)
+
+
+def read_binary(path: str, mmap: bool = True) -> BinaryInstance:
+    """
+        Loads a file written by write_binary, as read-only memory maps or,
+        with mmap=False, as arrays in memory.
+    """
+    with open(path, "rb") as binary_file:
+        if binary_file.read(len(magic)) != magic:
+            print(f"ERROR: {path} is not a binary instance file.")
+            raise Exception
+        header_length = int(np.frombuffer(binary_file.read(8), dtype="<u8")[0])
+        header = json.loads(binary_file.read(header_length).decode("utf-8"))
+    data_start = len(magic) + 8 + header_length
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        if 0 in shape:
+            array = np.zeros(shape, dtype=entry["dtype"])
+        else:
+            array = np.memmap(path, dtype=entry["dtype"], mode="r",
+                              offset=data_start + entry["offset"], shape=shape)
+            if not mmap:
+                array = np.array(array)
+        arrays[name] = array
+    return BinaryInstance(arrays.get("points"), arrays.get("distance_matrix"), arrays.get("tour"),
+                          header["edge_weight_type"])
@@ -0,0 +1,172 @@
+"""
+    Memoization of solves. Instances are keyed by a canonical fingerprint
+    that is equal for translated and reordered copies of the same instance,
+    and the cached artifacts are stored in the canonical numbering of the
+    vertices, so they can be mapped back to any copy.
+"""
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import numpy as np
+
+from graph import WeightedGraph, EuclideanCompleteWeightedGraph, SparseWeightedGraph
+
+
+class Fingerprint():
+    """
+        Canonical fingerprint of an instance. Euclidean graphs are moved so
+        that their lowest coordinates are 0, rounded to decimals and sorted,
+        so translated and reordered copies get the same digest. Other
+        graphs have their vertices sorted by their rounded rows of costs;
+        vertices with identical rows can make reordered copies miss the
+        cache. Sparse graphs are taken as they are, with rounded weights.
+
+        Instances are only told apart up to the rounding: coordinates or
+        costs that differ by less than about 10^-decimals get the same
+        digest and share cache entries. decimals is part of the digest, so
+        fingerprints taken with different roundings never match.
+
+        order[i] is the vertice of the instance at canonical position i, and
+        position[v] is the canonical position of the vertice v.
+    """
+
+    def __init__(self, graph: WeightedGraph, decimals: int = 6):
+        number_of_vertices = graph.number_of_vertices
+        # The kind of storage rather than the class, which differs between a
+        # graph and its views.
+        if isinstance(graph, EuclideanCompleteWeightedGraph):
+            kind = "euclidean"
+        elif isinstance(graph, SparseWeightedGraph):
+            kind = "sparse"
+        else:
+            kind = "dense"
+        digest = hashlib.sha256()
+        digest.update(f"{kind}:{number_of_vertices}:{decimals}:".encode())
+        if kind == "euclidean":
+            points = graph.points - graph.points.min(axis=0) if number_of_vertices > 0 \
+                else graph.points
+            points = np.round(points, decimals) + 0.0
+            self.order = np.lexsort((points[:, 1], points[:, 0]))
+            digest.update(np.ascontiguousarray(points[self.order]).tobytes())
+            digest.update(str(np.dtype(graph.dtype)).encode())
+        elif kind == "sparse":
+            self.order = np.arange(number_of_vertices)
+            digest.update(graph.indptr.astype(np.int64).tobytes())
+            digest.update(graph.indices.astype(np.int64).tobytes())
+            digest.update((np.round(graph.weights, decimals) + 0.0).tobytes())
+        else:
+            costs = np.round(np.asarray(graph.cost_matrix(), dtype=np.float64), decimals) + 0.0
+            rows = np.sort(costs, axis=1)
+            self.order = np.lexsort(rows.T[::-1]) if number_of_vertices > 0 \
+                else np.arange(0)
+            digest.update(np.ascontiguousarray(costs[np.ix_(self.order, self.order)]).tobytes())
+        self.position = np.empty(number_of_vertices, dtype=np.intp)
+        self.position[self.order] = np.arange(number_of_vertices)
+        self.digest = digest.hexdigest()
+
+    def canonical_vertices(self, vertices: Iterable[int]) -> List[int]:
+        return self.position[np.asarray(list(vertices), dtype=np.intp)].tolist()
+
+    def instance_vertices(self, vertices: Iterable[int]) -> List[int]:
+        return self.order[np.asarray(list(vertices), dtype=np.intp)].tolist()
+
+    def canonical_edges(self, edges: Iterable[Tuple[int, int]]) -> np.ndarray:
+        edge_array = np.asarray(list(edges), dtype=np.intp).reshape(-1, 2)
+        return self.position[edge_array]
+
+    def instance_edges(self, edge_array: np.ndarray) -> List[Tuple[int, int]]:
+        return [(v, w) for v, w in self.order[edge_array].tolist()]
+
+
+class SolveCache():
+    """
+        Least recently used cache of solve artifacts, bounded by a number
+        of entries and optionally by the total size of the pickled entries
+        in bytes. With a directory, every entry is also written there and
+        entries missing from memory are looked up on disk, so the cache
+        survives restarts; the directory is never pruned. Entries are
+        pickled, so only point it at a trusted directory.
+
+        Instances are keyed by their Fingerprint with coordinates and costs
+        rounded to decimals, so instances closer than that share entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: Optional[int] = None,
+        directory: Optional[str] = None,
+        decimals: int = 6
+    ):
+        if max_entries < 1:
+            print("ERROR: The cache must hold at least one entry.")
+            raise Exception
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.entries: "OrderedDict[str, Tuple[object, int]]" = OrderedDict()
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        name = self.__name(key)
+        if name in self.entries:
+            self.entries.move_to_end(name)
+            self.hits += 1
+            return self.entries[name][0]
+        if self.directory is not None and os.path.exists(self.__path(name)):
+            with open(self.__path(name), "rb") as entry_file:
+                payload = entry_file.read()
+            value = pickle.loads(payload)
+            self.__insert(name, value, len(payload))
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: object):
+        name = self.__name(key)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.directory is not None:
+            temporary_path = self.__path(name) + f".{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as entry_file:
+                entry_file.write(payload)
+            os.replace(temporary_path, self.__path(name))
+        self.__insert(name, value, len(payload))
+
+    def clear(self):
+        """
+            Empties the memory; the directory is left untouched.
+        """
+        self.entries.clear()
+        self.size_in_bytes = 0
+
+    def statistics(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "bytes": self.size_in_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __insert(self, name: str, value: object, size: int):
+        if name in self.entries:
+            self.size_in_bytes -= self.entries.pop(name)[1]
+        self.entries[name] = (value, size)
+        self.size_in_bytes += size
+        while len(self.entries) > self.max_entries or \
+                (self.max_bytes is not None and self.size_in_bytes > self.max_bytes
+                 and len(self.entries) > 1):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size_in_bytes -= evicted_size
+
+    def __name(self, key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.directory, name + ".pickle")  # type: ignore
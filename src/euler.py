@@ -1,4 +1,5 @@
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from collections import defaultdict
 
 
 class EulerCycle():
@@ -6,23 +7,42 @@ class EulerCycle():
         self.number_of_vertices = 0
         self.edges = [e for e in edges]
 
-    def euler_cycle(self):
-        edges = [e for e in self.edges]
-        root = self.edges[0][0]
-        path: List[int] = []
-        path = self.__dfs(root, edges, path)
+    def euler_cycle(self) -> List[int]:
+        path = list(self.euler_cycle_iterator())
+        path.reverse()
         return path
 
-    def __dfs(self, u, edges, path):
-        u_edges = self.find_edges(u, edges)
-        while u_edges != []:
-            edge_to_follow = u_edges.pop()
-            edges.remove(edge_to_follow)
-            next_vertice = edge_to_follow[0] if edge_to_follow[1] == u else edge_to_follow[1]
-            path = self.__dfs(next_vertice, edges, path)
-            u_edges = self.find_edges(u, edges)
-        path.insert(0, u)
-        return path
-
-    def find_edges(self, u: int, edges: List[Tuple[int, int]]):
-        return [e for e in edges if (u in [e[0], e[1]])]
+    def euler_cycle_iterator(
+        self,
+        root=None,
+        edge_order: Optional[Sequence[int]] = None
+    ) -> Iterator[int]:
+        """
+            Iterative Hierholzer in O(V+E). Yields the vertices of the euler
+            cycle as soon as they are closed, so that the cycle can be
+            consumed as a stream. The vertices come out in the reverse order
+            of euler_cycle(), which is also an euler cycle. The walk starts at
+            root, and edge_order (a permutation of the edge indexes) changes
+            the order in which the edges out of every vertex are followed;
+            different choices give different cycles.
+        """
+        if self.edges == []:
+            return
+        adjacency: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for i in (range(len(self.edges)) if edge_order is None else edge_order):
+            v, w = self.edges[i]
+            adjacency[v].append((w, i))
+            adjacency[w].append((v, i))
+        used = [False for _ in self.edges]
+        stack = [self.edges[0][0] if root is None else root]
+        while stack:
+            u = stack[-1]
+            u_edges = adjacency[u]
+            while u_edges and used[u_edges[-1][1]]:
+                u_edges.pop()
+            if u_edges:
+                next_vertice, i = u_edges.pop()
+                used[i] = True
+                stack.append(next_vertice)
+            else:
+                yield stack.pop()
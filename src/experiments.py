@@ -0,0 +1,297 @@
+"""
+    Batch experiments for the approximation ratio of Christofides against a
+    lower bound, and against the optimum for instances small enough to be
+    solved exactly with Held-Karp. Random instances are generated from
+    reproducible seeds, solved across a process pool and streamed to a CSV
+    or JSONL file while running statistics are kept, so the number of
+    instances is only limited by time.
+
+    Example, from the src directory:
+        python experiments.py --sizes 12 50 100 --instances 10000 --output ratios.csv
+        python experiments.py --sizes 8 12 16 --instances 1000 --exact 16
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import time
+import numpy as np
+
+from graph import RandomEuclideanCompleteWeightedGraph
+from solver import ChristofidesSolver
+from held_karp import HeldKarp
+from mwpm import MinimumWeightPerfectMatching
+
+
+class P2Quantile():
+    """
+        Streaming estimate of one quantile with the P² algorithm of Jain and
+        Chlamtac: five markers are kept, whatever the number of observations.
+    """
+
+    def __init__(self, quantile: float):
+        self.quantile = quantile
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2*quantile, 1 + 4*quantile, 3 + 2*quantile, 5.0]
+        self.increments = [0.0, quantile/2, quantile, (1 + quantile)/2, 1.0]
+
+    def add(self, value: float):
+        if len(self.heights) < 5:
+            self.heights.append(value)
+            self.heights.sort()
+            return
+        heights, positions = self.heights, self.positions
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k+1]:
+                k += 1
+        for i in range(k+1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in range(1, 4):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i+1] - positions[i] > 1) or \
+               (d <= -1 and positions[i-1] - positions[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self.__parabolic(i, step)
+                if not heights[i-1] < height < heights[i+1]:
+                    height = heights[i] + step*(heights[i+step] - heights[i]) / \
+                        (positions[i+step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def __parabolic(self, i: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[i] + step/(positions[i+1] - positions[i-1]) * (
+            (positions[i] - positions[i-1] + step)*(heights[i+1] - heights[i]) /
+            (positions[i+1] - positions[i]) +
+            (positions[i+1] - positions[i] - step)*(heights[i] - heights[i-1]) /
+            (positions[i] - positions[i-1]))
+
+    def value(self) -> float:
+        if len(self.heights) == 0:
+            return math.nan
+        if len(self.heights) < 5:
+            index = min(int(self.quantile*len(self.heights)), len(self.heights) - 1)
+            return self.heights[index]
+        return self.heights[2]
+
+
+class RunningStatistics():
+    """
+        Count, mean, variance (Welford), minimum, maximum and streaming
+        quantiles of a sequence of values.
+    """
+
+    def __init__(self, quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95)):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.quantiles = [P2Quantile(q) for q in quantiles]
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta/self.count
+        self.m2 += delta*(value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        for quantile in self.quantiles:
+            quantile.add(value)
+
+    def variance(self) -> float:
+        return self.m2/(self.count - 1) if self.count > 1 else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        summary = {"count": self.count, "mean": self.mean, "variance": self.variance(),
+                   "min": self.minimum, "max": self.maximum}
+        for quantile in self.quantiles:
+            summary[f"q{quantile.quantile:g}"] = quantile.value()
+        return summary
+
+
+def instance_seed(base_seed: int, index: int) -> int:
+    """
+        Seed of the index-th instance of an experiment, independent of the
+        number of processes and of the order in which instances are solved.
+    """
+    return int(np.random.SeedSequence([base_seed, index]).generate_state(1)[0])
+
+
+def solve_instance(task: Tuple[int, int, int, Dict, int]) -> Dict:
+    """
+        Worker: generates and solves one random instance. task is
+        (index, number_of_vertices, seed, solver keyword arguments,
+        exact_max_vertices). With exact_max_vertices > 0 the row also has
+        the optimum, the true ratio cost/optimum and the relative gap of
+        the bound (optimum - bound)/optimum, all None for instances of more
+        than exact_max_vertices vertices.
+    """
+    index, number_of_vertices, seed, solver_arguments, exact_max_vertices = task
+    start = time.perf_counter()
+    graph = RandomEuclideanCompleteWeightedGraph(number_of_vertices, seed=seed)
+    graph_time = time.perf_counter() - start
+    result = ChristofidesSolver(**solver_arguments).solve(graph)
+    row = {"index": index, "seed": seed, "n": number_of_vertices,
+           "cost": result.cost, "bound": result.bound, "ratio": result.ratio}
+    for stage, seconds in result.timings.items():
+        row[f"time_{stage}"] = seconds
+    row["time_graph"] = graph_time
+    if exact_max_vertices > 0:
+        row.update({"optimum": None, "true_ratio": None, "bound_gap": None, "time_exact": None})
+        if number_of_vertices <= exact_max_vertices:
+            start = time.perf_counter()
+            _, optimum = HeldKarp(graph).solve()
+            row["time_exact"] = time.perf_counter() - start
+            row["optimum"] = optimum
+            row["true_ratio"] = result.cost/optimum if optimum > 0 else None
+            if result.bound is not None and optimum > 0:
+                row["bound_gap"] = (optimum - result.bound)/optimum
+    return row
+
+
+class BatchExperiment():
+    """
+        Solves instances_per_size random instances for every size in sizes
+        and streams one row per instance to output (".csv" or ".jsonl").
+        Rows come in completion order; the index column identifies them.
+        Instances of at most exact_max_vertices vertices are also solved
+        exactly, and the true ratios and bound gaps get their own
+        statistics.
+    """
+
+    def __init__(
+        self,
+        sizes: List[int],
+        instances_per_size: int,
+        output: Optional[str] = None,
+        base_seed: int = 0,
+        processes: Optional[int] = None,
+        solver_arguments: Optional[Dict] = None,
+        block_size: int = 10000,
+        exact_max_vertices: int = 0
+    ):
+        self.sizes = sizes
+        self.instances_per_size = instances_per_size
+        self.output = output
+        self.base_seed = base_seed
+        self.processes = processes or os.cpu_count() or 1
+        self.solver_arguments = solver_arguments or {}
+        self.block_size = block_size
+        self.exact_max_vertices = exact_max_vertices
+        self.ratio_statistics: Dict[int, RunningStatistics] = {}
+        self.all_ratio_statistics = RunningStatistics()
+        self.exact_statistics: Dict[str, Dict[int, RunningStatistics]] = \
+            {"true_ratio": {}, "bound_gap": {}}
+
+    def tasks(self) -> Iterator[Tuple[int, int, int, Dict, int]]:
+        index = 0
+        for number_of_vertices in self.sizes:
+            for _ in range(self.instances_per_size):
+                yield (index, number_of_vertices, instance_seed(self.base_seed, index),
+                       self.solver_arguments, self.exact_max_vertices)
+                index += 1
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        """
+            Runs the experiment and returns the ratio statistics, overall and
+            per size.
+        """
+        output_file = open(self.output, "w", newline="") if self.output else None
+        writer = None
+        try:
+            with multiprocessing.Pool(self.processes) as pool:
+                tasks = self.tasks()
+                while True:
+                    # Tasks are submitted in blocks so that a huge experiment
+                    # never sits whole in the pool's task queue.
+                    block = [task for _, task in zip(range(self.block_size), tasks)]
+                    if block == []:
+                        break
+                    chunksize = max(1, len(block)//(4*self.processes))
+                    for row in pool.imap_unordered(solve_instance, block, chunksize):
+                        self.__add(row)
+                        if output_file is None:
+                            continue
+                        if self.output.endswith(".jsonl"):
+                            output_file.write(json.dumps(row) + "\n")
+                        else:
+                            if writer is None:
+                                writer = csv.DictWriter(output_file, fieldnames=list(row.keys()))
+                                writer.writeheader()
+                            writer.writerow(row)
+                    if output_file is not None:
+                        output_file.flush()
+        finally:
+            if output_file is not None:
+                output_file.close()
+        return self.summary()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {"all": self.all_ratio_statistics.summary()}
+        for number_of_vertices, statistics in sorted(self.ratio_statistics.items()):
+            summary[str(number_of_vertices)] = statistics.summary()
+        for name, statistics_by_size in self.exact_statistics.items():
+            if statistics_by_size:
+                summary[name] = {str(number_of_vertices): statistics.summary()
+                                 for number_of_vertices, statistics
+                                 in sorted(statistics_by_size.items())}
+        return summary
+
+    def __add(self, row: Dict):
+        for name, statistics_by_size in self.exact_statistics.items():
+            if row.get(name) is None:
+                continue
+            if row["n"] not in statistics_by_size:
+                statistics_by_size[row["n"]] = RunningStatistics()
+            statistics_by_size[row["n"]].add(row[name])
+        if row["ratio"] is None:
+            return
+        if row["n"] not in self.ratio_statistics:
+            self.ratio_statistics[row["n"]] = RunningStatistics()
+        self.ratio_statistics[row["n"]].add(row["ratio"])
+        self.all_ratio_statistics.add(row["ratio"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12])
+    parser.add_argument("--instances", type=int, default=100,
+                        help="number of instances per size")
+    parser.add_argument("--output", default=None, help="a .csv or .jsonl file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--matching", default="auto",
+                        choices=MinimumWeightPerfectMatching.methods)
+    parser.add_argument("--lower-bound", default="1-tree", choices=["1-tree", "held-karp"])
+    parser.add_argument("--improvement", default=None, choices=["2-opt", "2-opt+or-opt"])
+    parser.add_argument("--starts", type=int, default=1,
+                        help="number of euler cycle walks to shortcut, keeping the best")
+    parser.add_argument("--exact", type=int, default=0, metavar="N",
+                        help="also solve the instances of at most N vertices exactly")
+    arguments = parser.parse_args()
+    experiment = BatchExperiment(
+        arguments.sizes, arguments.instances, arguments.output, arguments.seed,
+        arguments.processes,
+        {"matching_method": arguments.matching, "lower_bound": arguments.lower_bound,
+         "improvement": arguments.improvement, "starts": arguments.starts},
+        exact_max_vertices=arguments.exact)
+    print(json.dumps(experiment.run(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
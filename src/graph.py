@@ -1,17 +1,26 @@
-from typing import List, Dict, Tuple, Set
-import math
+from typing import Iterator, List, Dict, Mapping, Optional, Tuple, Set
 import random
-import pygame
+import numpy as np
+from scipy.sparse import csr_matrix  # type: ignore
+from scipy.sparse.csgraph import dijkstra  # type: ignore
 
 
 class Graph():
     def __init__(
         self,
         number_of_vertices: int,
-        adj_matrix: List[List[bool]]
+        adj_matrix: List[List[bool]],
+        validate: bool = True
     ):
+        """
+            Graphs are not modified after construction. The adjacency matrix
+            is checked for size and symmetry, which is O(n²); graphs derived
+            from an already checked graph pass validate=False to skip it.
+        """
         self.number_of_vertices = number_of_vertices
         self.adj_matrix = adj_matrix
+        if not validate:
+            return
         if len(self.adj_matrix) != self.number_of_vertices:
             print(f"ERROR: Wrong adjacency matrix size. Expected {self.number_of_vertices}. " +
                   f"Got {len(self.adj_matrix)}.")
@@ -43,14 +52,14 @@ class Graph():
                 v, w = vertices[i], vertices[j]
                 if self.adj_matrix[v][w]:
                     induced_adj_matrix[i][j] = True
-        return Graph(induced_number_of_vertices, induced_adj_matrix)
+        return Graph(induced_number_of_vertices, induced_adj_matrix, validate=False)
 
     def remove_vertice(self, vertice: int):
         """
             Returns a new graph without the input vertice.
         """
-        if vertice not in self.vertices():
-            return Graph(self.number_of_vertices, self.adj_matrix)
+        if not self.has_vertice(vertice):
+            return Graph(self.number_of_vertices, self.adj_matrix, validate=False)
         number_of_vertices = self.number_of_vertices - 1
         adj_matrix = [[self.adj_matrix[v][w]
                        for v in self.vertices() if v != vertice]
@@ -60,13 +69,51 @@ class Graph():
                 print(f"ERROR: Resulting matrix after " +
                       f"removing vertice {vertice} is wrong.")
                 raise Exception
-        return Graph(number_of_vertices, adj_matrix)
+        return Graph(number_of_vertices, adj_matrix, validate=False)
 
     def edges(self) -> List[Tuple[int, int]]:
-        return [(v, w) for v in self.vertices() for w in self.vertices() if self.adj_matrix[v][w]]
+        """
+            Returns the edges, in both directions. The list is built once and
+            cached; a copy is returned.
+        """
+        if getattr(self, "_edges", None) is None:
+            v_array, w_array = np.nonzero(self.adjacency())
+            self._edges = list(zip(v_array.tolist(), w_array.tolist()))
+        return [edge for edge in self._edges]
 
     def vertices(self) -> List[int]:
-        return [i for i in range(self.number_of_vertices)]
+        return list(range(self.number_of_vertices))
+
+    def has_vertice(self, vertice: int) -> bool:
+        return 0 <= vertice < self.number_of_vertices
+
+    def has_edge(self, v: int, w: int) -> bool:
+        """
+            Constant time membership test of the edge (v, w).
+        """
+        return self.has_vertice(v) and self.has_vertice(w) and bool(self.adj_matrix[v][w])
+
+    def adjacency(self) -> np.ndarray:
+        """
+            Returns the adjacency matrix as a boolean array. The array is
+            cached and must not be modified.
+        """
+        if getattr(self, "_adjacency", None) is None:
+            self._adjacency = np.asarray(self.adj_matrix, dtype=bool).reshape(
+                self.number_of_vertices, self.number_of_vertices)
+        return self._adjacency
+
+    def degrees(self) -> np.ndarray:
+        """
+            Returns the degree of every vertice. The array is cached and
+            must not be modified.
+        """
+        if getattr(self, "_degrees", None) is None:
+            self._degrees = self.adjacency().sum(axis=1)
+        return self._degrees
+
+    def degree(self, vertice: int) -> int:
+        return int(self.degrees()[vertice])
 
     def __str__(self) -> str:
         return f"Vertices:\t{self.vertices()}\n" +\
@@ -78,10 +125,13 @@ class WeightedGraph(Graph):
         self,
         number_of_vertices: int,
         adj_matrix: List[List[bool]],
-        cost_dict: Dict[Tuple[int, int], float]
+        cost_dict: Dict[Tuple[int, int], float],
+        validate: bool = True
     ):
-        super().__init__(number_of_vertices, adj_matrix)
+        super().__init__(number_of_vertices, adj_matrix, validate)
         self.cost_dict = cost_dict
+        if not validate:
+            return
         for v in self.vertices():
             for w in self.vertices():
                 if not self.adj_matrix[v][w]:
@@ -96,97 +146,653 @@ class WeightedGraph(Graph):
     def __str__(self) -> str:
         return super().__str__() + f"\nWeights: {self.cost_dict}"
 
+    def cost_matrix(self) -> np.ndarray:
+        """
+            Returns the costs as a dense matrix, with infinity where there
+            is no edge. The matrix is built once and cached.
+        """
+        if getattr(self, "_cost_matrix", None) is None:
+            if isinstance(self.cost_dict, CostMatrixView):
+                matrix = np.where(self.adjacency(), self.cost_dict.matrix, np.inf)
+            else:
+                matrix = np.full((self.number_of_vertices, self.number_of_vertices), np.inf)
+                for (v, w), cost in self.cost_dict.items():
+                    if self.adj_matrix[v][w]:
+                        matrix[v, w] = cost
+            self._cost_matrix = matrix
+        return self._cost_matrix
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+            Returns the undirected edges (v, w), with v < w, as three arrays:
+            the first endpoints, the second endpoints and the costs.
+        """
+        adjacency = np.triu(self.adjacency(), 1)
+        v_array, w_array = np.nonzero(adjacency)
+        return v_array, w_array, self.cost_matrix()[v_array, w_array]
+
+    def edge_costs(self, v_array: np.ndarray, w_array: np.ndarray) -> np.ndarray:
+        """
+            Returns the costs of the edges (v_array[i], w_array[i]), with
+            infinity for pairs that are not edges.
+        """
+        return self.cost_matrix()[v_array, w_array]
+
+    def neighbourhood(self, vertice: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Returns the neighbours of the input vertice and the costs of the
+            edges to them.
+        """
+        neighbours = np.flatnonzero(self.adjacency()[vertice])
+        return neighbours, self.cost_matrix()[vertice, neighbours]
+
     def induced_graph(self, vertices: List[int]):
         """
-            Returns the graph induced by the input vertices.
+            Returns the graph induced by the input vertices, as a view that
+            shares the storage of this graph.
         """
         if max(vertices) >= self.number_of_vertices:
             print("ERROR: Input vertices must be in the graph!")
             raise Exception
-        induced_number_of_vertices = len(vertices)
-        induced_adj_matrix = [[False for _ in range(induced_number_of_vertices)]
-                              for _ in range(induced_number_of_vertices)]
-        induced_cost_dict: Dict[Tuple[int, int], float] = {}
-        for i in range(induced_number_of_vertices):
-            for j in range(induced_number_of_vertices):
-                v, w = vertices[i], vertices[j]
-                if self.adj_matrix[v][w]:
-                    induced_adj_matrix[i][j] = True
-                    induced_cost_dict[(i, j)] = self.cost_dict[(v, w)]
-        return WeightedGraph(induced_number_of_vertices, induced_adj_matrix, induced_cost_dict)
+        return WeightedGraphView(self, vertices=vertices)
 
     def cost(self, edges: Set[Tuple[int, int]]):
         """
             Returns the sum of the cost of the input edges. If an input edge does not
             belong to the graph, an Exception is raised.
         """
-        for edge in edges:
-            if edge not in self.edges():
+        for v, w in edges:
+            if not self.has_edge(v, w):
                 print(
-                    "ERROR: Cannot calculate cost of edge {edge} since it's not in the graph.")
+                    f"ERROR: Cannot calculate cost of edge {(v, w)} since it's not in the graph.")
                 raise Exception
-        return sum([self.cost_dict[edge] for edge in edges])
+        cost_matrix = self.cost_matrix()
+        return float(sum([cost_matrix[v, w] for v, w in edges]))
 
     def remove_vertice(self, vertice: int):
         """
-            Returns a new weighted graph without the input vertice.
+            Returns a view of the weighted graph without the input vertice.
         """
-        if vertice not in self.vertices():
-            return Graph(self.number_of_vertices, self.adj_matrix)
-        number_of_vertices = self.number_of_vertices - 1
-        adj_matrix = [[self.adj_matrix[v][w]
-                       for v in self.vertices() if v != vertice]
-                      for w in self.vertices() if w != vertice]
-        for v in range(len(self.vertices())-1):
-            if len(adj_matrix[v]) != len(self.vertices())-1:
-                print(f"ERROR: Resulting matrix after " +
-                      f"removing vertice {vertice} is wrong.")
-                raise Exception
-        cost_dict: Dict[Tuple[int, int], float] = {}
-        for v, w in self.cost_dict.keys():
-            if v == vertice or w == vertice:
-                continue
-            new_v = v if v < vertice else (v-1)
-            new_w = w if w < vertice else (w-1)
-            cost_dict[(new_v, new_w)] = self.cost_dict[(v, w)]
-        return WeightedGraph(number_of_vertices, adj_matrix, cost_dict)
+        if not self.has_vertice(vertice):
+            return Graph(self.number_of_vertices, self.adj_matrix, validate=False)
+        return self.induced_graph([v for v in self.vertices() if v != vertice])
 
     def remove_edges(self, edges: Set[Tuple[int, int]]):
         """
-            Returns a new graph without the specified edges.
+            Returns a view of the graph without the specified edges.
         """
         for v, w in edges:
             if v >= self.number_of_vertices or w >= self.number_of_vertices:
                 print("ERROR: Vertices don't exist!")
                 raise Exception
-        adj_matrix = [[self.adj_matrix[v][w]
-                       for v in self.vertices()] for w in self.vertices()]
+        return WeightedGraphView(self, removed_edges=edges)
+
+
+class WeightedGraphView(WeightedGraph):
+    """
+        Weighted graph that reads the adjacency and the costs of a parent
+        graph instead of copying them. Vertice i of the view is vertice
+        vertices[i] of the parent (every vertice if vertices is None) and
+        removed_edges, given in the view's numbering, are masked out. The
+        arrays of the view are only built when asked for.
+    """
+
+    def __init__(
+        self,
+        parent: WeightedGraph,
+        vertices: Optional[List[int]] = None,
+        removed_edges: Optional[Set[Tuple[int, int]]] = None
+    ):
+        self.parent = parent
+        self.indexes = None if vertices is None else np.asarray(vertices, dtype=np.intp)
+        self.number_of_vertices = parent.number_of_vertices if self.indexes is None \
+            else len(self.indexes)
+        self.removed_edges: Set[Tuple[int, int]] = set()
+        for v, w in (removed_edges or []):
+            self.removed_edges.add((v, w))
+            self.removed_edges.add((w, v))
+        self._cost_dict: Optional[Dict[Tuple[int, int], float]] = None
+
+    def parent_vertice(self, vertice: int) -> int:
+        return vertice if self.indexes is None else int(self.indexes[vertice])
+
+    @property
+    def adj_matrix(self) -> np.ndarray:  # type: ignore
+        return self.adjacency()
+
+    @property
+    def cost_dict(self) -> Dict[Tuple[int, int], float]:  # type: ignore
+        if self._cost_dict is None:
+            cost_matrix = self.cost_matrix()
+            self._cost_dict = {(v, w): float(cost_matrix[v, w]) for v, w in self.edges()}
+        return self._cost_dict
+
+    def has_edge(self, v: int, w: int) -> bool:
+        return self.has_vertice(v) and self.has_vertice(w) and \
+            (v, w) not in self.removed_edges and \
+            self.parent.has_edge(self.parent_vertice(v), self.parent_vertice(w))
+
+    def adjacency(self) -> np.ndarray:
+        if getattr(self, "_adjacency", None) is None:
+            self._adjacency = self.__view_of(self.parent.adjacency(), False)
+        return self._adjacency
+
+    def cost_matrix(self) -> np.ndarray:
+        if getattr(self, "_cost_matrix", None) is None:
+            self._cost_matrix = self.__view_of(self.parent.cost_matrix(), np.inf)
+        return self._cost_matrix
+
+    def cost(self, edges: Set[Tuple[int, int]]):
+        """
+            Returns the sum of the cost of the input edges, computed by the
+            parent. If an input edge does not belong to the graph, an
+            Exception is raised.
+        """
         for v, w in edges:
-            adj_matrix[v][w] = False
-        return WeightedGraph(self.number_of_vertices, adj_matrix, self.cost_dict.copy())
+            if not self.has_edge(v, w):
+                print(
+                    f"ERROR: Cannot calculate cost of edge {(v, w)} since it's not in the graph.")
+                raise Exception
+        return self.parent.cost([(self.parent_vertice(v), self.parent_vertice(w))
+                                 for v, w in edges])
+
+    def __view_of(self, matrix: np.ndarray, removed_value) -> np.ndarray:
+        """
+            Returns the part of a parent matrix seen by the view. Without
+            vertices nor removed edges this is the parent's array itself.
+        """
+        if self.indexes is not None:
+            matrix = matrix[np.ix_(self.indexes, self.indexes)]
+        if self.removed_edges:
+            if self.indexes is None:
+                matrix = matrix.copy()
+            removed = np.asarray(list(self.removed_edges), dtype=np.intp)
+            matrix[removed[:, 0], removed[:, 1]] = removed_value
+        return matrix
+
+
+class CostMatrixView(Mapping):
+    """
+        Read-only, dict-like view of a dense cost matrix, keyed by (v, w)
+        tuples. It stands in for the cost_dict of complete graphs so that
+        no n² dictionary has to be built.
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def __getitem__(self, edge: Tuple[int, int]) -> float:
+        v, w = edge
+        number_of_vertices = len(self.matrix)
+        if v == w or not (0 <= v < number_of_vertices and 0 <= w < number_of_vertices):
+            raise KeyError(edge)
+        return float(self.matrix[v, w])
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        number_of_vertices = len(self.matrix)
+        for v in range(number_of_vertices):
+            for w in range(number_of_vertices):
+                if v != w:
+                    yield (v, w)
+
+    def __len__(self) -> int:
+        number_of_vertices = len(self.matrix)
+        return number_of_vertices*(number_of_vertices-1)
+
+    def copy(self):
+        return self
+
+    def __repr__(self) -> str:
+        return f"CostMatrixView({self.matrix!r})"
+
+
+def _edge_array(edges, number_of_vertices: int) -> np.ndarray:
+    """
+        Returns the input edges of a complete graph as an (m, 2) array. If an
+        input edge does not belong to the graph, an Exception is raised.
+    """
+    edge_array = np.asarray(list(edges), dtype=np.intp).reshape(-1, 2)
+    if np.any(edge_array[:, 0] == edge_array[:, 1]) or \
+       np.any(edge_array < 0) or np.any(edge_array >= number_of_vertices):
+        print("ERROR: Cannot calculate cost of edges that are not in the graph.")
+        raise Exception
+    return edge_array
+
+
+class CompleteWeightedGraph(WeightedGraph):
+    """
+        Complete graph whose costs are stored in a dense, contiguous float
+        matrix. The adjacency matrix and the cost dictionary are exposed as
+        views over that matrix instead of Python lists and dicts.
+    """
+
+    def __init__(self, distance_matrix: np.ndarray):
+        distance_matrix = np.ascontiguousarray(distance_matrix)
+        if distance_matrix.ndim != 2 or \
+           distance_matrix.shape[0] != distance_matrix.shape[1]:
+            print(f"ERROR: Distance matrix must be square. Got shape {distance_matrix.shape}.")
+            raise Exception
+        self.number_of_vertices = len(distance_matrix)
+        self._distance_matrix: Optional[np.ndarray] = distance_matrix
+        self._cost_dict: Optional[CostMatrixView] = None
+        self._adj_matrix = None
+
+    @property
+    def distance_matrix(self) -> np.ndarray:
+        return self._distance_matrix  # type: ignore
+
+    @property
+    def cost_dict(self) -> CostMatrixView:  # type: ignore
+        if self._cost_dict is None:
+            self._cost_dict = CostMatrixView(self.distance_matrix)
+        return self._cost_dict
+
+    @property
+    def adj_matrix(self) -> np.ndarray:  # type: ignore
+        if self._adj_matrix is None:
+            self._adj_matrix = ~np.eye(self.number_of_vertices, dtype=bool)
+        return self._adj_matrix
+
+    def cost_matrix(self) -> np.ndarray:
+        return self.distance_matrix
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        v_array, w_array = np.triu_indices(self.number_of_vertices, 1)
+        return v_array, w_array, self.distance_matrix[v_array, w_array]
+
+    def edges(self) -> List[Tuple[int, int]]:
+        return [(v, w) for v in self.vertices() for w in self.vertices() if v != w]
+
+    def has_edge(self, v: int, w: int) -> bool:
+        return v != w and self.has_vertice(v) and self.has_vertice(w)
+
+    def neighbourhood(self, vertice: int) -> Tuple[np.ndarray, np.ndarray]:
+        neighbours = np.delete(np.arange(self.number_of_vertices), vertice)
+        return neighbours, np.delete(self.cost_matrix()[vertice], vertice)
+
+    def degrees(self) -> np.ndarray:
+        return np.full(self.number_of_vertices, self.number_of_vertices - 1)
+
+    def induced_graph(self, vertices: List[int]):
+        """
+            Returns the (complete) graph induced by the input vertices.
+        """
+        if max(vertices) >= self.number_of_vertices:
+            print("ERROR: Input vertices must be in the graph!")
+            raise Exception
+        return CompleteGraphView(self, vertices)
+
+    def remove_vertice(self, vertice: int):
+        """
+            Returns a new complete graph without the input vertice.
+        """
+        if not self.has_vertice(vertice):
+            return self
+        return self.induced_graph([v for v in self.vertices() if v != vertice])
+
+    def cost(self, edges: Set[Tuple[int, int]]):
+        """
+            Returns the sum of the cost of the input edges. If an input edge does not
+            belong to the graph, an Exception is raised.
+        """
+        edge_array = _edge_array(edges, self.number_of_vertices)
+        return float(self.distance_matrix[edge_array[:, 0], edge_array[:, 1]].sum())
+
+
+class CompleteGraphView(CompleteWeightedGraph):
+    """
+        Complete graph induced by some vertices of a parent complete graph.
+        Vertice i of the view is vertice vertices[i] of the parent. Costs
+        are read from the parent; the smaller distance matrix is only sliced
+        out of the parent's when it is asked for.
+    """
 
+    def __init__(self, parent: CompleteWeightedGraph, vertices: List[int]):
+        self.parent = parent
+        self.indexes = np.asarray(vertices, dtype=np.intp)
+        self.number_of_vertices = len(self.indexes)
+        self._distance_matrix = None
+        self._cost_dict = None
+        self._adj_matrix = None
 
-class EuclideanCompleteWeightedGraph(WeightedGraph):
+    @property
+    def distance_matrix(self) -> np.ndarray:
+        if self._distance_matrix is None:
+            self._distance_matrix = self.parent.distance_matrix[np.ix_(self.indexes, self.indexes)]
+        return self._distance_matrix
+
+    def induced_graph(self, vertices: List[int]):
+        if max(vertices) >= self.number_of_vertices:
+            print("ERROR: Input vertices must be in the graph!")
+            raise Exception
+        return CompleteGraphView(self.parent, self.indexes[np.asarray(vertices, dtype=np.intp)])
+
+    def cost(self, edges: Set[Tuple[int, int]]):
+        edge_array = _edge_array(edges, self.number_of_vertices)
+        return self.parent.cost(self.indexes[edge_array].tolist())
+
+
+class SparseWeightedGraph(WeightedGraph):
+    """
+        Weighted graph stored as compressed sparse rows: the neighbours of v
+        are indices[indptr[v]:indptr[v+1]], in increasing order, and weights
+        holds the costs of those edges. Every edge is stored in both rows.
+        It takes O(n + m) memory; the dense adj_matrix, cost_dict and
+        cost_matrix are only built if a caller asks for them.
+
+        The graph does not have to be metric. metric_closure computes
+        shortest path costs between some vertices only, which is what the
+        matching of Christofides needs.
+    """
+
+    def __init__(
+        self,
+        number_of_vertices: int,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        validate: bool = True
+    ):
+        self.number_of_vertices = number_of_vertices
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.rows = np.repeat(np.arange(number_of_vertices), np.diff(self.indptr))
+        self._cost_dict: Optional[Dict[Tuple[int, int], float]] = None
+        self._csr = None
+        if not validate:
+            self.__keys = self.rows.astype(np.int64)*number_of_vertices + self.indices
+            return
+        if len(self.indptr) != number_of_vertices + 1 or self.indptr[0] != 0 or \
+           np.any(np.diff(self.indptr) < 0) or self.indptr[-1] != len(self.indices) or \
+           len(self.indices) != len(self.weights):
+            print("ERROR: Malformed sparse rows.")
+            raise Exception
+        if np.any(self.indices < 0) or np.any(self.indices >= number_of_vertices) or \
+           np.any(self.indices == self.rows):
+            print("ERROR: Sparse rows must only hold edges between distinct vertices!")
+            raise Exception
+        self.__keys = self.rows.astype(np.int64)*number_of_vertices + self.indices
+        if np.any(np.diff(self.__keys) <= 0):
+            print("ERROR: The neighbours of every vertice must be sorted and unique.")
+            raise Exception
+        transposed = self.indices.astype(np.int64)*number_of_vertices + self.rows
+        order = np.argsort(transposed)
+        if np.any(transposed[order] != self.__keys):
+            print("ERROR: graph must be undirected!")
+            raise Exception
+        if np.any(self.weights[order] != self.weights):
+            print("ERROR: Cost must be symmetric!")
+            raise Exception
+
+    @property
+    def adj_matrix(self) -> np.ndarray:  # type: ignore
+        return self.adjacency()
+
+    @property
+    def cost_dict(self) -> Dict[Tuple[int, int], float]:  # type: ignore
+        if self._cost_dict is None:
+            self._cost_dict = dict(zip(zip(self.rows.tolist(), self.indices.tolist()),
+                                       self.weights.tolist()))
+        return self._cost_dict
+
+    def csr(self) -> csr_matrix:
+        if self._csr is None:
+            self._csr = csr_matrix((self.weights, self.indices, self.indptr),
+                                   shape=(self.number_of_vertices, self.number_of_vertices))
+        return self._csr
+
+    def adjacency(self) -> np.ndarray:
+        if getattr(self, "_adjacency", None) is None:
+            adjacency = np.zeros((self.number_of_vertices, self.number_of_vertices), dtype=bool)
+            adjacency[self.rows, self.indices] = True
+            self._adjacency = adjacency
+        return self._adjacency
+
+    def cost_matrix(self) -> np.ndarray:
+        if getattr(self, "_cost_matrix", None) is None:
+            matrix = np.full((self.number_of_vertices, self.number_of_vertices), np.inf)
+            matrix[self.rows, self.indices] = self.weights
+            self._cost_matrix = matrix
+        return self._cost_matrix
+
+    def edges(self) -> List[Tuple[int, int]]:
+        return list(zip(self.rows.tolist(), self.indices.tolist()))
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        upper = self.rows < self.indices
+        return self.rows[upper], self.indices[upper], self.weights[upper]
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbourhood(self, vertice: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[vertice], self.indptr[vertice+1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def has_edge(self, v: int, w: int) -> bool:
+        return self.has_vertice(v) and self.has_vertice(w) and \
+            bool(np.isfinite(self.edge_costs(np.asarray([v]), np.asarray([w]))[0]))
+
+    def edge_costs(self, v_array: np.ndarray, w_array: np.ndarray) -> np.ndarray:
+        """
+            Binary searches of the edges in the sorted rows, O(log m) each.
+        """
+        keys = np.asarray(v_array, dtype=np.int64)*self.number_of_vertices + \
+            np.asarray(w_array, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.__keys, keys), max(len(self.__keys) - 1, 0))
+        costs = np.full(len(keys), np.inf)
+        if len(self.__keys) > 0:
+            found = self.__keys[positions] == keys
+            costs[found] = self.weights[positions[found]]
+        return costs
+
+    def cost(self, edges: Set[Tuple[int, int]]):
+        """
+            Returns the sum of the cost of the input edges. If an input edge does not
+            belong to the graph, an Exception is raised.
+        """
+        edge_array = np.asarray(list(edges), dtype=np.intp).reshape(-1, 2)
+        costs = self.edge_costs(edge_array[:, 0], edge_array[:, 1])
+        if np.any(np.isinf(costs)):
+            v, w = edge_array[np.flatnonzero(np.isinf(costs))[0]].tolist()
+            print(f"ERROR: Cannot calculate cost of edge {(v, w)} since it's not in the graph.")
+            raise Exception
+        return float(costs.sum())
+
+    def induced_graph(self, vertices: List[int]):
+        """
+            Returns the sparse graph induced by the input vertices, in O(n + m).
+        """
+        if max(vertices) >= self.number_of_vertices:
+            print("ERROR: Input vertices must be in the graph!")
+            raise Exception
+        mapping = np.full(self.number_of_vertices, -1, dtype=np.intp)
+        mapping[np.asarray(vertices, dtype=np.intp)] = np.arange(len(vertices))
+        v_array, w_array = mapping[self.rows], mapping[self.indices]
+        keep = (v_array >= 0) & (w_array >= 0)
+        return sparse_graph_from_edges(
+            len(vertices), v_array[keep], w_array[keep], self.weights[keep])
+
+    def remove_vertice(self, vertice: int):
+        if not self.has_vertice(vertice):
+            return self
+        return self.induced_graph([v for v in self.vertices() if v != vertice])
+
+    def remove_edges(self, edges: Set[Tuple[int, int]]):
+        edge_array = np.asarray(list(edges), dtype=np.int64).reshape(-1, 2)
+        if np.any(edge_array < 0) or np.any(edge_array >= self.number_of_vertices):
+            print("ERROR: Vertices don't exist!")
+            raise Exception
+        removed = np.concatenate([edge_array[:, 0]*self.number_of_vertices + edge_array[:, 1],
+                                  edge_array[:, 1]*self.number_of_vertices + edge_array[:, 0]])
+        keep = ~np.isin(self.__keys, removed)
+        return sparse_graph_from_edges(self.number_of_vertices, self.rows[keep],
+                                       self.indices[keep], self.weights[keep])
+
+    def shortest_path_costs(
+        self,
+        sources: List[int],
+        block_size: int = 0
+    ) -> np.ndarray:
+        """
+            Returns the (k, n) shortest path costs from the input sources to
+            every vertice, with Dijkstra. Sources are processed in blocks so
+            that no more than about 2^24 costs are alive at once.
+        """
+        sources_array = np.asarray(sources, dtype=np.intp)
+        if block_size <= 0:
+            block_size = max(1, 2**24 // max(self.number_of_vertices, 1))
+        costs = np.empty((len(sources_array), self.number_of_vertices))
+        for start in range(0, len(sources_array), block_size):
+            block = sources_array[start:start+block_size]
+            costs[start:start+len(block)] = dijkstra(self.csr(), directed=True, indices=block)
+        return costs
+
+    def metric_closure(self, vertices: List[int]) -> CompleteWeightedGraph:
+        """
+            Returns the complete graph over the input vertices whose costs are
+            the shortest path costs in this graph. Only the rows of the input
+            vertices are computed, so the closure costs O(k (n + m) log n)
+            instead of the O(n (n + m) log n) of the full closure.
+        """
+        indexes = np.asarray(vertices, dtype=np.intp)
+        costs = np.empty((len(indexes), len(indexes)))
+        block_size = max(1, 2**24 // max(self.number_of_vertices, 1))
+        for start in range(0, len(indexes), block_size):
+            block = indexes[start:start+block_size]
+            costs[start:start+len(block)] = self.shortest_path_costs(block, block_size)[:, indexes]
+        return CompleteWeightedGraph(np.minimum(costs, costs.T))
+
+    def path_costs(self, v_array: np.ndarray, w_array: np.ndarray) -> np.ndarray:
+        """
+            Returns the shortest path costs between the pairs (v_array[i],
+            w_array[i]), running Dijkstra once per distinct source.
+        """
+        v_array, w_array = np.asarray(v_array, dtype=np.intp), np.asarray(w_array, dtype=np.intp)
+        sources, inverse = np.unique(v_array, return_inverse=True)
+        costs = np.empty(len(v_array))
+        block_size = max(1, 2**24 // max(self.number_of_vertices, 1))
+        for start in range(0, len(sources), block_size):
+            block_costs = self.shortest_path_costs(sources[start:start+block_size], block_size)
+            in_block = (inverse >= start) & (inverse < start + block_size)
+            costs[in_block] = block_costs[inverse[in_block] - start, w_array[in_block]]
+        return costs
+
+
+def sparse_graph_from_edges(
+    number_of_vertices: int,
+    v_array: np.ndarray,
+    w_array: np.ndarray,
+    costs: np.ndarray
+) -> SparseWeightedGraph:
+    """
+        Builds a sparse graph from arrays of edges in O(m log m). Each edge
+        may be given in one or both directions; self loops are dropped and
+        the cheapest of parallel edges is kept.
+    """
+    v_array = np.asarray(v_array, dtype=np.intp)
+    w_array = np.asarray(w_array, dtype=np.intp)
+    costs = np.asarray(costs, dtype=np.float64)
+    if np.any(v_array < 0) or np.any(v_array >= number_of_vertices) or \
+       np.any(w_array < 0) or np.any(w_array >= number_of_vertices):
+        print("ERROR: Edges must be between vertices of the graph!")
+        raise Exception
+    keep = v_array != w_array
+    rows = np.concatenate([v_array[keep], w_array[keep]])
+    columns = np.concatenate([w_array[keep], v_array[keep]])
+    weights = np.concatenate([costs[keep], costs[keep]])
+    # Sorted by (row, column, cost), so the first of every run of parallel
+    # edges is the cheapest.
+    order = np.lexsort((weights, columns, rows))
+    rows, columns, weights = rows[order], columns[order], weights[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+    rows, columns, weights = rows[first], columns[first], weights[first]
+    indptr = np.zeros(number_of_vertices + 1, dtype=np.intp)
+    np.cumsum(np.bincount(rows, minlength=number_of_vertices), out=indptr[1:])
+    return SparseWeightedGraph(number_of_vertices, indptr, columns, weights, validate=False)
+
+
+def euclidean_distance_matrix(
+    points: np.ndarray,
+    dtype: type = np.float64
+) -> np.ndarray:
+    """
+        Computes the matrix of pairwise euclidean distances between the rows
+        of points in a vectorized way, directly in the requested dtype.
+    """
+    points = np.asarray(points, dtype=dtype).reshape(-1, 2)
+    delta = points[:, 0][:, None] - points[:, 0][None, :]
+    distance_matrix = delta*delta
+    np.subtract(points[:, 1][:, None], points[:, 1][None, :], out=delta)
+    delta *= delta
+    distance_matrix += delta
+    np.sqrt(distance_matrix, out=distance_matrix)
+    return distance_matrix
+
+
+class EuclideanCompleteWeightedGraph(CompleteWeightedGraph):
 
     def __init__(
         self,
-        coordinates: List[Tuple[float, float]]
+        coordinates: List[Tuple[float, float]],
+        dtype: type = np.float64,
+        distance_matrix: Optional[np.ndarray] = None
     ):
+        """
+            Builds the complete graph over the input points. The distances
+            are stored in a single (n, n) array of the given dtype; pass
+            np.float32 to halve its memory. A distance matrix that is already
+            known to match the coordinates can be passed to skip computing it.
+            Otherwise it is only computed when first needed, so stages that
+            work on the points alone never pay for it.
+        """
         self.coordinates = coordinates
-        number_of_vertices = len(coordinates)
-        vertices = [i for i in range(number_of_vertices)]
-        adj_matrix = [[True if i != j else False for i in vertices]
-                      for j in vertices]
-        cost_dict = {}
-        for v in vertices:
-            for w in vertices:
-                if v == w:
-                    continue
-                v_pos = self.coordinates[v]
-                w_pos = self.coordinates[w]
-                cost_dict[(v, w)] = \
-                    math.sqrt((v_pos[0]-w_pos[0])**2 + (v_pos[1]-w_pos[1])**2)
-        super().__init__(number_of_vertices, adj_matrix, cost_dict)
+        self.dtype = dtype
+        self.points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        if distance_matrix is not None:
+            super().__init__(distance_matrix)
+            return
+        self.number_of_vertices = len(self.points)
+        self._distance_matrix = None
+        self._cost_dict = None
+        self._adj_matrix = None
+
+    @property
+    def distance_matrix(self) -> np.ndarray:
+        if self._distance_matrix is None:
+            self._distance_matrix = euclidean_distance_matrix(self.points, self.dtype)
+        return self._distance_matrix
+
+    def cost(self, edges: Set[Tuple[int, int]]):
+        """
+            Returns the sum of the cost of the input edges. If the distance
+            matrix was not computed, the costs come from the points.
+        """
+        if self._distance_matrix is not None:
+            return super().cost(edges)
+        edge_array = _edge_array(edges, self.number_of_vertices)
+        delta = self.points[edge_array[:, 0]] - self.points[edge_array[:, 1]]
+        return float(np.hypot(delta[:, 0], delta[:, 1]).astype(self.dtype).sum())
+
+    def edge_costs(self, v_array: np.ndarray, w_array: np.ndarray) -> np.ndarray:
+        if self._distance_matrix is not None:
+            return super().edge_costs(v_array, w_array)
+        delta = self.points[v_array] - self.points[w_array]
+        costs = np.hypot(delta[:, 0], delta[:, 1]).astype(self.dtype)
+        costs[np.asarray(v_array) == np.asarray(w_array)] = np.inf
+        return costs
+
+    def induced_graph(self, vertices: List[int]):
+        """
+            Returns the euclidean graph induced by the input vertices, as a
+            view that shares the points and the distances of this graph.
+        """
+        if max(vertices) >= self.number_of_vertices:
+            print("ERROR: Input vertices must be in the graph!")
+            raise Exception
+        return EuclideanGraphView(self, np.asarray(vertices, dtype=np.intp))
 
     def render(
         self,
@@ -197,19 +803,10 @@ class EuclideanCompleteWeightedGraph(WeightedGraph):
     ):
         """
             Renders the whole graph on the screen according to the coordinates.
+            Needs pygame, which is only imported here.
         """
-        font = pygame.font.SysFont('Arial', 20)
-        for v in self.vertices():
-            for w in self.vertices():
-                pygame.draw.line(screen, edge_color,
-                                 self.coordinates[v], self.coordinates[w], 3)
-        for v in self.vertices():
-            pygame.draw.circle(screen, vertice_color, self.coordinates[v], 5)
-            if not render_indexes:
-                continue
-            text_surface = font.render(str(v), False, (0, 0, 0))
-            screen.blit(
-                text_surface, (self.coordinates[v][0]-20, self.coordinates[v][1]-20))
+        from render import render_graph
+        render_graph(self, screen, vertice_color, edge_color, render_indexes)
 
     def render_edges(
         self,
@@ -221,27 +818,92 @@ class EuclideanCompleteWeightedGraph(WeightedGraph):
         """
             Renders only the specified input edges and the corresponding vertices
             based on the coordinates. If the input is not a subset of the graph edges,
-            raises an Exception.
+            raises an Exception. Needs pygame, which is only imported here.
         """
-        for edge in edges:
-            if edge not in self.edges():
-                print("ERROR: Input must be a subset of the graph's edges.")
-                raise Exception
-        for v, w in edges:
-            pygame.draw.line(screen, edge_color,
-                             self.coordinates[v], self.coordinates[w], 3)
-        for v, w in edges:
-            pygame.draw.circle(screen, vertice_color, self.coordinates[v], 5)
-            pygame.draw.circle(screen, vertice_color, self.coordinates[w], 5)
+        from render import render_edges
+        render_edges(self, screen, edges, vertice_color, edge_color)
 
     def translate(self, delta: Tuple[float, float]):
         """
-            Translates the graph by the input delta vector and returns a new graph.
+            Translates the graph by the input delta vector and returns it as a
+            view. Translations do not change distances, so the view shares
+            the distance matrix of this graph.
         """
-        translated_coordinates: List[Tuple[float, float]] = [
-            (x + delta[0], y + delta[1]) for x, y in self.coordinates
-        ]
-        return EuclideanCompleteWeightedGraph(translated_coordinates)
+        return EuclideanGraphView(self, offset=delta)
+
+
+class EuclideanGraphView(EuclideanCompleteWeightedGraph):
+    """
+        Euclidean graph that shares the storage of a parent graph: vertice i
+        is vertice indexes[i] of the parent (every vertice if indexes is
+        None) and the coordinates are shifted by offset. A view of all the
+        vertices uses the parent's distance matrix; an induced view slices
+        it if the parent already computed it, and otherwise computes its own
+        smaller matrix when needed. Costs are computed by the parent.
+    """
+
+    def __init__(
+        self,
+        parent: EuclideanCompleteWeightedGraph,
+        indexes: Optional[np.ndarray] = None,
+        offset: Tuple[float, float] = (0.0, 0.0)
+    ):
+        self.parent = parent
+        self.indexes = indexes
+        self.offset = (float(offset[0]), float(offset[1]))
+        self.dtype = parent.dtype
+        self.points = parent.points if indexes is None else parent.points[indexes]
+        if self.offset != (0.0, 0.0):
+            self.points = self.points + np.asarray(self.offset)
+        self.number_of_vertices = len(self.points)
+        self._coordinates: Optional[List[Tuple[float, float]]] = None
+        self._distance_matrix = None
+        self._cost_dict = None
+        self._adj_matrix = None
+
+    @property
+    def coordinates(self) -> List[Tuple[float, float]]:  # type: ignore
+        if self._coordinates is None:
+            self._coordinates = [(x, y) for x, y in self.points.tolist()]
+        return self._coordinates
+
+    @property
+    def distance_matrix(self) -> np.ndarray:
+        if self._distance_matrix is None:
+            if self.indexes is None:
+                self._distance_matrix = self.parent.distance_matrix
+            elif self.parent._distance_matrix is not None:
+                self._distance_matrix = \
+                    self.parent._distance_matrix[np.ix_(self.indexes, self.indexes)]
+            else:
+                self._distance_matrix = euclidean_distance_matrix(
+                    self.parent.points[self.indexes], self.dtype)
+        return self._distance_matrix
+
+    def cost(self, edges: Set[Tuple[int, int]]):
+        if self.indexes is None:
+            return self.parent.cost(edges)
+        edge_array = _edge_array(edges, self.number_of_vertices)
+        return self.parent.cost(self.indexes[edge_array].tolist())
+
+    def edge_costs(self, v_array: np.ndarray, w_array: np.ndarray) -> np.ndarray:
+        if self.indexes is None:
+            return self.parent.edge_costs(v_array, w_array)
+        return self.parent.edge_costs(self.indexes[v_array], self.indexes[w_array])
+
+    def induced_graph(self, vertices: List[int]):
+        if max(vertices) >= self.number_of_vertices:
+            print("ERROR: Input vertices must be in the graph!")
+            raise Exception
+        indexes = np.asarray(vertices, dtype=np.intp)
+        if self.indexes is not None:
+            indexes = self.indexes[indexes]
+        return EuclideanGraphView(self.parent, indexes, self.offset)
+
+    def translate(self, delta: Tuple[float, float]):
+        return EuclideanGraphView(
+            self.parent, self.indexes,
+            (self.offset[0] + delta[0], self.offset[1] + delta[1]))
 
 
 class RandomEuclideanCompleteWeightedGraph(EuclideanCompleteWeightedGraph):
@@ -249,9 +911,17 @@ class RandomEuclideanCompleteWeightedGraph(EuclideanCompleteWeightedGraph):
         self,
         number_of_vertices: int,
         interval_x: Tuple[float, float] = (0.0, 1.0),
-        interval_y: Tuple[float, float] = (0.0, 1.0)
+        interval_y: Tuple[float, float] = (0.0, 1.0),
+        dtype: type = np.float64,
+        seed: Optional[int] = None
     ):
-        coordinates = [(random.uniform(interval_x[0], interval_x[1]),
-                        random.uniform(interval_y[0], interval_y[1]))
+        """
+            Samples the points uniformly in the given intervals. With a seed
+            the instance is reproducible and the global random state is left
+            untouched.
+        """
+        generator = random if seed is None else random.Random(seed)
+        coordinates = [(generator.uniform(interval_x[0], interval_x[1]),
+                        generator.uniform(interval_y[0], interval_y[1]))
                        for _ in range(number_of_vertices)]
-        super().__init__(coordinates)
+        super().__init__(coordinates, dtype)
@@ -0,0 +1,613 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import math
+import numpy as np
+from scipy.spatial import Delaunay, cKDTree  # type: ignore
+from scipy.spatial import QhullError  # type: ignore
+
+from graph import EuclideanCompleteWeightedGraph
+from euler import EulerCycle
+from matching import kdtree_greedy_matching
+from union_find import UnionFind
+from utils import shortcut
+
+
+class PointGrid():
+    """
+        Uniform grid of points, hashed by cell, for nearest neighbour
+        queries under insertions and deletions.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[int]] = {}
+        self.bounds = [0, 0, -1, -1]
+
+    def cell(self, point: Tuple[float, float]) -> Tuple[int, int]:
+        return (math.floor(point[0]/self.cell_size), math.floor(point[1]/self.cell_size))
+
+    def add(self, vertice: int, point: Tuple[float, float]):
+        x, y = self.cell(point)
+        self.cells.setdefault((x, y), set()).add(vertice)
+        self.__extend_bounds(x, y)
+
+    def remove(self, vertice: int, point: Tuple[float, float]):
+        cell = self.cell(point)
+        self.cells[cell].discard(vertice)
+        if not self.cells[cell]:
+            del self.cells[cell]
+            # Bounds that are too large make the queries near them slow.
+            if cell[0] in self.bounds[0::2] or cell[1] in self.bounds[1::2]:
+                self.bounds = [0, 0, -1, -1]
+                for x, y in self.cells:
+                    self.__extend_bounds(x, y)
+
+    def __extend_bounds(self, x: int, y: int):
+        if self.bounds[2] < self.bounds[0]:
+            self.bounds = [x, y, x, y]
+        else:
+            self.bounds = [min(self.bounds[0], x), min(self.bounds[1], y),
+                           max(self.bounds[2], x), max(self.bounds[3], y)]
+
+    def nearest(
+        self,
+        point: Tuple[float, float],
+        k: int,
+        points: np.ndarray,
+        exclude: int = -1
+    ) -> List[Tuple[float, int]]:
+        """
+            Returns the (distance, vertice) pairs of the k nearest vertices,
+            nearest first, visiting the occupied cells around the point
+            until no closer vertex can be found.
+        """
+        found: List[Tuple[float, int]] = []
+        for bound, cells in self.__cells_around(point):
+            for cell in cells:
+                for w in self.cells.get(cell, ()):
+                    if w != exclude:
+                        found.append((math.hypot(points[w, 0] - point[0],
+                                                 points[w, 1] - point[1]), w))
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= bound:
+                    break
+        found.sort()
+        return found[:k]
+
+    def nearest_in_sectors(
+        self,
+        point: Tuple[float, float],
+        number_of_sectors: int,
+        points: np.ndarray,
+        exclude: int = -1,
+        sectors: Optional[List[int]] = None
+    ) -> List[Tuple[float, int]]:
+        """
+            Returns the (distance, vertice) pair of the nearest vertex in
+            each of number_of_sectors equal angular sectors around the point
+            (or only in the given sectors), for the sectors that hold one.
+            Sector i starts at the angle 2πi/number_of_sectors. With at least
+            6 sectors, every neighbour of the point in the euclidean MST is
+            among them: a nearer vertex in the same sector would be closer
+            to both ends. A sector is searched until its nearest vertex is
+            found or the cells left are all beyond its part of the bounds.
+        """
+        width = 2*math.pi/number_of_sectors
+        reach = [-math.inf]*number_of_sectors
+        for i in (range(number_of_sectors) if sectors is None else sectors):
+            reach[i] = self.__sector_reach(point, i*width, (i + 1)*width)
+        best = [(math.inf, -1)]*number_of_sectors
+        for bound, cells in self.__cells_around(point):
+            for cell in cells:
+                for w in self.cells.get(cell, ()):
+                    if w == exclude:
+                        continue
+                    dx, dy = points[w, 0] - point[0], points[w, 1] - point[1]
+                    sector = int((math.atan2(dy, dx) % (2*math.pi))/width) % number_of_sectors
+                    distance = math.hypot(dx, dy)
+                    if distance < best[sector][0] and reach[sector] > -math.inf:
+                        best[sector] = (distance, w)
+            if all(best[i][0] <= bound or reach[i] < bound for i in range(number_of_sectors)):
+                break
+        return sorted([pair for pair in best if pair[1] != -1])
+
+    def __cells_around(
+        self,
+        point: Tuple[float, float]
+    ) -> Iterator[Tuple[float, List[Tuple[int, int]]]]:
+        """
+            Yields the cells around the point by increasing distance, in
+            batches, each with a lower bound on the distance to the cells of
+            the later batches. Around a point inside the bounds, the batches
+            are rings of cells clipped to the bounds. For a point outside
+            them, or once the rings have visited more cells than there are
+            occupied ones, the occupied cells left are sorted by distance and
+            yielded one by one instead.
+        """
+        if not self.cells:
+            return
+        left, bottom, right, top = self.bounds
+        cx, cy = self.cell(point)
+        last_ring = max(cx - left, right - cx, cy - bottom, top - cy)
+        ring, visited = -1, 0
+        while left <= cx <= right and bottom <= cy <= top and ring < last_ring:
+            ring += 1
+            xs = range(max(cx - ring, left), min(cx + ring, right) + 1)
+            ys = range(max(cy - ring + 1, bottom), min(cy + ring - 1, top) + 1)
+            cells = []
+            if cy - ring >= bottom:
+                cells += [(x, cy - ring) for x in xs]
+            if ring > 0 and cy + ring <= top:
+                cells += [(x, cy + ring) for x in xs]
+            if cx - ring >= left:
+                cells += [(cx - ring, y) for y in ys]
+            if ring > 0 and cx + ring <= right:
+                cells += [(cx + ring, y) for y in ys]
+            # Cells beyond this ring are at least ring cells away.
+            yield ring*self.cell_size, cells
+            visited += len(cells)
+            if visited > len(self.cells):
+                break
+        if ring == last_ring:
+            return
+        keys = np.asarray(list(self.cells), dtype=np.int64)
+        keys = keys[np.maximum(np.abs(keys[:, 0] - cx), np.abs(keys[:, 1] - cy)) > ring]
+        # The distance from the point to the nearest side of each cell.
+        gaps = np.maximum(keys*self.cell_size - point, point - (keys + 1)*self.cell_size)
+        distances = np.hypot(*np.maximum(gaps, 0).T)
+        order = np.argsort(distances, kind="stable")
+        bounds = np.append(distances[order[1:]], math.inf).tolist()
+        for bound, (x, y) in zip(bounds, keys[order].tolist()):
+            yield bound, [(x, y)]
+
+    def __sector_reach(self, point: Tuple[float, float], start: float, end: float) -> float:
+        """
+            Returns the largest distance from the point to the part of the
+            bounds between the angles start and end, or -inf if the sector
+            misses the bounds. The bounds are clipped by the two sides of the
+            sector; the farthest corner of what is left is the farthest point.
+        """
+        left, bottom, right, top = self.bounds
+        size = self.cell_size
+        polygon = [(left*size, bottom*size), ((right + 1)*size, bottom*size),
+                   ((right + 1)*size, (top + 1)*size), (left*size, (top + 1)*size)]
+        px, py = point
+        for (ax, ay), sign in [((math.cos(start), math.sin(start)), 1),
+                               ((math.cos(end), math.sin(end)), -1)]:
+            sides = [sign*(ax*(y - py) - ay*(x - px)) for x, y in polygon]
+            clipped = []
+            for i, (x, y) in enumerate(polygon):
+                j = (i + 1) % len(polygon)
+                if sides[i] >= 0:
+                    clipped.append((x, y))
+                if (sides[i] < 0) != (sides[j] < 0):
+                    t = sides[i]/(sides[i] - sides[j])
+                    clipped.append((x + t*(polygon[j][0] - x), y + t*(polygon[j][1] - y)))
+            polygon = clipped
+            if not polygon:
+                return -math.inf
+        return max(math.hypot(x - px, y - py) for x, y in polygon)
+
+
+class IncrementalChristofides():
+    """
+        Christofides tour of a set of euclidean points that changes a few
+        points at a time. Vertices keep their id for their whole life; ids
+        of deleted vertices are not reused.
+
+        The tree is the exact MST of a sparse candidate graph: Delaunay and
+        k nearest neighbour edges at construction; for later points, their
+        k nearest neighbours and the nearest vertex in each of
+        number_of_sectors angular sectors around them. A new candidate edge
+        closes a cycle in the tree and replaces its most expensive edge if
+        it is cheaper. The sector neighbours hold every euclidean MST edge
+        of a new point, so an insertion keeps an euclidean MST exact.
+        Deleting a vertex splits the tree; only the smaller parts are
+        explored, and they are reconnected with the cheapest candidate
+        edges leaving them, after the neighbours for which the vertex was
+        the nearest in a sector get the next nearest one. This is not
+        guaranteed to find every new euclidean MST edge, so after deletions
+        the tree is only the MST of the candidate graph, and can be
+        slightly longer than the euclidean MST.
+        The matching is repaired around the vertices whose degree parity
+        changed and the tour is patched by cheapest insertion and splicing.
+        No distance matrix is ever built and the cost of an update depends
+        on the tree paths and components it touches, not on n.
+        christofides_tour rebuilds the tour from the current MST and
+        matching in O(n).
+    """
+    number_of_sectors = 8
+
+    def __init__(
+        self,
+        coordinates: Iterable[Tuple[float, float]],
+        number_of_neighbours: int = 8
+    ):
+        points = np.asarray(list(coordinates), dtype=np.float64).reshape(-1, 2)
+        number_of_vertices = len(points)
+        self.number_of_neighbours = number_of_neighbours
+        self.points = np.zeros((max(2*number_of_vertices, 16), 2))
+        self.points[:number_of_vertices] = points
+        self.active = np.zeros(len(self.points), dtype=bool)
+        self.active[:number_of_vertices] = True
+        self.size = number_of_vertices
+        self.number_of_active_vertices = number_of_vertices
+        cell_size = 1.0
+        if number_of_vertices > 1:
+            extent = points.max(axis=0) - points.min(axis=0)
+            area = max(float(extent[0]*extent[1]), float(max(extent))**2/number_of_vertices)
+            cell_size = math.sqrt(area/number_of_vertices)*1.5 or 1.0
+        self.grid = PointGrid(cell_size)
+        for v, (x, y) in enumerate(points.tolist()):
+            self.grid.add(v, (x, y))
+        self.candidates: Dict[int, Set[int]] = {v: set() for v in range(number_of_vertices)}
+        for v, w in self.__initial_candidate_edges(points):
+            self.candidates[v].add(w)
+            self.candidates[w].add(v)
+        self.tree: Set[Tuple[int, int]] = set()
+        self.tree_adjacency: Dict[int, Set[int]] = {v: set() for v in range(number_of_vertices)}
+        self.degrees = np.zeros(len(self.points), dtype=np.intp)
+        self.__build_tree()
+        self.mate: Dict[int, int] = {}
+        odd = [v for v in range(number_of_vertices) if self.degrees[v] % 2 == 1]
+        if odd:
+            local_mate = kdtree_greedy_matching(points[odd], number_of_neighbours).tolist()
+            for i, j in enumerate(local_mate):
+                self.mate[odd[i]] = odd[j]
+        self.christofides_tour()
+
+    def insert(self, point: Tuple[float, float], vertice: Optional[int] = None) -> int:
+        """
+            Adds a point and returns its id.
+        """
+        if vertice is None:
+            vertice = self.size
+            self.size += 1
+            if vertice >= len(self.points):
+                self.points = np.concatenate([self.points, np.zeros_like(self.points)])
+                self.active = np.concatenate([self.active, np.zeros_like(self.active)])
+                self.degrees = np.concatenate([self.degrees, np.zeros_like(self.degrees)])
+        self.points[vertice] = point
+        self.active[vertice] = True
+        self.number_of_active_vertices += 1
+        x, y = float(point[0]), float(point[1])
+        nearest = self.grid.nearest((x, y), self.number_of_neighbours, self.points)
+        sectors = self.grid.nearest_in_sectors((x, y), self.number_of_sectors, self.points)
+        self.grid.add(vertice, (x, y))
+        self.candidates[vertice] = set()
+        for _, w in nearest + sectors:
+            self.candidates[vertice].add(w)
+            self.candidates[w].add(vertice)
+        self.tree_adjacency[vertice] = set()
+        changed = {vertice}
+        for w in self.candidates[vertice]:
+            self.__insert_tree_edge(vertice, w, changed)
+        self.__repair_matching(changed)
+        self.__insert_in_tour(vertice, [w for _, w in nearest])
+        return vertice
+
+    def delete(self, vertice: int):
+        if vertice >= self.size or not self.active[vertice]:
+            print(f"ERROR: Vertice {vertice} is not in the instance.")
+            raise Exception
+        x, y = self.points[vertice].tolist()
+        self.grid.remove(vertice, (x, y))
+        self.active[vertice] = False
+        self.number_of_active_vertices -= 1
+        self.__remove_from_tour(vertice)
+        # Neighbours for which the vertice was the nearest vertex of its
+        # sector get the new nearest one, and those that lost too many
+        # candidate edges get new nearest neighbours.
+        new_edges: List[Tuple[int, int]] = []
+        for w in self.candidates.pop(vertice):
+            self.candidates[w].discard(vertice)
+            point = tuple(self.points[w].tolist())
+            sector = self.__sector(w, vertice)
+            distance = self.__cost(w, vertice)
+            nearest: List[Tuple[float, int]] = []
+            if not any(self.__sector(w, u) == sector and self.__cost(w, u) < distance
+                       for u in self.candidates[w]):
+                nearest = self.grid.nearest_in_sectors(
+                    point, self.number_of_sectors, self.points, w, [sector])
+            if len(self.candidates[w]) < self.number_of_neighbours//2:
+                nearest += self.grid.nearest(point, self.number_of_neighbours, self.points, w)
+            for _, u in nearest:
+                if u not in self.candidates[w]:
+                    self.candidates[w].add(u)
+                    self.candidates[u].add(w)
+                    new_edges.append((w, u))
+        changed = {vertice}
+        tree_neighbours = list(self.tree_adjacency[vertice])
+        for w in tree_neighbours:
+            self.__remove_tree_edge(vertice, w, changed)
+        del self.tree_adjacency[vertice]
+        if len(tree_neighbours) > 1:
+            self.__reconnect(tree_neighbours, changed)
+        for v, w in new_edges:
+            self.__insert_tree_edge(v, w, changed)
+        self.__repair_matching(changed)
+
+    def move(self, vertice: int, point: Tuple[float, float]):
+        self.delete(vertice)
+        self.insert(point, vertice)
+
+    def vertices(self) -> List[int]:
+        return np.flatnonzero(self.active[:self.size]).tolist()
+
+    def tour(self) -> List[int]:
+        """
+            Returns the current tour as a closed list of ids.
+        """
+        if not self.successor:
+            return []
+        start = min(self.successor)
+        tour = [start]
+        v = self.successor[start]
+        while v != start:
+            tour.append(v)
+            v = self.successor[v]
+        tour.append(start)
+        return tour
+
+    def minimum_spanning_tree(self) -> Set[Tuple[int, int]]:
+        return self.tree | set([(w, v) for v, w in self.tree])
+
+    def matching(self) -> Set[Tuple[int, int]]:
+        return set([(v, w) for v, w in self.mate.items() if v < w])
+
+    def graph(self) -> Tuple[EuclideanCompleteWeightedGraph, List[int]]:
+        """
+            Returns the euclidean graph of the current points, whose vertice
+            i is the id ids[i], together with ids.
+        """
+        ids = self.vertices()
+        return EuclideanCompleteWeightedGraph(
+            [(x, y) for x, y in self.points[ids].tolist()]), ids
+
+    def christofides_tour(self) -> List[int]:
+        """
+            Replaces the patched tour with the shortcut euler cycle of the
+            current MST and matching, and returns it.
+        """
+        edges = list(self.tree) + list(self.matching())
+        if edges:
+            tour = shortcut(EulerCycle(edges).euler_cycle_iterator())
+        else:
+            tour = self.vertices()[:1]*2
+        self.successor: Dict[int, int] = {}
+        self.predecessor: Dict[int, int] = {}
+        for v, w in zip(tour[:-1], tour[1:]):
+            self.successor[v] = w
+            self.predecessor[w] = v
+        self.cost = sum([self.__cost(v, w) for v, w in zip(tour[:-1], tour[1:])])
+        return tour
+
+    def __cost(self, v: int, w: int) -> float:
+        points = self.points
+        return math.hypot(points[v, 0] - points[w, 0], points[v, 1] - points[w, 1])
+
+    def __sector(self, v: int, w: int) -> int:
+        """
+            Returns the sector of w around v, as in PointGrid.nearest_in_sectors.
+        """
+        points = self.points
+        angle = math.atan2(points[w, 1] - points[v, 1], points[w, 0] - points[v, 0]) % (2*math.pi)
+        return int(angle/(2*math.pi/self.number_of_sectors)) % self.number_of_sectors
+
+    def __initial_candidate_edges(self, points: np.ndarray) -> List[Tuple[int, int]]:
+        number_of_vertices = len(points)
+        if number_of_vertices < 2:
+            return []
+        if number_of_vertices <= self.number_of_neighbours + 1:
+            return [(v, w) for v in range(number_of_vertices)
+                    for w in range(v+1, number_of_vertices)]
+        _, neighbours = cKDTree(points).query(points, k=self.number_of_neighbours + 1)
+        edges = [(v, w) for v, row in enumerate(neighbours[:, 1:].tolist())
+                 for w in row if v != w]
+        try:
+            triangulation = Delaunay(points)
+            indptr, indices = triangulation.vertex_neighbor_vertices
+            for v in range(number_of_vertices):
+                edges += [(v, w) for w in indices[indptr[v]:indptr[v+1]].tolist()]
+            coplanar = triangulation.coplanar
+            edges += [(v, w) for v, _, w in coplanar.tolist()]
+        except (QhullError, ValueError):
+            pass
+        return edges
+
+    def __edges_of(self, vertices: Iterable[int]) -> List[Tuple[int, int]]:
+        return [(v, w) for v in vertices for w in self.candidates[v] if v < w]
+
+    def __build_tree(self):
+        """
+            Kruskal over all the candidate edges.
+        """
+        edges = self.__edges_of(range(self.size))
+        if not edges:
+            return
+        edge_array = np.asarray(edges, dtype=np.intp)
+        costs = np.hypot(*(self.points[edge_array[:, 0]] - self.points[edge_array[:, 1]]).T)
+        edge_array = edge_array[np.argsort(costs, kind="stable")]
+        merged = UnionFind(self.size).union_many(edge_array[:, 0], edge_array[:, 1])
+        for v, w in edge_array[merged].tolist():
+            self.__add_tree_edge(v, w, set())
+
+    def __add_tree_edge(self, v: int, w: int, changed: Set[int]):
+        self.tree.add((min(v, w), max(v, w)))
+        self.tree_adjacency[v].add(w)
+        self.tree_adjacency[w].add(v)
+        self.degrees[v] += 1
+        self.degrees[w] += 1
+        changed.add(v)
+        changed.add(w)
+
+    def __remove_tree_edge(self, v: int, w: int, changed: Set[int]):
+        self.tree.discard((min(v, w), max(v, w)))
+        self.tree_adjacency[v].discard(w)
+        self.tree_adjacency[w].discard(v)
+        self.degrees[v] -= 1
+        self.degrees[w] -= 1
+        changed.add(v)
+        changed.add(w)
+
+    def __insert_tree_edge(self, v: int, w: int, changed: Set[int]):
+        """
+            Adds the candidate edge (v, w) to the tree if it connects two
+            components, or if it is cheaper than the most expensive edge on
+            the tree path between v and w, which it then replaces.
+        """
+        path = self.__tree_path(v, w)
+        if path is None:
+            self.__add_tree_edge(v, w, changed)
+            return
+        costs = [self.__cost(a, b) for a, b in zip(path[:-1], path[1:])]
+        i = int(np.argmax(costs))
+        if costs[i] > self.__cost(v, w):
+            self.__remove_tree_edge(path[i], path[i+1], changed)
+            self.__add_tree_edge(v, w, changed)
+
+    def __tree_path(self, v: int, w: int) -> Optional[List[int]]:
+        """
+            Returns the tree path from v to w, or None if they are not
+            connected, with a BFS that grows from both ends.
+        """
+        if v == w:
+            return [v]
+        parents = [{v: -1}, {w: -1}]
+        frontiers = [[v], [w]]
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            next_frontier = []
+            for u in frontiers[side]:
+                for x in self.tree_adjacency[u]:
+                    if x in parents[side]:
+                        continue
+                    parents[side][x] = u
+                    if x in parents[1 - side]:
+                        halves = []
+                        for half in (0, 1):
+                            y, part = x, []
+                            while y != -1:
+                                part.append(y)
+                                y = parents[half][y]
+                            halves.append(part)
+                        return halves[0][::-1] + halves[1][1:]
+                    next_frontier.append(x)
+            frontiers[side] = next_frontier
+        return None
+
+    def __reconnect(self, roots: List[int], changed: Set[int]):
+        """
+            Reconnects the components of the tree that contain the roots, the
+            former tree neighbours of a deleted vertex. The components are
+            explored together, one vertex each in turn, until only one is
+            left unexplored, so the largest one is never walked. Then the
+            cheapest candidate edges between components are added.
+        """
+        labels: Dict[int, int] = {}
+        stacks = {label: [root] for label, root in enumerate(roots)}
+        for label, root in enumerate(roots):
+            labels[root] = label
+        explored: Dict[int, List[int]] = {label: [] for label in stacks}
+        while len(stacks) > 1:
+            for label in list(stacks.keys()):
+                stack = stacks[label]
+                if not stack:
+                    del stacks[label]
+                    if len(stacks) == 1:
+                        break
+                    continue
+                u = stack.pop()
+                explored[label].append(u)
+                for x in self.tree_adjacency[u]:
+                    if x not in labels:
+                        labels[x] = label
+                        stack.append(x)
+        # Every vertex that is not in an explored component is in the last one.
+        rest = next(iter(stacks))
+        crossing: List[Tuple[float, int, int, int, int]] = []
+        for label, vertices in explored.items():
+            if label == rest:
+                continue
+            for v in vertices:
+                for w in self.candidates[v]:
+                    w_label = labels.get(w, rest)
+                    if w_label != label:
+                        crossing.append((self.__cost(v, w), label, w_label, v, w))
+        crossing.sort()
+        uf = UnionFind(len(roots))
+        for _, label, w_label, v, w in crossing:
+            if uf.union(label, w_label):
+                self.__add_tree_edge(v, w, changed)
+
+    def __repair_matching(self, changed: Set[int]):
+        """
+            Unmatches the vertices that are no longer odd (and their mates),
+            matches the odd vertices left unmatched greedily among
+            themselves and improves the new pairs with local 2-opt moves.
+        """
+        def is_odd(v: int) -> bool:
+            return bool(self.active[v]) and self.degrees[v] % 2 == 1
+        unmatched: Set[int] = set()
+        for v in changed:
+            if v in self.mate and not is_odd(v):
+                u = self.mate.pop(v)
+                del self.mate[u]
+                unmatched.add(u)
+            elif is_odd(v) and v not in self.mate:
+                unmatched.add(v)
+        pending = [v for v in unmatched if is_odd(v) and v not in self.mate]
+        new_pairs: List[Tuple[int, int]] = []
+        while pending:
+            v = pending.pop()
+            i = min(range(len(pending)), key=(lambda i: self.__cost(v, pending[i])))
+            w = pending.pop(i)
+            self.mate[v], self.mate[w] = w, v
+            new_pairs.append((v, w))
+        for a, _ in new_pairs:
+            for _, c in self.grid.nearest(tuple(self.points[a].tolist()),
+                                          self.number_of_neighbours, self.points, a):
+                b = self.mate[a]
+                if c not in self.mate or c == b:
+                    continue
+                d = self.mate[c]
+                current = self.__cost(a, b) + self.__cost(c, d)
+                if self.__cost(a, c) + self.__cost(b, d) < current - 1e-12:
+                    self.mate[a], self.mate[c], self.mate[b], self.mate[d] = c, a, d, b
+                elif self.__cost(a, d) + self.__cost(b, c) < current - 1e-12:
+                    self.mate[a], self.mate[d], self.mate[b], self.mate[c] = d, a, c, b
+
+    def __insert_in_tour(self, vertice: int, nearest: List[int]):
+        """
+            Inserts the vertice where it lengthens the tour the least, among
+            the tour edges next to its nearest neighbours.
+        """
+        if not self.successor:
+            self.successor[vertice] = self.predecessor[vertice] = vertice
+            self.cost = 0.0
+            return
+        if len(self.successor) <= self.number_of_neighbours:
+            nearest = list(self.successor)
+        best, best_delta = nearest[0], math.inf
+        for c in nearest:
+            for x in (self.predecessor[c], c):
+                y = self.successor[x]
+                delta = self.__cost(x, vertice) + self.__cost(vertice, y) - self.__cost(x, y)
+                if delta < best_delta:
+                    best, best_delta = x, delta
+        y = self.successor[best]
+        self.successor[best], self.predecessor[vertice] = vertice, best
+        self.successor[vertice], self.predecessor[y] = y, vertice
+        self.cost += best_delta
+
+    def __remove_from_tour(self, vertice: int):
+        x, y = self.predecessor.pop(vertice), self.successor.pop(vertice)
+        if x == vertice:
+            self.cost = 0.0
+            return
+        self.successor[x], self.predecessor[y] = y, x
+        if x == y:
+            self.cost = 0.0
+            return
+        self.cost += self.__cost(x, y) - self.__cost(x, vertice) - self.__cost(vertice, y)
@@ -0,0 +1,47 @@
+"""
+    Seeded generators of euclidean instances, as (n, 2) arrays of points in
+    the unit square.
+"""
+import math
+import numpy as np
+
+
+def uniform_points(number_of_vertices: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).random((number_of_vertices, 2))
+
+
+def clustered_points(
+    number_of_vertices: int,
+    seed: int = 0,
+    number_of_clusters: int = 0,
+    spread: float = 0.03
+) -> np.ndarray:
+    """
+        Gaussian clusters with uniformly placed centers. By default there
+        are about sqrt(n) / 2 clusters.
+    """
+    generator = np.random.default_rng(seed)
+    if number_of_clusters <= 0:
+        number_of_clusters = max(1, int(math.sqrt(number_of_vertices)/2))
+    centers = generator.random((number_of_clusters, 2))
+    labels = generator.integers(number_of_clusters, size=number_of_vertices)
+    points = centers[labels] + generator.normal(0.0, spread, (number_of_vertices, 2))
+    return np.clip(points, 0.0, 1.0)
+
+
+def grid_points(number_of_vertices: int, seed: int = 0) -> np.ndarray:
+    """
+        The first n points, in random order, of the smallest square grid with
+        at least n points. Grids are full of ties and cocircular points.
+    """
+    side = max(1, math.ceil(math.sqrt(number_of_vertices)))
+    x, y = np.meshgrid(np.arange(side), np.arange(side))
+    points = np.stack([x.reshape(-1), y.reshape(-1)], axis=1)[:number_of_vertices]/side
+    return points[np.random.default_rng(seed).permutation(number_of_vertices)]
+
+
+generators = {
+    "uniform": uniform_points,
+    "clustered": clustered_points,
+    "grid": grid_points,
+}
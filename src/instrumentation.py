@@ -0,0 +1,172 @@
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+from contextlib import contextmanager
+import time
+import tracemalloc
+
+T = TypeVar("T")
+
+
+class StageMetrics():
+    """
+        Measurements of one pipeline stage: wall time and CPU time in
+        seconds, and the peak memory allocated during the stage in bytes
+        (None when memory is not traced). Times of nested stages are not
+        included in their parent.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        wall_time: float,
+        cpu_time: float,
+        peak_memory: Optional[int] = None
+    ):
+        self.stage = stage
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_memory = peak_memory
+
+    def as_dict(self) -> Dict:
+        return {"stage": self.stage, "wall_time": self.wall_time,
+                "cpu_time": self.cpu_time, "peak_memory": self.peak_memory}
+
+    def __str__(self) -> str:
+        memory = "-" if self.peak_memory is None else f"{self.peak_memory/2**20:.2f} MiB"
+        return f"{self.stage:<14}{self.wall_time:>10.4f} s{self.cpu_time:>10.4f} s{memory:>14}"
+
+
+class SolveReport():
+    """
+        Structured per-solve report: the metrics of every stage, in order.
+    """
+
+    def __init__(self, stages: List[StageMetrics]):
+        self.stages = stages
+
+    def __getitem__(self, stage: str) -> StageMetrics:
+        for metrics in self.stages:
+            if metrics.stage == stage:
+                return metrics
+        raise KeyError(stage)
+
+    def wall_times(self) -> Dict[str, float]:
+        return {metrics.stage: metrics.wall_time for metrics in self.stages}
+
+    def total_wall_time(self) -> float:
+        return sum([metrics.wall_time for metrics in self.stages])
+
+    def as_dict(self) -> Dict:
+        return {"stages": [metrics.as_dict() for metrics in self.stages],
+                "total_wall_time": self.total_wall_time()}
+
+    def __str__(self) -> str:
+        header = f"{'STAGE':<14}{'WALL':>12}{'CPU':>12}{'PEAK MEMORY':>14}"
+        return "\n".join([header] + [str(metrics) for metrics in self.stages])
+
+
+class Instrumentation():
+    """
+        Hooks around the stages of a solve. Every finished stage is appended
+        to the report and passed to the callbacks, which can forward it to
+        any telemetry system. With trace_memory, tracemalloc measures the
+        peak allocation of every stage; it is started (and stopped again at
+        the end of the solve) only if it was not running already, and it
+        slows Python allocations down noticeably.
+    """
+
+    def __init__(
+        self,
+        trace_memory: bool = False,
+        callbacks: Optional[List[Callable[[StageMetrics], None]]] = None
+    ):
+        self.trace_memory = trace_memory
+        self.callbacks = [callback for callback in callbacks] if callbacks else []
+        self.stages: List[StageMetrics] = []
+        self.__frames: List[List[float]] = []
+        self.__started_tracing = False
+
+    def add_callback(self, callback: Callable[[StageMetrics], None]):
+        self.callbacks.append(callback)
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+
+    def stop(self) -> SolveReport:
+        if self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+        return self.report()
+
+    def report(self) -> SolveReport:
+        return SolveReport([metrics for metrics in self.stages])
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+            Context manager that measures the enclosed code as stage name.
+        """
+        memory_start = 0
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # Resetting the peak loses the one of the enclosing stage so
+            # far, which is kept in its frame instead.
+            if self.__frames:
+                self.__frames[-1][4] = max(self.__frames[-1][4],
+                                           tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        # Frame: wall start, cpu start, wall and cpu time of nested stages,
+        # and the highest traced peak of nested stages.
+        frame = [time.perf_counter(), time.process_time(), 0.0, 0.0, 0]
+        self.__frames.append(frame)
+        try:
+            yield
+        finally:
+            self.__frames.pop()
+            wall_time = time.perf_counter() - frame[0]
+            cpu_time = time.process_time() - frame[1]
+            peak_memory = None
+            if tracing and tracemalloc.is_tracing():
+                peak = max(frame[4], tracemalloc.get_traced_memory()[1])
+                peak_memory = max(0, peak - memory_start)
+                if self.__frames:
+                    self.__frames[-1][4] = max(self.__frames[-1][4], peak)
+            self.__add_to_parent(wall_time, cpu_time)
+            self.__record(StageMetrics(name, wall_time - frame[2],
+                                       cpu_time - frame[3], peak_memory))
+
+    def iterate(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        """
+            Yields the items of a lazy iterator and records the time spent
+            producing them as stage name, so that a consumer (such as the
+            shortcutting of an euler cycle) and its producer are measured
+            separately.
+        """
+        wall_time = 0.0
+        cpu_time = 0.0
+        while True:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                wall_delta = time.perf_counter() - wall_start
+                cpu_delta = time.process_time() - cpu_start
+                wall_time += wall_delta
+                cpu_time += cpu_delta
+                self.__add_to_parent(wall_delta, cpu_delta)
+            yield item
+        self.__record(StageMetrics(name, wall_time, cpu_time))
+
+    def __add_to_parent(self, wall_time: float, cpu_time: float):
+        if self.__frames:
+            self.__frames[-1][2] += wall_time
+            self.__frames[-1][3] += cpu_time
+
+    def __record(self, metrics: StageMetrics):
+        self.stages.append(metrics)
+        for callback in self.callbacks:
+            callback(metrics)
@@ -1,4 +1,5 @@
 from typing import List, Tuple, Set
+import numpy as np
 
 from graph import WeightedGraph
 from union_find import UnionFind
@@ -9,12 +10,16 @@ class Kruskal():
         self.graph = graph
 
     def minimum_spanning_tree(self) -> Set[Tuple[int, int]]:
+        """
+            Scanning the edges stops as soon as n-1 of them are accepted.
+        """
         tree: Set[Tuple[int, int]] = set()
         uf = UnionFind(self.graph.number_of_vertices)
-        sorted_edges = [e for e in self.graph.edges()]
-        sorted_edges.sort(key=(lambda e: self.graph.cost_dict[e]))
-        for v, w in sorted_edges:
-            if uf.find(v) != uf.find(w):
-                tree = tree.union({(v, w), (w, v)})
-                uf.union(v, w)
+        v_array, w_array, costs = self.graph.edge_arrays()
+        order = np.argsort(costs, kind="stable")
+        v_array, w_array = v_array[order], w_array[order]
+        merged = uf.union_many(v_array, w_array)
+        for v, w in zip(v_array[merged].tolist(), w_array[merged].tolist()):
+            tree.add((v, w))
+            tree.add((w, v))
         return tree
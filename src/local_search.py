@@ -0,0 +1,170 @@
+from typing import Callable, List, Optional
+from collections import deque
+import time
+
+from graph import WeightedGraph, EuclideanCompleteWeightedGraph
+from matching import nearest_neighbours, kdtree_neighbours, euclidean_cost
+
+# Smallest gain for a move to be applied, so that rounding errors never
+# make a move that does not shorten the tour look like an improvement.
+tolerance = 1e-9
+
+
+class TourImprovement():
+    """
+        2-opt and Or-opt local search on a tour. The tour is kept as an array
+        of vertices plus the position of every vertex, candidate moves only
+        come from the k nearest neighbours of each vertex, and don't-look bits
+        (a queue of active vertices) skip vertices whose surroundings did not
+        change. Or-opt moves segments of up to three vertices.
+    """
+
+    def __init__(
+        self,
+        graph: WeightedGraph,
+        number_of_neighbours: int = 8,
+        or_opt: bool = True,
+        time_limit: Optional[float] = None,
+        max_moves: Optional[int] = None
+    ):
+        self.graph = graph
+        self.or_opt = or_opt
+        self.time_limit = time_limit
+        self.max_moves = max_moves
+        if isinstance(graph, EuclideanCompleteWeightedGraph):
+            self.neighbours = kdtree_neighbours(graph.points, number_of_neighbours).tolist()
+            self.cost: Callable[[int, int], float] = euclidean_cost(graph.points)
+        else:
+            cost_matrix = graph.cost_matrix()
+            self.neighbours = nearest_neighbours(cost_matrix, number_of_neighbours).tolist()
+            self.cost = (lambda v, w: float(cost_matrix[v, w]))
+
+    def improve(self, tour: List[int]) -> List[int]:
+        """
+            Improves a closed tour (first vertex repeated at the end) and
+            returns the improved tour in the same format.
+        """
+        start = time.perf_counter()
+        self.order = [v for v in tour[:-1]]
+        number_of_vertices = len(self.order)
+        if number_of_vertices < 5:
+            return [v for v in tour]
+        self.position = [0 for _ in range(number_of_vertices)]
+        for i, v in enumerate(self.order):
+            self.position[v] = i
+        queue = deque(self.order)
+        active = [True for _ in range(number_of_vertices)]
+        moves = 0
+        while queue:
+            if self.max_moves is not None and moves >= self.max_moves:
+                break
+            if self.time_limit is not None and time.perf_counter() - start > self.time_limit:
+                break
+            a = queue.popleft()
+            active[a] = False
+            touched = self.__improve_two_opt(a)
+            if touched is None and self.or_opt:
+                touched = self.__improve_or_opt(a)
+            if touched is None:
+                continue
+            moves += 1
+            for v in touched:
+                if not active[v]:
+                    active[v] = True
+                    queue.append(v)
+        improved_tour = [v for v in self.order]
+        improved_tour.append(improved_tour[0])
+        return improved_tour
+
+    def __succ(self, v: int) -> int:
+        return self.order[(self.position[v] + 1) % len(self.order)]
+
+    def __pred(self, v: int) -> int:
+        return self.order[self.position[v] - 1]
+
+    def __improve_two_opt(self, a: int):
+        cost = self.cost
+        for b, forward in ((self.__succ(a), True), (self.__pred(a), False)):
+            d_ab = cost(a, b)
+            for c in self.neighbours[a]:
+                g1 = d_ab - cost(a, c)
+                if g1 <= tolerance:
+                    break
+                d = self.__succ(c) if forward else self.__pred(c)
+                # A move through a or b, e.g. with c a twin of a, is a no-op.
+                if c == a or c == b or d == a or d == b:
+                    continue
+                if g1 + cost(c, d) - cost(b, d) > tolerance:
+                    self.__two_opt_move(a, b, c, d)
+                    return (a, b, c, d)
+        return None
+
+    def __improve_or_opt(self, s1: int):
+        """
+            Tries to move the segment of 1 to 3 vertices that starts at s1
+            (in tour order) between two other consecutive vertices.
+        """
+        cost = self.cost
+        number_of_vertices = len(self.order)
+        s2 = s1
+        for _ in range(3):
+            p = self.__pred(s1)
+            nx = self.__succ(s2)
+            if nx == p:
+                return None
+            segment_position = self.position[s1]
+            segment_length = (self.position[s2] - segment_position) % number_of_vertices + 1
+            removal_gain = cost(p, s1) + cost(s2, nx) - cost(p, nx)
+            for endpoint in (s1, s2):
+                for c in self.neighbours[endpoint]:
+                    if cost(endpoint, c) >= removal_gain:
+                        break
+                    if (self.position[c] - segment_position) % number_of_vertices < segment_length:
+                        continue
+                    for x, y in ((c, self.__succ(c)), (self.__pred(c), c)):
+                        if x == p or x == s2:
+                            continue
+                        d_xy = cost(x, y)
+                        reversed_gain = removal_gain + d_xy - cost(x, s2) - cost(s1, y)
+                        forward_gain = removal_gain + d_xy - cost(x, s1) - cost(s2, y)
+                        if max(reversed_gain, forward_gain) <= tolerance:
+                            continue
+                        # The segment move as a sequence of 2-opt moves.
+                        self.__two_opt_move(p, s1, x, y)
+                        self.__two_opt_move(p, x, nx, s2)
+                        if forward_gain > reversed_gain:
+                            self.__two_opt_move(x, s2, s1, y)
+                        return (p, nx, s1, s2, x, y)
+            s2 = self.__succ(s2)
+            if s2 == p:
+                return None
+        return None
+
+    def __two_opt_move(self, a: int, b: int, c: int, d: int):
+        """
+            Replaces the tour edges (a, b) and (c, d) by (a, c) and (b, d),
+            where b follows a and d follows c in the same direction.
+        """
+        if self.__succ(a) == b:
+            self.__reverse(b, c)
+        else:
+            self.__reverse(c, b)
+
+    def __reverse(self, first: int, last: int):
+        """
+            Reverses the path that goes forward from first to last, or the
+            complementary path if it is shorter (which gives the same cycle).
+        """
+        order, position = self.order, self.position
+        number_of_vertices = len(order)
+        i, j = position[first], position[last]
+        length = (j - i) % number_of_vertices + 1
+        if 2*length > number_of_vertices:
+            i, j = (j + 1) % number_of_vertices, (i - 1) % number_of_vertices
+            length = number_of_vertices - length
+        for _ in range(length // 2):
+            v, w = order[i], order[j]
+            order[i], order[j] = w, v
+            position[w], position[v] = i, j
+            i = (i + 1) % number_of_vertices
+            j = (j - 1) % number_of_vertices
@@ -1,40 +1,268 @@
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple, Set
+import time
+import numpy as np
+from scipy.spatial import Delaunay  # type: ignore
+from scipy.spatial import QhullError  # type: ignore
 
-from kruskal import Kruskal
-from graph import WeightedGraph
+from mst import MinimumSpanningTree, dense_prim
+from graph import WeightedGraph, EuclideanCompleteWeightedGraph, SparseWeightedGraph
+from union_find import UnionFind
 
 
 class LowerBound1Tree():
-    def __init__(self, graph: WeightedGraph):
+    def __init__(
+        self,
+        graph: WeightedGraph,
+        minimum_spanning_tree: Optional[Set[Tuple[int, int]]] = None
+    ):
+        """
+            The minimum spanning tree of the graph can be passed in when it
+            was already computed; it is computed here otherwise.
+        """
+        if graph.number_of_vertices < 3:
+            print("ERROR: A 1-tree needs at least three vertices.")
+            raise Exception
         self.graph = graph
+        if minimum_spanning_tree is None:
+            minimum_spanning_tree = MinimumSpanningTree(graph).minimum_spanning_tree()
+        self.minimum_spanning_tree = minimum_spanning_tree
 
     def get_maximum_1_tree(self) -> Tuple[Set[Tuple[int, int]], float]:
-        max_cost = 0
-        max_tree = set()
+        """
+            Returns the 1-tree of maximum cost over all choices of the special
+            vertex v, together with its cost. The MST of the graph without v
+            is derived from the single MST of the graph: removing v splits it
+            into deg(v) components, which are reconnected with the cheapest
+            edges between them.
+        """
+        number_of_vertices = self.graph.number_of_vertices
+        tree_edges = [(v, w) for v, w in self.minimum_spanning_tree if v < w]
+        if len(tree_edges) != number_of_vertices - 1:
+            print("ERROR: The graph must be connected.")
+            raise Exception
+        tree_cost = self.graph.cost(tree_edges)
+        children: List[List[int]] = [[] for _ in range(number_of_vertices)]
+        adjacency: List[List[int]] = [[] for _ in range(number_of_vertices)]
+        for v, w in tree_edges:
+            adjacency[v].append(w)
+            adjacency[w].append(v)
+        # Root the tree at 0 and number the vertices in DFS order, so that
+        # every subtree is an interval [tin, tout] of that numbering.
+        parent = [-1 for _ in range(number_of_vertices)]
+        tin = [0 for _ in range(number_of_vertices)]
+        tout = [0 for _ in range(number_of_vertices)]
+        counter = 0
+        stack = [(0, False)]
+        visited = [False for _ in range(number_of_vertices)]
+        while stack:
+            u, closing = stack.pop()
+            if closing:
+                tout[u] = counter - 1
+                continue
+            visited[u] = True
+            tin[u] = counter
+            counter += 1
+            stack.append((u, True))
+            for w in reversed(adjacency[u]):
+                if not visited[w]:
+                    parent[w] = u
+                    children[u].append(w)
+                    stack.append((w, False))
+        tin_array = np.asarray(tin)
+        tree_array = np.asarray(tree_edges)
+        incident_costs = np.zeros(number_of_vertices)
+        np.add.at(incident_costs, tree_array.reshape(-1),
+                  np.repeat(self.graph.edge_costs(tree_array[:, 0], tree_array[:, 1]), 2))
+        candidates = self.__candidate_edges()
+        max_cost = -np.inf
+        max_choice: Tuple[int, List[Tuple[int, int]], Tuple[Tuple[int, int], Tuple[int, int]]] = \
+            (0, [], ((0, 1), (0, 2)))
         for v in self.graph.vertices():
-            graph_without_v_edges = self.graph.remove_edges(
-                set([e for e in self.graph.edges() if v in list(e)])
-            )
-            v_mst = Kruskal(graph_without_v_edges).minimum_spanning_tree()
-            v_mst_without_duplicates: Set[Tuple[int, int]] = set()
-            for e in v_mst:
-                if (e[1], e[0]) not in v_mst_without_duplicates:
-                    v_mst_without_duplicates.add(e)
-            one_tree = v_mst_without_duplicates.union(
-                self.__two_cheapest_edges(v)
-            )
-            cost = self.graph.cost(one_tree)
+            v_tree_cost = tree_cost - incident_costs[v]
+            reconnecting_edges: List[Tuple[int, int]] = []
+            if len(adjacency[v]) > 1:
+                labels = self.__component_labels(v, children[v], tin_array, tin, tout)
+                reconnecting_edges = self.__reconnect(v, labels, len(adjacency[v]), candidates)
+                reconnecting_array = np.asarray(reconnecting_edges)
+                v_tree_cost += self.graph.edge_costs(
+                    reconnecting_array[:, 0], reconnecting_array[:, 1]).sum()
+            two_cheapest, two_cheapest_cost = self.__two_cheapest_edges(v)
+            cost = v_tree_cost + two_cheapest_cost
             if cost > max_cost:
                 max_cost = cost
-                max_tree = one_tree
-        return max_tree, max_cost
+                max_choice = (v, reconnecting_edges, two_cheapest)
+        v, reconnecting_edges, two_cheapest = max_choice
+        max_tree = set([e for e in tree_edges if v not in e] + reconnecting_edges)
+        max_tree = max_tree.union(two_cheapest)
+        return max_tree, self.graph.cost(max_tree)
+
+    def held_karp_bound(
+        self,
+        max_iterations: int = 1000,
+        time_limit: Optional[float] = None,
+        upper_bound: Optional[float] = None,
+        initial_step: float = 2.0,
+        special_vertice: int = 0
+    ) -> Tuple[Set[Tuple[int, int]], float]:
+        """
+            Held-Karp lower bound by subgradient optimization of vertex
+            penalties. It works on the dense cost matrix, also for sparse
+            graphs. Each iteration computes the minimum 1-tree for the
+            costs c(v, w) + pi[v] + pi[w] and moves pi along deg - 2. The step
+            size is initial_step * (upper_bound - bound) / |deg - 2|², and
+            initial_step is halved whenever the bound stops improving for a
+            while. Stops after max_iterations, after time_limit seconds, or
+            when the 1-tree is a tour. Returns the best 1-tree and its bound.
+        """
+        start = time.perf_counter()
+        number_of_vertices = self.graph.number_of_vertices
+        cost_matrix = np.asarray(self.graph.cost_matrix(), dtype=np.float64)
+        if upper_bound is None:
+            # Doubling the MST gives a tour at most twice its cost.
+            upper_bound = 2*self.graph.cost(
+                [(v, w) for v, w in self.minimum_spanning_tree if v < w])
+        others = np.asarray([v for v in self.graph.vertices() if v != special_vertice])
+        penalties = np.zeros(number_of_vertices)
+        step = initial_step
+        period = max(number_of_vertices // 2, 10)
+        iterations_without_improvement = 0
+        best_bound = -np.inf
+        best_tree: Set[Tuple[int, int]] = set()
+        for _ in range(max_iterations):
+            penalized = cost_matrix + penalties[:, None] + penalties[None, :]
+            parent = dense_prim(penalized[np.ix_(others, others)])
+            one_tree = [(int(others[parent[i]]), int(others[i]))
+                        for i in range(len(others)) if parent[i] >= 0]
+            special_costs = penalized[special_vertice].copy()
+            special_costs[special_vertice] = np.inf
+            cheapest = np.argsort(special_costs, kind="stable")[:2].tolist()
+            one_tree += [(special_vertice, cheapest[0]), (special_vertice, cheapest[1])]
+            edge_array = np.asarray(one_tree)
+            bound = float(penalized[edge_array[:, 0], edge_array[:, 1]].sum()
+                          - 2*penalties.sum())
+            if bound > best_bound + 1e-12:
+                best_bound = bound
+                best_tree = set(one_tree)
+                iterations_without_improvement = 0
+            else:
+                iterations_without_improvement += 1
+                if iterations_without_improvement >= period:
+                    step /= 2
+                    iterations_without_improvement = 0
+            degrees = np.bincount(edge_array.reshape(-1), minlength=number_of_vertices)
+            subgradient = degrees - 2
+            norm = float((subgradient*subgradient).sum())
+            if norm == 0 or step < 1e-6:
+                break
+            if time_limit is not None and time.perf_counter() - start > time_limit:
+                break
+            penalties += step*max(upper_bound - bound, 1e-9)/norm*subgradient
+        return best_tree, best_bound
+
+    def __candidate_edges(self) -> Optional[Tuple[np.ndarray, np.ndarray, List[List[int]]]]:
+        """
+            For euclidean graphs, returns the Delaunay edges and the Delaunay
+            neighbours of every vertex. The MST of the graph without v only
+            uses Delaunay edges and edges between Delaunay neighbours of v.
+            Sparse graphs return their own edges, with no extra neighbours.
+            Returns None when the dense cost matrix has to be used instead.
+        """
+        if isinstance(self.graph, SparseWeightedGraph):
+            v_array, w_array, _ = self.graph.edge_arrays()
+            return v_array, w_array, [[] for _ in self.graph.vertices()]
+        if not isinstance(self.graph, EuclideanCompleteWeightedGraph):
+            return None
+        try:
+            triangulation = Delaunay(self.graph.points)
+        except (QhullError, ValueError):
+            return None
+        if len(triangulation.coplanar) > 0:
+            return None
+        indptr, indices = triangulation.vertex_neighbor_vertices
+        neighbours = [indices[indptr[v]:indptr[v+1]].tolist()
+                      for v in self.graph.vertices()]
+        v_array = np.repeat(np.arange(self.graph.number_of_vertices), np.diff(indptr))
+        w_array = indices
+        keep = v_array < w_array
+        return v_array[keep], w_array[keep], neighbours
+
+    def __component_labels(self, v, v_children, tin_array, tin, tout) -> np.ndarray:
+        """
+            Labels every vertex with its component in the MST without v: the
+            subtree of the i-th child of v gets label i, the rest of the tree
+            gets label len(v_children). v itself gets label -1.
+        """
+        v_children = sorted(v_children, key=(lambda c: tin[c]))
+        child_tins = np.asarray([tin[c] for c in v_children])
+        child_touts = np.asarray([tout[c] for c in v_children])
+        labels = np.full(len(tin_array), len(v_children))
+        if len(v_children) > 0:
+            index = np.searchsorted(child_tins, tin_array, side="right") - 1
+            inside = (index >= 0) & (tin_array <= child_touts[np.maximum(index, 0)])
+            labels[inside] = index[inside]
+        labels[v] = -1
+        return labels
+
+    def __reconnect(self, v, labels, number_of_components, candidates) -> List[Tuple[int, int]]:
+        """
+            Returns the cheapest edges reconnecting the components of the MST
+            without v, with a Kruskal over the cheapest edge between every
+            pair of components.
+        """
+        best: dict = {}
+        if candidates is not None:
+            v_array, w_array, neighbours = candidates
+            ring = np.asarray(neighbours[v], dtype=np.intp)
+            ring_v, ring_w = np.meshgrid(ring, ring)
+            v_array = np.concatenate([v_array, ring_v.reshape(-1)])
+            w_array = np.concatenate([w_array, ring_w.reshape(-1)])
+            crossing = (labels[v_array] != labels[w_array]) & \
+                (labels[v_array] >= 0) & (labels[w_array] >= 0)
+            v_array, w_array = v_array[crossing], w_array[crossing]
+            costs = self.graph.edge_costs(v_array, w_array)
+            for a, b, cost in zip(v_array.tolist(), w_array.tolist(), costs.tolist()):
+                key = (min(labels[a], labels[b]), max(labels[a], labels[b]))
+                if key not in best or cost < best[key][0]:
+                    best[key] = (cost, a, b)
+        else:
+            cost_matrix = self.graph.cost_matrix()
+            members = [np.flatnonzero(labels == i) for i in range(number_of_components)]
+            for i in range(number_of_components):
+                for j in range(i+1, number_of_components):
+                    block = cost_matrix[np.ix_(members[i], members[j])]
+                    a, b = np.unravel_index(np.argmin(block), block.shape)
+                    best[(i, j)] = (float(block[a, b]), int(members[i][a]), int(members[j][b]))
+        uf = UnionFind(number_of_components)
+        reconnecting_edges: List[Tuple[int, int]] = []
+        for (i, j), (_, a, b) in sorted(best.items(), key=(lambda item: item[1][0])):
+            if uf.union(i, j):
+                reconnecting_edges.append((a, b))
+        if len(reconnecting_edges) != number_of_components - 1:
+            # Delaunay candidates can miss edges of degenerate point sets;
+            # the edges of a sparse graph are all of its edges.
+            if candidates is not None and not isinstance(self.graph, SparseWeightedGraph):
+                return self.__reconnect(v, labels, number_of_components, None)
+            print(f"ERROR: The graph without vertice {v} is not connected.")
+            raise Exception
+        return reconnecting_edges
 
-    def __two_cheapest_edges(self, v: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    def __two_cheapest_edges(
+        self,
+        v: int
+    ) -> Tuple[Tuple[Tuple[int, int], Tuple[int, int]], float]:
         """
-            Returns the two edges from v that have the lowest cost. If v
-            does not belong in the graph, or v has less than two edges,
-            raises an Exception.
+            Returns the two edges from v that have the lowest cost, and the
+            sum of their costs. If v does not belong in the graph, or v has
+            less than two edges, raises an Exception.
         """
-        v_edges = [e for e in self.graph.edges() if e[0] == v]
-        v_edges.sort(key=(lambda e: self.graph.cost_dict[e]))
-        return (v_edges[0], v_edges[1])
+        neighbours, v_costs = self.graph.neighbourhood(v)
+        if len(neighbours) < 2:
+            print(f"ERROR: Vertice {v} has less than two edges.")
+            raise Exception
+        cheapest = np.argpartition(v_costs, 1)[:2]
+        cheapest = cheapest[np.argsort(v_costs[cheapest], kind="stable")]
+        if np.isinf(v_costs[cheapest[1]]):
+            print(f"ERROR: Vertice {v} has less than two edges.")
+            raise Exception
+        first, second = neighbours[cheapest].tolist()
+        return ((v, first), (v, second)), float(v_costs[cheapest].sum())
@@ -0,0 +1,541 @@
+from typing import Callable, List, Tuple
+import math
+import numpy as np
+from scipy.spatial import cKDTree  # type: ignore
+
+from graph import euclidean_distance_matrix
+
+
+def matching_pairs(mate: np.ndarray) -> List[Tuple[int, int]]:
+    """
+        Converts a mate array (mate[v] is the vertex matched to v, or -1)
+        into the list of matched pairs (v, w) with v < w.
+    """
+    return [(v, w) for v, w in enumerate(mate.tolist()) if v < w]
+
+
+def matching_cost(cost_matrix: np.ndarray, mate: np.ndarray) -> float:
+    vertices = np.flatnonzero(mate > np.arange(len(mate)))
+    return float(cost_matrix[vertices, mate[vertices]].sum())
+
+
+def blossom_matching(cost_matrix: np.ndarray) -> np.ndarray:
+    """
+        Exact minimum weight perfect matching of the complete graph given by
+        the (k, k) cost matrix, with Edmonds' blossom algorithm in O(k³).
+        Costs are turned into integer weights scaled to 2^40, so the result
+        is optimal up to a relative error of about 1e-12.
+    """
+    number_of_vertices = len(cost_matrix)
+    v_array, w_array = np.triu_indices(number_of_vertices, 1)
+    return sparse_blossom_matching(
+        number_of_vertices, v_array, w_array, cost_matrix[v_array, w_array])
+
+
+def sparse_blossom_matching(
+    number_of_vertices: int,
+    v_array: np.ndarray,
+    w_array: np.ndarray,
+    costs: np.ndarray
+) -> np.ndarray:
+    """
+        Exact minimum weight perfect matching of the graph given by its
+        edges (v_array[i], w_array[i]) with costs[i], each listed once.
+    """
+    if number_of_vertices % 2 != 0:
+        print("ERROR: A perfect matching needs an even number of vertices.")
+        raise Exception
+    if number_of_vertices == 0:
+        return np.zeros(0, dtype=np.intp)
+    costs = np.asarray(costs, dtype=np.float64)
+    # Infinite costs mark missing edges.
+    finite = np.isfinite(costs)
+    v_array, w_array, costs = v_array[finite], w_array[finite], costs[finite]
+    max_cost = float(costs.max()) if len(costs) > 0 else 0.0
+    scale = 2.0**40/max_cost if max_cost > 0 else 1.0
+    weights = np.rint((max_cost - costs)*scale).astype(np.int64)
+    edges = list(zip(v_array.tolist(), w_array.tolist(), weights.tolist()))
+    mate = np.asarray(_max_weight_matching(number_of_vertices, edges), dtype=np.intp)
+    if np.any(mate < 0):
+        print("ERROR: The graph has no perfect matching.")
+        raise Exception
+    return mate
+
+
+def greedy_matching(cost_matrix: np.ndarray) -> np.ndarray:
+    """
+        Greedy perfect matching: repeatedly matches the cheapest edge between
+        unmatched vertices. It is computed by matching mutual nearest
+        neighbours in rounds, which gives the same result without sorting
+        all k² edges.
+    """
+    number_of_vertices = len(cost_matrix)
+    if number_of_vertices % 2 != 0:
+        print("ERROR: A perfect matching needs an even number of vertices.")
+        raise Exception
+    mate = np.full(number_of_vertices, -1, dtype=np.intp)
+    unmatched = np.arange(number_of_vertices)
+    while len(unmatched) > 0:
+        costs = np.asarray(cost_matrix[np.ix_(unmatched, unmatched)], dtype=np.float64)
+        np.fill_diagonal(costs, np.inf)
+        nearest = np.argmin(costs, axis=1)
+        mutual = np.flatnonzero(nearest[nearest] == np.arange(len(unmatched)))
+        mate[unmatched[mutual]] = unmatched[nearest[mutual]]
+        unmatched = unmatched[mate[unmatched] == -1]
+    return mate
+
+
+def kdtree_greedy_matching(
+    points: np.ndarray,
+    number_of_neighbours: int = 8,
+    dense_threshold: int = 512
+) -> np.ndarray:
+    """
+        Greedy perfect matching of euclidean points that only looks at the
+        edges to the k nearest neighbours, found with a KD-tree. Vertices
+        left unmatched are retried among themselves with twice as many
+        neighbours; the last few are matched with the dense greedy.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    number_of_vertices = len(points)
+    if number_of_vertices % 2 != 0:
+        print("ERROR: A perfect matching needs an even number of vertices.")
+        raise Exception
+    mate = np.full(number_of_vertices, -1, dtype=np.intp)
+    unmatched = np.arange(number_of_vertices)
+    k = number_of_neighbours
+    while len(unmatched) > dense_threshold:
+        unmatched_points = points[unmatched]
+        distances, neighbours = cKDTree(unmatched_points).query(
+            unmatched_points, k=min(k + 1, len(unmatched)))
+        v_array = np.repeat(np.arange(len(unmatched)), neighbours.shape[1] - 1)
+        w_array = neighbours[:, 1:].reshape(-1)
+        costs = distances[:, 1:].reshape(-1)
+        order = np.argsort(costs, kind="stable")
+        local_mate = [-1 for _ in range(len(unmatched))]
+        for v, w in zip(v_array[order].tolist(), w_array[order].tolist()):
+            if local_mate[v] == -1 and local_mate[w] == -1 and v != w:
+                local_mate[v] = w
+                local_mate[w] = v
+        local_mate_array = np.asarray(local_mate, dtype=np.intp)
+        matched = local_mate_array >= 0
+        mate[unmatched[matched]] = unmatched[local_mate_array[matched]]
+        unmatched = unmatched[~matched]
+        k *= 2
+    if len(unmatched) > 0:
+        local_mate_array = greedy_matching(
+            euclidean_distance_matrix(points[unmatched]))
+        mate[unmatched] = unmatched[local_mate_array]
+    return mate
+
+
+def two_opt_matching(
+    mate: np.ndarray,
+    cost: Callable[[int, int], float],
+    neighbours: np.ndarray,
+    max_passes: int = 10
+) -> np.ndarray:
+    """
+        Improves a perfect matching by 2-opt moves: two matched edges (a, b)
+        and (c, d) are replaced by (a, c) and (b, d) whenever that is
+        cheaper. Only the candidates c in the neighbour list of a are tried.
+        The input mate array is not modified.
+    """
+    mate_list = mate.tolist()
+    neighbour_lists = neighbours.tolist()
+    for _ in range(max_passes):
+        improved = False
+        for a in range(len(mate_list)):
+            for c in neighbour_lists[a]:
+                b = mate_list[a]
+                d = mate_list[c]
+                if c == a or c == b:
+                    continue
+                if cost(a, c) + cost(b, d) < cost(a, b) + cost(c, d) - 1e-12:
+                    mate_list[a], mate_list[c] = c, a
+                    mate_list[b], mate_list[d] = d, b
+                    improved = True
+        if not improved:
+            break
+    return np.asarray(mate_list, dtype=np.intp)
+
+
+def nearest_neighbours(cost_matrix: np.ndarray, number_of_neighbours: int) -> np.ndarray:
+    """
+        Returns, for every row of the cost matrix, the indexes of its
+        number_of_neighbours cheapest columns (excluding itself).
+    """
+    number_of_vertices = len(cost_matrix)
+    k = min(number_of_neighbours, number_of_vertices - 1)
+    if k <= 0:
+        return np.zeros((number_of_vertices, 0), dtype=np.intp)
+    costs = np.array(cost_matrix, dtype=np.float64)
+    np.fill_diagonal(costs, np.inf)
+    neighbours = np.argpartition(costs, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(costs, neighbours, axis=1), axis=1)
+    return np.take_along_axis(neighbours, order, axis=1)
+
+
+def kdtree_neighbours(points: np.ndarray, number_of_neighbours: int) -> np.ndarray:
+    k = min(number_of_neighbours, len(points) - 1)
+    if k <= 0:
+        return np.zeros((len(points), 0), dtype=np.intp)
+    _, neighbours = cKDTree(points).query(points, k=k + 1)
+    # With duplicate points a twin can come before the vertex itself, or
+    # push it out of the k + 1 results; the last column is dropped then.
+    is_self = neighbours == np.arange(len(points))[:, None]
+    is_self[~is_self.any(axis=1), -1] = True
+    return neighbours[~is_self].reshape(len(points), k)
+
+
+def euclidean_cost(points: np.ndarray) -> Callable[[int, int], float]:
+    coordinates = np.asarray(points, dtype=np.float64).tolist()
+
+    def cost(v: int, w: int) -> float:
+        return math.hypot(coordinates[v][0] - coordinates[w][0],
+                          coordinates[v][1] - coordinates[w][1])
+    return cost
+
+
+def _max_weight_matching(number_of_vertices: int, edges: List[Tuple[int, int, int]]) -> List[int]:
+    """
+        Maximum weight matching of maximum cardinality on a general graph,
+        following Galil's O(n³) formulation of Edmonds' blossom algorithm
+        (as in the well-known implementation by Joris van Rantwijk). Edges
+        are (v, w, weight) with integer weights. Returns the mate of every
+        vertex, or -1.
+    """
+    nvertex = number_of_vertices
+    nedge = len(edges)
+    maxweight = max([0] + [wt for _, _, wt in edges])
+    # endpoint[p] is the vertex at endpoint p; edge k has endpoints 2k, 2k+1.
+    endpoint = [edges[p // 2][p % 2] for p in range(2*nedge)]
+    neighbend: List[List[int]] = [[] for _ in range(nvertex)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2*k + 1)
+        neighbend[j].append(2*k)
+    mate = nvertex*[-1]
+    label = (2*nvertex)*[0]
+    labelend = (2*nvertex)*[-1]
+    inblossom = list(range(nvertex))
+    blossomparent = (2*nvertex)*[-1]
+    blossomchilds: List = (2*nvertex)*[None]
+    blossombase = list(range(nvertex)) + nvertex*[-1]
+    blossomendps: List = (2*nvertex)*[None]
+    bestedge = (2*nvertex)*[-1]
+    blossombestedges: List = (2*nvertex)*[None]
+    unusedblossoms = list(range(nvertex, 2*nvertex))
+    dualvar = nvertex*[maxweight] + nvertex*[0]
+    allowedge = nedge*[False]
+    queue: List[int] = []
+
+    def slack(k):
+        i, j, wt = edges[k]
+        return dualvar[i] + dualvar[j] - 2*wt
+
+    def blossom_leaves(b):
+        stack = [b]
+        while stack:
+            t = stack.pop()
+            if t < nvertex:
+                yield t
+            else:
+                stack.extend(reversed(blossomchilds[t]))
+
+    def assign_label(w, t, p):
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(blossom_leaves(b))
+        elif t == 2:
+            base = blossombase[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2*k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        for v in blossom_leaves(b):
+            if label[inblossom[v]] == 2:
+                queue.append(v)
+            inblossom[v] = b
+        bestedgeto = (2*nvertex)*[-1]
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]] for v in blossom_leaves(bv)]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    i, j, _ = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if bj != b and label[bj] == 1 and \
+                       (bestedgeto[bj] == -1 or slack(k) < slack(bestedgeto[bj])):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [k for k in bestedgeto if k != -1]
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or slack(k) < slack(bestedge[b]):
+                bestedge[b] = k
+
+    def expand_blossom(b, endstage):
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < nvertex:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in blossom_leaves(s):
+                    inblossom[v] = s
+        if (not endstage) and label[b] == 2:
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                jstep = -1
+                endptrick = 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                for v in blossom_leaves(bv):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    assign_label(v, 2, labelend[v])
+                j += jstep
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def augment_blossom(b, v):
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= nvertex:
+            augment_blossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= nvertex:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+
+    def augment_matching(k):
+        v, w, _ = edges[k]
+        for s, p in ((v, 2*k + 1), (w, 2*k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= nvertex:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= nvertex:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in range(nvertex):
+        label[:] = (2*nvertex)*[0]
+        bestedge[:] = (2*nvertex)*[-1]
+        blossombestedges[nvertex:] = nvertex*[None]
+        allowedge[:] = nedge*[False]
+        queue[:] = []
+        for v in range(nvertex):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = scan_blossom(v, w)
+                            if base >= 0:
+                                add_blossom(base, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+            if augmented:
+                break
+            # No augmenting path with the current tight edges: update duals.
+            deltatype = -1
+            delta = deltaedge = deltablossom = None
+            for v in range(nvertex):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 2
+                        deltaedge = bestedge[v]
+            for b in range(2*nvertex):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b]) // 2
+                    if deltatype == -1 or d < delta:
+                        delta = d
+                        deltatype = 3
+                        deltaedge = bestedge[b]
+            for b in range(nvertex, 2*nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2 and \
+                   (deltatype == -1 or dualvar[b] < delta):
+                    delta = dualvar[b]
+                    deltatype = 4
+                    deltablossom = b
+            if deltatype == -1:
+                deltatype = 1
+                delta = max(0, min(dualvar[:nvertex]))
+            for v in range(nvertex):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in range(nvertex, 2*nvertex):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            elif deltatype == 4:
+                expand_blossom(deltablossom, False)
+        if not augmented:
+            break
+        for b in range(nvertex, 2*nvertex):
+            if blossomparent[b] == -1 and blossombase[b] >= 0 and \
+               label[b] == 1 and dualvar[b] == 0:
+                expand_blossom(b, True)
+    return [endpoint[p] if p >= 0 else -1 for p in mate]
@@ -0,0 +1,156 @@
+from typing import Tuple, Set
+import numpy as np
+from scipy.spatial import Delaunay, cKDTree  # type: ignore
+from scipy.spatial import QhullError  # type: ignore
+
+from graph import WeightedGraph, EuclideanCompleteWeightedGraph, SparseWeightedGraph
+from kruskal import Kruskal
+from union_find import UnionFind
+
+
+class MinimumSpanningTree():
+    """
+        Minimum spanning tree engine. Euclidean graphs are solved on a sparse
+        candidate graph (the Delaunay triangulation, which contains the
+        euclidean MST, or the k-nearest-neighbours graph) in O(n log n).
+        Sparse graphs are solved with Kruskal over their edges in O(m log m).
+        Any other WeightedGraph is solved with a dense O(n²) Prim. The tree is
+        returned in the same format as Kruskal: a set with both (v, w) and
+        (w, v) for every tree edge.
+    """
+    methods = ["auto", "delaunay", "knn", "prim", "kruskal"]
+
+    def __init__(
+        self,
+        graph: WeightedGraph,
+        method: str = "auto",
+        number_of_neighbours: int = 10
+    ):
+        if method not in self.methods:
+            print(f"ERROR: Unknown MST method {method}. Expected one of {self.methods}.")
+            raise Exception
+        if method in ["delaunay", "knn"] and \
+           not isinstance(graph, EuclideanCompleteWeightedGraph):
+            print(f"ERROR: The {method} method requires an euclidean graph.")
+            raise Exception
+        self.graph = graph
+        self.method = method
+        self.number_of_neighbours = number_of_neighbours
+
+    def minimum_spanning_tree(self) -> Set[Tuple[int, int]]:
+        method = self.method
+        if method == "auto":
+            if isinstance(self.graph, EuclideanCompleteWeightedGraph):
+                method = "delaunay"
+            elif isinstance(self.graph, SparseWeightedGraph):
+                method = "kruskal"
+            else:
+                method = "prim"
+        if method == "prim":
+            return self.__prim()
+        if method == "kruskal":
+            return Kruskal(self.graph).minimum_spanning_tree()
+        if method == "delaunay":
+            candidates = self.__delaunay_edges()
+        else:
+            candidates = self.__knn_edges()
+        if candidates is not None:
+            tree = self.__kruskal(*candidates)
+            if len(tree) == 2*(self.graph.number_of_vertices-1):
+                return tree
+        # The candidate graph was degenerate or not connected.
+        return self.__prim()
+
+    def __delaunay_edges(self):
+        points = self.graph.points  # type: ignore
+        if len(points) < 3:
+            return None
+        try:
+            triangulation = Delaunay(points)
+        except (QhullError, ValueError):
+            return None
+        simplices = triangulation.simplices
+        v_array = np.concatenate(
+            [simplices[:, 0], simplices[:, 1], simplices[:, 2]])
+        w_array = np.concatenate(
+            [simplices[:, 1], simplices[:, 2], simplices[:, 0]])
+        # Duplicated points are left out of the triangulation by qhull;
+        # they are attached to the nearest triangulated vertex instead.
+        coplanar = triangulation.coplanar
+        if len(coplanar) > 0:
+            v_array = np.concatenate([v_array, coplanar[:, 0]])
+            w_array = np.concatenate([w_array, coplanar[:, 2]])
+        return v_array, w_array
+
+    def __knn_edges(self):
+        points = self.graph.points  # type: ignore
+        number_of_vertices = len(points)
+        if number_of_vertices < 2:
+            return None
+        k = min(self.number_of_neighbours + 1, number_of_vertices)
+        _, neighbours = cKDTree(points).query(points, k=k)
+        v_array = np.repeat(np.arange(number_of_vertices), k-1)
+        w_array = neighbours[:, 1:].reshape(-1)
+        return v_array, w_array
+
+    def __kruskal(self, v_array: np.ndarray, w_array: np.ndarray) -> Set[Tuple[int, int]]:
+        """
+            Kruskal restricted to the input candidate edges.
+        """
+        v_array, w_array = np.minimum(v_array, w_array), np.maximum(v_array, w_array)
+        keep = v_array != w_array
+        candidates = np.unique(np.stack([v_array[keep], w_array[keep]], axis=1), axis=0)
+        v_array, w_array = candidates[:, 0], candidates[:, 1]
+        points = self.graph.points  # type: ignore
+        costs = np.hypot(*(points[v_array] - points[w_array]).T)
+        order = np.argsort(costs, kind="stable")
+        v_array, w_array = v_array[order], w_array[order]
+        merged = UnionFind(self.graph.number_of_vertices).union_many(v_array, w_array)
+        tree: Set[Tuple[int, int]] = set()
+        for v, w in zip(v_array[merged].tolist(), w_array[merged].tolist()):
+            tree.add((v, w))
+            tree.add((w, v))
+        return tree
+
+    def __prim(self) -> Set[Tuple[int, int]]:
+        """
+            Dense O(n²) Prim over the cost matrix. On disconnected graphs
+            it returns a minimum spanning forest.
+        """
+        parent = dense_prim(self.graph.cost_matrix())
+        tree: Set[Tuple[int, int]] = set()
+        for u, v in enumerate(parent.tolist()):
+            if v >= 0:
+                tree.add((v, u))
+                tree.add((u, v))
+        return tree
+
+
+def dense_prim(cost_matrix: np.ndarray) -> np.ndarray:
+    """
+        Dense O(n²) Prim over a cost matrix, with infinity for missing edges.
+        Returns the parent of every vertex in the spanning forest, or -1 for
+        the roots.
+    """
+    number_of_vertices = len(cost_matrix)
+    in_tree = np.zeros(number_of_vertices, dtype=bool)
+    # key[v] is the cheapest known edge from v to the tree, infinity once v
+    # joined the tree.
+    key = np.full(number_of_vertices, np.inf)
+    parent = np.full(number_of_vertices, -1)
+    better = np.empty(number_of_vertices, dtype=bool)
+    u = 0
+    for _ in range(number_of_vertices):
+        if in_tree[u] or np.isinf(key[u]):
+            # Either the first vertex or the start of a new component.
+            u = int(np.argmin(in_tree))
+            parent[u] = -1
+        in_tree[u] = True
+        key[u] = np.inf
+        u_costs = cost_matrix[u]
+        np.less(u_costs, key, out=better)
+        better &= ~in_tree
+        key[better] = u_costs[better]
+        parent[better] = u
+        u = int(np.argmin(key))
+    return parent
@@ -1,18 +1,72 @@
 from typing import List, Tuple
-import networkx as nx  # type: ignore
 
-from graph import WeightedGraph
+from graph import WeightedGraph, EuclideanCompleteWeightedGraph, SparseWeightedGraph
+from matching import blossom_matching, sparse_blossom_matching, greedy_matching, \
+    kdtree_greedy_matching, two_opt_matching, nearest_neighbours, kdtree_neighbours, \
+    euclidean_cost, matching_pairs
 
 
 class MinimumWeightPerfectMatching():
-    def __init__(self, graph: WeightedGraph):
+    """
+        Minimum weight perfect matching of a graph with an even number of
+        vertices. "blossom" is exact; "greedy" and "greedy_2opt" are fast
+        approximations on the cost matrix; "kdtree_greedy" and
+        "kdtree_greedy_2opt" only look at nearest neighbours and require an
+        euclidean graph. On a SparseWeightedGraph, "blossom" only looks at
+        its edges; the greedy methods need its dense cost matrix.
+
+        "auto" runs the cubic blossom on graphs of at most
+        blossom_max_vertices vertices and on sparse graphs, whose only
+        method it is, and otherwise "kdtree_greedy_2opt" on euclidean graphs
+        and "greedy_2opt" on the others.
+    """
+    methods = ["auto", "blossom", "greedy", "greedy_2opt", "kdtree_greedy", "kdtree_greedy_2opt"]
+    blossom_max_vertices = 100
+
+    def __init__(
+        self,
+        graph: WeightedGraph,
+        method: str = "auto",
+        number_of_neighbours: int = 8
+    ):
+        if method not in self.methods:
+            print(f"ERROR: Unknown matching method {method}. Expected one of {self.methods}.")
+            raise Exception
+        if method.startswith("kdtree") and \
+           not isinstance(graph, EuclideanCompleteWeightedGraph):
+            print(f"ERROR: The {method} method requires an euclidean graph.")
+            raise Exception
         self.graph = graph
+        self.method = method
+        self.number_of_neighbours = number_of_neighbours
 
     def minimum_weight_perfect_matching(self) -> List[Tuple[int, int]]:
-        nx_graph = nx.Graph()
-        max_weight = max([w for w in self.graph.cost_dict.values()])
-        for v, w in self.graph.edges():
-            nx_graph.add_edge(str(v), str(w),
-                              weight=max_weight+1-self.graph.cost_dict[(v, w)])
-        pm = nx.max_weight_matching(nx_graph, weight="weight")
-        return [(int(v), int(w)) for v, w in pm]
+        method = self.method
+        if method == "auto":
+            if isinstance(self.graph, SparseWeightedGraph) or \
+               self.graph.number_of_vertices <= self.blossom_max_vertices:
+                method = "blossom"
+            elif isinstance(self.graph, EuclideanCompleteWeightedGraph):
+                method = "kdtree_greedy_2opt"
+            else:
+                method = "greedy_2opt"
+        if method == "blossom" and isinstance(self.graph, SparseWeightedGraph):
+            mate = sparse_blossom_matching(
+                self.graph.number_of_vertices, *self.graph.edge_arrays())
+        elif method == "blossom":
+            mate = blossom_matching(self.graph.cost_matrix())
+        elif method.startswith("greedy"):
+            cost_matrix = self.graph.cost_matrix()
+            mate = greedy_matching(cost_matrix)
+            if method == "greedy_2opt":
+                mate = two_opt_matching(
+                    mate, lambda v, w: cost_matrix[v, w],
+                    nearest_neighbours(cost_matrix, self.number_of_neighbours))
+        else:
+            points = self.graph.points  # type: ignore
+            mate = kdtree_greedy_matching(points, self.number_of_neighbours)
+            if method == "kdtree_greedy_2opt":
+                mate = two_opt_matching(
+                    mate, euclidean_cost(points),
+                    kdtree_neighbours(points, self.number_of_neighbours))
+        return matching_pairs(mate)
@@ -0,0 +1,295 @@
+"""
+    Partitioned Christofides for euclidean instances too large to solve as a
+    whole, after Karp's partitioning algorithm: the points are split into
+    cells of bounded size, every cell is solved on its own across a process
+    pool, the cell tours are stitched along a tour of the cells and the
+    seams are repaired by 2-opt. Workers only ever see one cell, so
+    their memory is bounded by the cell size whatever the number of points.
+
+    Example, from the src directory:
+        python partition.py --points 1000000 --cell-size 5000
+"""
+from typing import Dict, List, Optional, Tuple
+import argparse
+import multiprocessing
+import os
+import numpy as np
+
+from solver import ChristofidesSolver
+from instrumentation import Instrumentation, SolveReport
+from instances import uniform_points
+
+
+class PartitionedResult():
+    """
+        tour is the closed list of vertices (the first vertex is repeated at
+        the end), cells the vertices of every cell in the order the tour
+        visits them and report the metrics of every stage.
+    """
+
+    def __init__(
+        self,
+        tour: List[int],
+        cost: float,
+        cells: List[np.ndarray],
+        report: SolveReport
+    ):
+        self.tour = tour
+        self.cost = cost
+        self.cells = cells
+        self.report = report
+        self.timings = report.wall_times()
+
+    def __str__(self) -> str:
+        return f"Cells:\t{len(self.cells)}\n" +\
+               f"Cost:\t{self.cost}"
+
+
+def solve_cell(task: Tuple[np.ndarray, Dict]) -> List[int]:
+    """
+        Worker: returns the Christofides tour of the points of one cell, as
+        an open list of indexes into them. task is (points, solver keyword
+        arguments).
+    """
+    points, solver_arguments = task
+    if len(points) < 3:
+        return list(range(len(points)))
+    return ChristofidesSolver(**solver_arguments).solve(points).tour[:-1]
+
+
+class PartitionedChristofides():
+    """
+        Christofides over cells of at most cell_size points. "kd" cuts the
+        bounding box of the points at the median of its longer side until
+        the cells are small enough, so it adapts to clustered instances;
+        "grid" is Karp's uniform grid of square cells, which are only of
+        the expected size for uniform points.
+
+        The cells are visited in the order of a tour of their centroids.
+        Every cell tour is opened at the edge that is cheapest to replace by
+        the connections to the previous and the next cell. The repair runs
+        2-opt on the path of the tour made of the repair_window vertices on
+        each side of every seam, keeping the ends of the path in place. A
+        2-opt over the whole tour would reverse paths through many cells.
+
+        Cells are solved by processes workers (all the cores by default;
+        with 1, in this process) with a ChristofidesSolver that defaults to
+        the greedy KD-tree matching and no lower bound, which never build a
+        distance matrix.
+    """
+    methods = ["kd", "grid"]
+
+    def __init__(
+        self,
+        cell_size: int = 5000,
+        method: str = "kd",
+        processes: Optional[int] = None,
+        solver_arguments: Optional[Dict] = None,
+        repair: bool = True,
+        repair_window: int = 100
+    ):
+        if method not in self.methods:
+            print(f"ERROR: Unknown partition method {method}. Expected one of {self.methods}.")
+            raise Exception
+        if cell_size < 3:
+            print("ERROR: Cells must hold at least three points.")
+            raise Exception
+        self.cell_size = cell_size
+        self.method = method
+        self.processes = processes or os.cpu_count() or 1
+        self.solver_arguments = {"matching_method": "kdtree_greedy", "lower_bound": None}
+        self.solver_arguments.update(solver_arguments or {})
+        self.repair = repair
+        self.repair_window = repair_window
+
+    def solve(self, points: np.ndarray) -> PartitionedResult:
+        """
+            Solves the euclidean instance given by an (n, 2) array of points.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) < 3:
+            print("ERROR: The instance must have at least three vertices.")
+            raise Exception
+        instrumentation = Instrumentation()
+        instrumentation.start()
+        try:
+            with instrumentation.stage("partition"):
+                cells = self.partition(points)
+                cells = [cells[i] for i in self.__cell_order(points, cells)]
+            with instrumentation.stage("cells"):
+                cell_tours = self.__solve_cells(points, cells)
+            with instrumentation.stage("stitch"):
+                tour, seams = self.__stitch(points, cells, cell_tours)
+            if self.repair and len(cells) > 1:
+                with instrumentation.stage("repair"):
+                    tour = self.__repair(points, tour, seams)
+            delta = points[tour[:-1]] - points[tour[1:]]
+            cost = float(np.hypot(delta[:, 0], delta[:, 1]).sum())
+        finally:
+            report = instrumentation.stop()
+        return PartitionedResult(tour, cost, cells, report)
+
+    def partition(self, points: np.ndarray) -> List[np.ndarray]:
+        """
+            Returns the vertices of every cell, in no particular order.
+        """
+        if self.method == "grid":
+            return self.__grid_cells(points)
+        return self.__kd_cells(points)
+
+    def __kd_cells(self, points: np.ndarray) -> List[np.ndarray]:
+        cells = []
+        stack = [np.arange(len(points))]
+        while stack:
+            vertices = stack.pop()
+            if len(vertices) <= self.cell_size:
+                cells.append(vertices)
+                continue
+            cell_points = points[vertices]
+            extent = cell_points.max(axis=0) - cell_points.min(axis=0)
+            axis = int(np.argmax(extent))
+            half = len(vertices)//2
+            order = np.argpartition(cell_points[:, axis], half)
+            stack.append(vertices[order[half:]])
+            stack.append(vertices[order[:half]])
+        return cells
+
+    def __grid_cells(self, points: np.ndarray) -> List[np.ndarray]:
+        low = points.min(axis=0)
+        extent = np.maximum(points.max(axis=0) - low, 1e-12)
+        side = max(1, int(np.ceil(np.sqrt(len(points)/self.cell_size))))
+        cell = np.minimum((points - low)/extent*side, side - 1).astype(np.intp)
+        labels = cell[:, 0]*side + cell[:, 1]
+        order = np.argsort(labels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        return np.split(order, boundaries)
+
+    def __cell_order(self, points: np.ndarray, cells: List[np.ndarray]) -> List[int]:
+        """
+            Order of the cells along a Christofides tour of their centroids.
+        """
+        if len(cells) < 4:
+            return list(range(len(cells)))
+        centroids = np.asarray([points[cell].mean(axis=0) for cell in cells])
+        solver = ChristofidesSolver(
+            matching_method="blossom" if len(cells) <= 200 else "kdtree_greedy",
+            lower_bound=None, improvement="2-opt+or-opt")
+        return solver.solve(centroids).tour[:-1]
+
+    def __solve_cells(self, points: np.ndarray, cells: List[np.ndarray]) -> List[List[int]]:
+        tasks = [(points[cell], self.solver_arguments) for cell in cells]
+        if self.processes == 1 or len(cells) == 1:
+            return [solve_cell(task) for task in tasks]
+        with multiprocessing.Pool(min(self.processes, len(cells))) as pool:
+            return pool.map(solve_cell, tasks, chunksize=1)
+
+    def __stitch(
+        self,
+        points: np.ndarray,
+        cells: List[np.ndarray],
+        cell_tours: List[List[int]]
+    ) -> Tuple[List[int], List[int]]:
+        """
+            Concatenates the cell tours into one tour and returns it with the
+            positions in the tour of the first vertex of every cell. Every cell
+            tour loses one edge (a, b) and is walked from b to a or from a to
+            b, whichever is cheaper with the exit of the previous cell and
+            the centroid of the next one.
+        """
+        centroids = [points[cell].mean(axis=0) for cell in cells]
+        previous_exit = centroids[-1]
+        tour: List[int] = []
+        seams: List[int] = []
+        for i, (cell, cell_tour) in enumerate(zip(cells, cell_tours)):
+            vertices = cell[np.asarray(cell_tour, dtype=np.intp)]
+            if len(cells) == 1 or len(vertices) == 1:
+                path = vertices
+            else:
+                next_centroid = centroids[(i + 1) % len(cells)]
+                a, b = vertices, np.roll(vertices, -1)
+                removed = np.hypot(*(points[a] - points[b]).T)
+                forward = np.hypot(*(points[b] - previous_exit).T) + \
+                    np.hypot(*(points[a] - next_centroid).T) - removed
+                backward = np.hypot(*(points[a] - previous_exit).T) + \
+                    np.hypot(*(points[b] - next_centroid).T) - removed
+                j = int(np.argmin(np.minimum(forward, backward)))
+                if forward[j] <= backward[j]:
+                    # From b = vertices[j+1] forward around the cycle to a = vertices[j].
+                    path = np.roll(vertices, -(j + 1))
+                else:
+                    # From a = vertices[j] backward around the cycle to b = vertices[j+1].
+                    path = np.roll(vertices, -(j + 1))[::-1]
+            seams.append(len(tour))
+            tour += path.tolist()
+            previous_exit = points[path[-1]]
+        tour.append(tour[0])
+        return tour, seams
+
+    def __repair(self, points: np.ndarray, tour: List[int], seams: List[int]) -> List[int]:
+        order = np.asarray(tour[:-1], dtype=np.intp)
+        number_of_vertices = len(order)
+        window = min(self.repair_window, (number_of_vertices - 2)//2)
+        if window < 2:
+            return tour
+        offsets = np.arange(-window, window)
+        for seam in seams:
+            positions = (seam + offsets) % number_of_vertices
+            order[positions] = order[positions][two_opt_path(points[order[positions]])]
+        return order.tolist() + [int(order[0])]
+
+
+def two_opt_path(points: np.ndarray) -> np.ndarray:
+    """
+        Returns the order of the points along a 2-optimal path through them
+        that has the same ends as the path points[0], ..., points[-1]. Every
+        round evaluates all pairs of edges at once and applies, best first,
+        the best move of every edge among those that touch disjoint parts of
+        the path.
+    """
+    number_of_points = len(points)
+    order = np.arange(number_of_points)
+    if number_of_points < 4:
+        return order
+    delta = points[:, None, :] - points[None, :, :]
+    distances = np.hypot(delta[:, :, 0], delta[:, :, 1])
+    while True:
+        starts, ends = order[:-1], order[1:]
+        lengths = distances[starts, ends]
+        # Replacing the edges (i, i+1) and (j, j+1) by (i, j) and (i+1, j+1).
+        gains = np.triu(lengths[:, None] + lengths[None, :] -
+                        distances[np.ix_(starts, starts)] - distances[np.ix_(ends, ends)], 2)
+        best = np.argmax(gains, axis=1)
+        best_gains = gains[np.arange(len(best)), best]
+        candidates = np.flatnonzero(best_gains > 1e-12)
+        if len(candidates) == 0:
+            return order
+        used = np.zeros(number_of_points, dtype=bool)
+        for i in candidates[np.argsort(-best_gains[candidates])].tolist():
+            j = int(best[i])
+            if used[i:j+2].any():
+                continue
+            used[i:j+2] = True
+            order[i+1:j+1] = order[i+1:j+1][::-1].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cell-size", type=int, default=5000)
+    parser.add_argument("--method", default="kd", choices=PartitionedChristofides.methods)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--repair-window", type=int, default=100)
+    parser.add_argument("--no-repair", action="store_true")
+    arguments = parser.parse_args()
+    result = PartitionedChristofides(arguments.cell_size, arguments.method, arguments.processes,
+                                     repair=not arguments.no_repair,
+                                     repair_window=arguments.repair_window
+                                     ).solve(uniform_points(arguments.points, arguments.seed))
+    print(result)
+    print(result.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+    Pygame rendering of euclidean graphs. This is the only module of the
+    solver that imports pygame, so it is imported lazily by the graphs and
+    headless users never load it.
+
+    Drawing is batched: a set of edges is split into closed walks that go
+    through every edge twice, and every walk is drawn with a single
+    pygame.draw.lines call; vertices are blitted from one cached dot
+    surface. The complete graph behind an instance never changes, so it is
+    rasterized once per graph and style onto a cached surface. Fonts and
+    text surfaces are cached as well.
+
+    Past max_background_edges edges the lines of the complete graph cover
+    all of the convex hull of the points but a few pixels, so the hull is
+    filled instead: drawing the lines takes seconds from 1000 points on.
+"""
+from typing import Dict, Iterable, List, Tuple
+import weakref
+import numpy as np
+import pygame
+
+from scipy.spatial import ConvexHull, QhullError  # type: ignore
+
+from graph import EuclideanCompleteWeightedGraph
+
+# Margin around the coordinates kept by cached surfaces, for the line width,
+# the vertices and the labels.
+margin = 24
+line_width = 3
+vertice_radius = 5
+max_background_edges = 50000
+
+_fonts: Dict[Tuple[str, int], "pygame.font.Font"] = {}
+_labels: Dict[Tuple[str, int, Tuple[int, int, int]], "pygame.Surface"] = {}
+_dots: Dict[Tuple[Tuple[int, int, int], int], "pygame.Surface"] = {}
+_backgrounds: "weakref.WeakKeyDictionary[EuclideanCompleteWeightedGraph, Dict]" = \
+    weakref.WeakKeyDictionary()
+
+
+def font(size: int, name: str = 'Arial') -> "pygame.font.Font":
+    if (name, size) not in _fonts:
+        _fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return _fonts[(name, size)]
+
+
+def label(text: str, size: int = 20, color: Tuple[int, int, int] = (0, 0, 0)) -> "pygame.Surface":
+    """
+        Returns the rendered text, rendering it only the first time. The
+        cache is emptied when it grows past 4096 labels.
+    """
+    key = (text, size, color)
+    if key not in _labels:
+        if len(_labels) >= 4096:
+            _labels.clear()
+        _labels[key] = font(size).render(text, False, color)
+    return _labels[key]
+
+
+def render_graph(
+    graph: EuclideanCompleteWeightedGraph,
+    screen,
+    vertice_color: Tuple[int, int, int] = (0, 0, 0),
+    edge_color: Tuple[int, int, int] = (220, 220, 220),
+    render_indexes: bool = False
+):
+    """
+        Renders the whole graph on the screen according to the coordinates.
+        The first call for a graph and a style draws it on a transparent
+        surface that covers the coordinates; later calls only blit it.
+    """
+    key = (vertice_color, edge_color, render_indexes)
+    cached = _backgrounds.setdefault(graph, {})
+    if key not in cached:
+        cached[key] = _rasterize(graph, vertice_color, edge_color, render_indexes)
+    surface, position = cached[key]
+    screen.blit(surface, position)
+
+
+def render_edges(
+    graph: EuclideanCompleteWeightedGraph,
+    screen,
+    edges: List[Tuple[int, int]],
+    vertice_color: Tuple[int, int, int] = (0, 0, 255),
+    edge_color: Tuple[int, int, int] = (0, 0, 255)
+):
+    """
+        Renders only the specified input edges and the corresponding vertices
+        based on the coordinates. If the input is not a subset of the graph edges,
+        raises an Exception.
+    """
+    edge_array = np.asarray(list(edges), dtype=np.intp).reshape(-1, 2)
+    # The graph is complete: every pair of distinct vertices is an edge.
+    if np.any((edge_array < 0) | (edge_array >= graph.number_of_vertices)) or \
+       np.any(edge_array[:, 0] == edge_array[:, 1]):
+        print("ERROR: Input must be a subset of the graph's edges.")
+        raise Exception
+    points = graph.points
+    for walk in edge_walks(edge_array.tolist()):
+        pygame.draw.lines(screen, edge_color, False, points[walk].tolist(), line_width)
+    _render_vertices(screen, points[np.unique(edge_array)], vertice_color)
+
+
+def edge_walks(edges: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    """
+        Splits the edges into closed walks, one per connected component,
+        that go along every edge once in each direction (a depth first
+        traversal, that steps back at once over the edges closing a cycle).
+        Edges given in both directions are walked as one.
+    """
+    adjacency: Dict[int, List[int]] = {}
+    seen = set()
+    for v, w in edges:
+        if v == w or (w, v) in seen or (v, w) in seen:
+            continue
+        seen.add((v, w))
+        adjacency.setdefault(v, []).append(w)
+        adjacency.setdefault(w, []).append(v)
+    walks = []
+    visited = set()
+    used = set()
+    for root in adjacency:
+        if root in visited:
+            continue
+        visited.add(root)
+        walk = [root]
+        stack = [(root, iter(adjacency[root]))]
+        while stack:
+            v, neighbours = stack[-1]
+            for w in neighbours:
+                if (v, w) in used:
+                    continue
+                used.add((v, w))
+                used.add((w, v))
+                walk.append(w)
+                if w in visited:
+                    walk.append(v)
+                    continue
+                visited.add(w)
+                stack.append((w, iter(adjacency[w])))
+                break
+            else:
+                stack.pop()
+                if stack:
+                    walk.append(stack[-1][0])
+        walks.append(walk)
+    return walks
+
+
+def _render_vertices(screen, points: np.ndarray, color: Tuple[int, int, int]):
+    dot = _dot(color)
+    offset = vertice_radius + 1
+    screen.blits([(dot, (x - offset, y - offset)) for x, y in points.tolist()], False)
+
+
+def _dot(color: Tuple[int, int, int]) -> "pygame.Surface":
+    key = (color, vertice_radius)
+    if key not in _dots:
+        size = 2*(vertice_radius + 1)
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (size/2, size/2), vertice_radius)
+        _dots[key] = surface
+    return _dots[key]
+
+
+def _rasterize(
+    graph: EuclideanCompleteWeightedGraph,
+    vertice_color: Tuple[int, int, int],
+    edge_color: Tuple[int, int, int],
+    render_indexes: bool
+) -> Tuple["pygame.Surface", Tuple[int, int]]:
+    """
+        Draws the complete graph on a transparent surface and returns it
+        with the screen position of its top left corner. The edges out of
+        every vertex form a star, drawn as one polyline that goes back to
+        the vertex after every neighbour. Large graphs get their convex
+        hull instead.
+    """
+    points = graph.points
+    if len(points) == 0:
+        return pygame.Surface((0, 0), pygame.SRCALPHA), (0, 0)
+    low = np.floor(points.min(axis=0)) - margin
+    high = np.ceil(points.max(axis=0)) + margin
+    surface = pygame.Surface((int(high[0] - low[0]), int(high[1] - low[1])), pygame.SRCALPHA)
+    local = points - low
+    hull = None
+    if len(local)*(len(local) - 1)//2 > max_background_edges:
+        try:
+            hull = local[ConvexHull(local).vertices].tolist()
+        except QhullError:
+            pass
+    if hull is not None:
+        pygame.draw.polygon(surface, edge_color, hull)
+        pygame.draw.polygon(surface, edge_color, hull, line_width)
+    else:
+        for v in range(len(local) - 1):
+            star = np.empty((2*(len(local) - v - 1) + 1, 2))
+            star[0::2] = local[v]
+            star[1::2] = local[v+1:]
+            pygame.draw.lines(surface, edge_color, False, star.tolist(), line_width)
+    _render_vertices(surface, local, vertice_color)
+    if render_indexes:
+        surface.blits([(label(str(v)), (x - 20, y - 20))
+                       for v, (x, y) in enumerate(local.tolist())], False)
+    return surface, (int(low[0]), int(low[1]))
@@ -0,0 +1,315 @@
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+import numpy as np
+
+from graph import WeightedGraph, EuclideanCompleteWeightedGraph, SparseWeightedGraph
+from mst import MinimumSpanningTree
+from mwpm import MinimumWeightPerfectMatching
+from euler import EulerCycle
+from lower_bound_1_tree import LowerBound1Tree
+from local_search import TourImprovement
+from utils import remove_edge_pairs, shortcut, shortcut_many
+from instrumentation import Instrumentation, SolveReport, StageMetrics
+from cache import Fingerprint, SolveCache
+
+
+class ChristofidesResult():
+    """
+        Everything computed by one solve. tour is the closed list of vertices
+        (the first vertex is repeated at the end) and tour_edges the
+        corresponding edges. one_tree, bound and ratio are None when the
+        lower bound was not requested. report holds the metrics of every
+        stage and timings maps every stage to its wall time in seconds.
+    """
+
+    def __init__(
+        self,
+        graph: WeightedGraph,
+        minimum_spanning_tree: Set[Tuple[int, int]],
+        odd_degree_vertices: List[int],
+        minimum_perfect_matching: Set[Tuple[int, int]],
+        tour: List[int],
+        cost: float,
+        one_tree: Optional[Set[Tuple[int, int]]] = None,
+        bound: Optional[float] = None,
+        report: Optional[SolveReport] = None
+    ):
+        self.graph = graph
+        self.minimum_spanning_tree = minimum_spanning_tree
+        self.odd_degree_vertices = odd_degree_vertices
+        self.minimum_perfect_matching = minimum_perfect_matching
+        self.tour = tour
+        self.tour_edges = [(tour[i], tour[i+1]) for i in range(len(tour)-1)]
+        self.cost = cost
+        self.one_tree = one_tree
+        self.bound = bound
+        self.ratio = cost/bound if bound else None
+        self.report = report if report is not None else SolveReport([])
+        self.timings = self.report.wall_times()
+
+    def __str__(self) -> str:
+        return f"Tour:\t{self.tour}\n" +\
+               f"Cost:\t{self.cost}\n" +\
+               f"Bound:\t{self.bound}"
+
+
+class ChristofidesSolver():
+    """
+        Headless Christofides pipeline: MST, odd degree vertices, minimum
+        weight perfect matching, euler cycle and shortcutting, plus an
+        optional lower bound ("1-tree" for the maximum 1-tree, "held-karp"
+        for the subgradient bound, or None) and an optional post-optimization
+        of the tour ("2-opt", "2-opt+or-opt" or None). Every stage is
+        measured; trace_memory adds its peak allocation (with tracemalloc)
+        and callbacks are called with the StageMetrics of every stage. The
+        default "auto" matching is only exact on small sets of odd degree
+        vertices; matching_method="blossom" makes it exact on every size.
+
+        A SparseWeightedGraph does not have to be metric: the matching runs
+        on the metric closure of its odd degree vertices only, and the tour
+        is over the metric closure, every tour edge standing for a shortest
+        path. Such graphs need lower_bound=None and improvement=None, since
+        both work on the edges of the graph itself.
+
+        With a SolveCache, the MST, odd vertices and matching, the tour and
+        the lower bound are cached separately, keyed by the fingerprint of
+        the instance and the settings they depend on. A solve that only
+        changes the improvement reuses the first and the last.
+
+        With starts > 1, the euler cycle is also walked from starts - 1
+        random roots and with random edge orders (drawn from seed), all the
+        walks are shortcut at once and the cheapest tour is kept, before
+        the improvement. The MST and the matching are computed only once,
+        and the first walk is the one of a single start, so more starts
+        never give a worse tour.
+
+        solve can also publish its partial results: progress is called with
+        ("mst", ...), ("matching", ...), ("tour", ...) and, with a lower
+        bound, ("lower_bound", ...) as soon as they are known, each time
+        with a dict of the new fields of the result. An exception raised by
+        progress abandons the solve.
+    """
+    lower_bounds = ["1-tree", "held-karp", None]
+    improvements = ["2-opt", "2-opt+or-opt", None]
+
+    def __init__(
+        self,
+        mst_method: str = "auto",
+        matching_method: str = "auto",
+        lower_bound: Optional[str] = "1-tree",
+        dtype: type = np.float64,
+        improvement: Optional[str] = None,
+        improvement_time_limit: Optional[float] = None,
+        trace_memory: bool = False,
+        callbacks: Optional[List[Callable[[StageMetrics], None]]] = None,
+        cache: Optional[SolveCache] = None,
+        starts: int = 1,
+        seed: int = 0
+    ):
+        if lower_bound not in self.lower_bounds:
+            print(f"ERROR: Unknown lower bound {lower_bound}. Expected one of {self.lower_bounds}.")
+            raise Exception
+        if improvement not in self.improvements:
+            print(f"ERROR: Unknown improvement {improvement}. Expected one of {self.improvements}.")
+            raise Exception
+        if starts < 1:
+            print("ERROR: The number of starts must be at least 1.")
+            raise Exception
+        self.improvement = improvement
+        self.improvement_time_limit = improvement_time_limit
+        self.trace_memory = trace_memory
+        self.callbacks = callbacks
+        self.mst_method = mst_method
+        self.matching_method = matching_method
+        self.lower_bound = lower_bound
+        self.dtype = dtype
+        self.cache = cache
+        self.starts = starts
+        self.seed = seed
+
+    def solve(
+        self,
+        instance: Union[WeightedGraph, Sequence[Tuple[float, float]], np.ndarray],
+        progress: Optional[Callable[[str, Dict], None]] = None
+    ) -> ChristofidesResult:
+        """
+            Solves a WeightedGraph, or the euclidean instance given by a
+            sequence (or (n, 2) array) of coordinates.
+        """
+        instrumentation = Instrumentation(self.trace_memory, self.callbacks)
+        instrumentation.start()
+        try:
+            graph = instance
+            if not isinstance(instance, WeightedGraph):
+                with instrumentation.stage("graph"):
+                    graph = EuclideanCompleteWeightedGraph(
+                        [(x, y) for x, y in
+                         np.asarray(instance, dtype=float).reshape(-1, 2).tolist()],
+                        self.dtype)
+            if graph.number_of_vertices < 3:
+                print("ERROR: The instance must have at least three vertices.")
+                raise Exception
+            sparse = isinstance(graph, SparseWeightedGraph)
+            if sparse and (self.lower_bound is not None or self.improvement is not None):
+                print("ERROR: Sparse graphs are solved over their metric closure and " +
+                      "need lower_bound=None and improvement=None.")
+                raise Exception
+            fingerprint = None
+            if self.cache is not None:
+                with instrumentation.stage("fingerprint"):
+                    fingerprint = Fingerprint(graph, self.cache.decimals)
+            #================================================================#
+            #====== MINIMUM SPANNING TREE AND MINIMUM PERFECT MATCHING ======#
+            #================================================================#
+            artifacts = self.__cached(fingerprint, "matching")
+            if artifacts is not None:
+                tree_array, odd_array, matching_array = artifacts  # type: ignore
+                minimum_spanning_tree = set(fingerprint.instance_edges(tree_array))
+                minimum_spanning_tree |= set([(w, v) for v, w in minimum_spanning_tree])
+                odd_degree_vertices = sorted(fingerprint.instance_vertices(odd_array))
+                minimum_perfect_matching = set(fingerprint.instance_edges(matching_array))
+                self.__publish(progress, "mst", minimum_spanning_tree=minimum_spanning_tree)
+            else:
+                with instrumentation.stage("mst"):
+                    minimum_spanning_tree = MinimumSpanningTree(
+                        graph, self.mst_method).minimum_spanning_tree()
+                self.__publish(progress, "mst", minimum_spanning_tree=minimum_spanning_tree)
+                with instrumentation.stage("odd_vertices"):
+                    odd_degree_vertices = odd_degree_vertices_of(
+                        graph.number_of_vertices, minimum_spanning_tree)
+                with instrumentation.stage("matching"):
+                    odd_graph = graph.metric_closure(odd_degree_vertices) if sparse \
+                        else graph.induced_graph(odd_degree_vertices)
+                    induced_matching = MinimumWeightPerfectMatching(
+                        odd_graph, self.matching_method).minimum_weight_perfect_matching()
+                    minimum_perfect_matching = set(
+                        [(odd_degree_vertices[v], odd_degree_vertices[w])
+                         for v, w in induced_matching])
+                self.__store(fingerprint, "matching", lambda: (
+                    fingerprint.canonical_edges(remove_edge_pairs(minimum_spanning_tree)),
+                    np.asarray(fingerprint.canonical_vertices(odd_degree_vertices)),
+                    fingerprint.canonical_edges(minimum_perfect_matching)))
+            self.__publish(progress, "matching", odd_degree_vertices=odd_degree_vertices,
+                           minimum_perfect_matching=minimum_perfect_matching)
+            #================================================================#
+            #======= CALCULATING EULER CYCLE AND REMOVING DUPLICATES ========#
+            #================================================================#
+            cached_tour = self.__cached(fingerprint, "tour")
+            if cached_tour is not None:
+                tour = fingerprint.instance_vertices(cached_tour)  # type: ignore
+            else:
+                euler_edges = list(remove_edge_pairs(minimum_spanning_tree)) + \
+                    list(minimum_perfect_matching)
+                with instrumentation.stage("shortcut"):
+                    euler_cycle = EulerCycle(euler_edges).euler_cycle_iterator()
+                    tour = shortcut(instrumentation.iterate("euler", euler_cycle))
+                if self.starts > 1:
+                    with instrumentation.stage("multi_start"):
+                        tour = self.__best_start(graph, euler_edges, tour)
+                if self.improvement is not None:
+                    with instrumentation.stage("improvement"):
+                        tour = TourImprovement(
+                            graph, or_opt=(self.improvement == "2-opt+or-opt"),
+                            time_limit=self.improvement_time_limit).improve(tour)
+                self.__store(fingerprint, "tour",
+                             lambda: np.asarray(fingerprint.canonical_vertices(tour)))
+            if sparse:
+                cost = float(self.__tour_costs(graph, np.asarray([tour]))[0])
+            else:
+                cost = graph.cost([(tour[i], tour[i+1]) for i in range(len(tour)-1)])
+            self.__publish(progress, "tour", tour=tour, cost=cost)
+            one_tree, bound = None, None
+            if self.lower_bound is not None:
+                cached_bound = self.__cached(fingerprint, "lower_bound")
+                if cached_bound is not None:
+                    one_tree_array, bound = cached_bound  # type: ignore
+                    one_tree = set(fingerprint.instance_edges(one_tree_array))
+                else:
+                    with instrumentation.stage("lower_bound"):
+                        lower_bound = LowerBound1Tree(graph, minimum_spanning_tree)
+                        if self.lower_bound == "1-tree":
+                            one_tree, bound = lower_bound.get_maximum_1_tree()
+                        else:
+                            one_tree, bound = lower_bound.held_karp_bound(upper_bound=cost)
+                    self.__store(fingerprint, "lower_bound",
+                                 lambda: (fingerprint.canonical_edges(one_tree), bound))
+                self.__publish(progress, "lower_bound", one_tree=one_tree, bound=bound)
+        finally:
+            report = instrumentation.stop()
+        return ChristofidesResult(graph, minimum_spanning_tree, odd_degree_vertices,
+                                  minimum_perfect_matching, tour, cost, one_tree, bound,
+                                  report)
+
+    def __best_start(
+        self,
+        graph: WeightedGraph,
+        euler_edges: List[Tuple[int, int]],
+        tour: List[int]
+    ) -> List[int]:
+        """
+            Returns the cheapest of tour and of the shortcuts of starts - 1
+            random walks of the euler cycle of euler_edges.
+        """
+        generator = np.random.default_rng(self.seed)
+        euler = EulerCycle(euler_edges)
+        cycles = np.asarray([
+            list(euler.euler_cycle_iterator(
+                euler_edges[int(generator.integers(len(euler_edges)))][0],
+                generator.permutation(len(euler_edges)).tolist()))
+            for _ in range(self.starts - 1)])
+        tours = np.concatenate([np.asarray([tour]), shortcut_many(cycles)])
+        costs = self.__tour_costs(graph, tours)
+        return tours[int(np.argmin(costs))].tolist()
+
+    def __tour_costs(self, graph: WeightedGraph, tours: np.ndarray) -> np.ndarray:
+        """
+            Returns the costs of the rows of a (k, n+1) array of closed
+            tours. Tours of sparse graphs go along shortest paths.
+        """
+        v_array, w_array = tours[:, :-1].reshape(-1), tours[:, 1:].reshape(-1)
+        if isinstance(graph, SparseWeightedGraph):
+            costs = graph.path_costs(v_array, w_array)
+        else:
+            costs = graph.edge_costs(v_array, w_array)
+        return np.asarray(costs, dtype=np.float64).reshape(len(tours), -1).sum(axis=1)
+
+    def __publish(self, progress: Optional[Callable[[str, Dict], None]], stage: str, **values):
+        if progress is not None:
+            progress(stage, values)
+
+    def __cache_key(self, fingerprint: Fingerprint, artifact: str) -> Tuple:
+        """
+            The key of an artifact holds the settings it depends on. The
+            held-karp bound depends on the tour, through its upper bound.
+        """
+        key: Tuple = (fingerprint.digest, str(np.dtype(self.dtype)),
+                      self.mst_method, self.matching_method)
+        if artifact == "tour":
+            key += (self.improvement, self.improvement_time_limit, self.starts, self.seed)
+        if artifact == "lower_bound":
+            key += (self.lower_bound,)
+            if self.lower_bound == "held-karp":
+                key += (self.improvement, self.improvement_time_limit, self.starts, self.seed)
+        return (artifact,) + key
+
+    def __cached(self, fingerprint: Optional[Fingerprint], artifact: str):
+        if self.cache is None or fingerprint is None:
+            return None
+        return self.cache.get(self.__cache_key(fingerprint, artifact))
+
+    def __store(self, fingerprint: Optional[Fingerprint], artifact: str, value: Callable):
+        if self.cache is None or fingerprint is None:
+            return
+        self.cache.put(self.__cache_key(fingerprint, artifact), value())
+
+
+def odd_degree_vertices_of(
+    number_of_vertices: int,
+    tree: Set[Tuple[int, int]]
+) -> List[int]:
+    """
+        Returns the vertices of odd degree in a tree given with both (v, w)
+        and (w, v) for every edge.
+    """
+    degrees = np.bincount(np.asarray([v for v, _ in tree], dtype=np.intp),
+                          minlength=number_of_vertices)
+    return np.flatnonzero(degrees % 2 == 1).tolist()
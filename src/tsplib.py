@@ -0,0 +1,296 @@
+"""
+    Reading and writing TSPLIB files: symmetric instances with NODE_COORD
+    sections of types EUC_2D, CEIL_2D and GEO, or EXPLICIT edge weights as
+    a FULL_MATRIX or a triangular matrix by rows (UPPER_ROW, LOWER_ROW,
+    UPPER_DIAG_ROW, LOWER_DIAG_ROW), and tours in the TOUR_SECTION format.
+    Numeric sections are parsed into arrays in one pass, not line by line.
+
+    Example, from the src directory, converting an instance to the binary
+    format of binary.py, with its TSPLIB distance matrix:
+        python tsplib.py berlin52.tsp --binary berlin52.bin --matrix
+"""
+from typing import Dict, List, Optional, Tuple
+import argparse
+import re
+import numpy as np
+
+from graph import CompleteWeightedGraph
+
+
+class TsplibInstance():
+    """
+        A TSPLIB instance: the coordinates of the vertices as an (n, 2) array
+        for the NODE_COORD types, or the (n, n) matrix of edge weights for
+        EXPLICIT ones. GEO coordinates are latitudes and longitudes in the
+        DDD.MM (degrees and minutes) notation of TSPLIB.
+    """
+    edge_weight_types = ["EUC_2D", "CEIL_2D", "GEO", "EXPLICIT"]
+
+    def __init__(
+        self,
+        name: str,
+        edge_weight_type: str,
+        points: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        comment: str = ""
+    ):
+        if edge_weight_type not in self.edge_weight_types:
+            print(f"ERROR: Unsupported EDGE_WEIGHT_TYPE {edge_weight_type}. " +
+                  f"Expected one of {self.edge_weight_types}.")
+            raise Exception
+        if (edge_weight_type == "EXPLICIT") != (weights is not None) or \
+           (points is None) == (weights is None):
+            print("ERROR: EXPLICIT instances need edge weights, the others coordinates.")
+            raise Exception
+        self.name = name
+        self.comment = comment
+        self.edge_weight_type = edge_weight_type
+        self.points = None if points is None else \
+            np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        if self.weights is not None and \
+           (self.weights.ndim != 2 or self.weights.shape[0] != self.weights.shape[1]):
+            print(f"ERROR: Edge weights must be a square matrix. Got shape {self.weights.shape}.")
+            raise Exception
+
+    @property
+    def dimension(self) -> int:
+        return len(self.points if self.points is not None else self.weights)
+
+    def distance_matrix(self) -> np.ndarray:
+        """
+            The (n, n) matrix of the TSPLIB distances: euclidean distances
+            rounded to the nearest integer for EUC_2D and up for CEIL_2D,
+            great circle distances in kilometers for GEO.
+        """
+        if self.weights is not None:
+            return self.weights
+        points = self.points
+        if self.edge_weight_type == "GEO":
+            return geo_distance_matrix(points)
+        delta = points[:, None, :] - points[None, :, :]
+        distances = np.hypot(delta[:, :, 0], delta[:, :, 1])
+        if self.edge_weight_type == "CEIL_2D":
+            return np.ceil(distances)
+        return np.floor(distances + 0.5)
+
+    def graph(self) -> CompleteWeightedGraph:
+        """
+            The complete graph with the TSPLIB distances, so that tour costs
+            are the ones published for the instance. The points of a
+            euclidean instance can be solved directly instead, with exact
+            euclidean distances.
+        """
+        return CompleteWeightedGraph(self.distance_matrix())
+
+    def __str__(self) -> str:
+        return f"Name:\t{self.name}\n" +\
+               f"Type:\t{self.edge_weight_type}\n" +\
+               f"Dimension:\t{self.dimension}"
+
+
+def geo_distance_matrix(points: np.ndarray) -> np.ndarray:
+    """
+        TSPLIB GEO distances between (latitude, longitude) points in DDD.MM
+        notation, on a sphere of radius 6378.388 km, truncated to integers.
+    """
+    degrees = np.trunc(points)
+    radians = 3.141592*(degrees + 5.0*(points - degrees)/3.0)/180.0
+    latitude, longitude = radians[:, 0], radians[:, 1]
+    q1 = np.cos(longitude[:, None] - longitude[None, :])
+    q2 = np.cos(latitude[:, None] - latitude[None, :])
+    q3 = np.cos(latitude[:, None] + latitude[None, :])
+    cosines = np.clip(0.5*((1.0 + q1)*q2 - (1.0 - q1)*q3), -1.0, 1.0)
+    distances = np.trunc(6378.388*np.arccos(cosines) + 1.0)
+    np.fill_diagonal(distances, 0.0)
+    return distances
+
+
+# Row major positions of the entries of every matrix format, given n.
+_triangles = {
+    "UPPER_ROW": lambda n: np.triu_indices(n, 1),
+    "LOWER_ROW": lambda n: np.tril_indices(n, -1),
+    "UPPER_DIAG_ROW": lambda n: np.triu_indices(n),
+    "LOWER_DIAG_ROW": lambda n: np.tril_indices(n),
+}
+edge_weight_formats = ["FULL_MATRIX"] + list(_triangles.keys())
+
+_section = re.compile(r"^[ \t]*([A-Z_]+_SECTION|EOF)[ \t]*:?[ \t]*$", re.MULTILINE)
+
+
+def _parse(text: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+        Splits a TSPLIB file into its "KEY : value" specification and the
+        text of each of its sections.
+    """
+    parts = _section.split(text)
+    specification = {}
+    for line in parts[0].splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            specification[key.strip().upper()] = value.strip()
+        elif line.strip():
+            key, _, value = line.strip().partition(" ")
+            specification[key.upper()] = value.strip()
+    sections = {}
+    for keyword, body in zip(parts[1::2], parts[2::2]):
+        if keyword != "EOF":
+            sections[keyword] = body
+    return specification, sections
+
+
+def _numbers(body: str, count: int, section: str) -> np.ndarray:
+    numbers = np.asarray(body.split(), dtype=np.float64)
+    if len(numbers) < count:
+        print(f"ERROR: {section} holds {len(numbers)} numbers, expected {count}.")
+        raise Exception
+    return numbers[:count]
+
+
+def read_tsplib(path: str) -> TsplibInstance:
+    """
+        Loads a symmetric TSPLIB instance (TYPE: TSP).
+    """
+    with open(path) as tsplib_file:
+        specification, sections = _parse(tsplib_file.read())
+    problem_type = specification.get("TYPE", "TSP").split()
+    if not problem_type:
+        print("ERROR: The TYPE of the instance is empty.")
+        raise Exception
+    if problem_type[0] != "TSP":
+        print(f"ERROR: Only TSP instances are supported. Got TYPE {specification['TYPE']}.")
+        raise Exception
+    dimension = int(specification.get("DIMENSION", 0))
+    edge_weight_type = specification.get("EDGE_WEIGHT_TYPE", "")
+    name = specification.get("NAME", "")
+    comment = specification.get("COMMENT", "")
+    if edge_weight_type == "EXPLICIT":
+        weight_format = specification.get("EDGE_WEIGHT_FORMAT", "")
+        if weight_format not in edge_weight_formats:
+            print(f"ERROR: Unsupported EDGE_WEIGHT_FORMAT {weight_format}. " +
+                  f"Expected one of {edge_weight_formats}.")
+            raise Exception
+        if "EDGE_WEIGHT_SECTION" not in sections:
+            print("ERROR: EXPLICIT instance without an EDGE_WEIGHT_SECTION.")
+            raise Exception
+        if weight_format == "FULL_MATRIX":
+            weights = _numbers(sections["EDGE_WEIGHT_SECTION"], dimension*dimension,
+                               "EDGE_WEIGHT_SECTION").reshape(dimension, dimension)
+        else:
+            rows, columns = _triangles[weight_format](dimension)
+            weights = np.zeros((dimension, dimension))
+            weights[rows, columns] = _numbers(sections["EDGE_WEIGHT_SECTION"], len(rows),
+                                              "EDGE_WEIGHT_SECTION")
+            weights[columns, rows] = weights[rows, columns]
+        return TsplibInstance(name, edge_weight_type, weights=weights, comment=comment)
+    if "NODE_COORD_SECTION" not in sections:
+        print("ERROR: Instance without a NODE_COORD_SECTION.")
+        raise Exception
+    nodes = _numbers(sections["NODE_COORD_SECTION"], 3*dimension,
+                     "NODE_COORD_SECTION").reshape(dimension, 3)
+    points = np.empty((dimension, 2))
+    points[nodes[:, 0].astype(np.intp) - 1] = nodes[:, 1:]
+    return TsplibInstance(name, edge_weight_type, points=points, comment=comment)
+
+
+def _lines(rows: np.ndarray) -> str:
+    """
+        The rows of a 2-D array as lines of space separated numbers, integers
+        without a decimal point and the others with the shortest repr that
+        reads back exactly.
+    """
+    if np.all(rows == np.round(rows)) and np.all(np.abs(rows) < 2**53):
+        rows = rows.astype(np.int64)
+    return "".join(" ".join(map(repr, row)) + "\n" for row in rows.tolist())
+
+
+def write_tsplib(path: str, instance: TsplibInstance, weight_format: str = "FULL_MATRIX"):
+    """
+        Writes an instance. Explicit weights are written as a FULL_MATRIX or
+        in one of the triangular weight_formats.
+    """
+    if weight_format not in edge_weight_formats:
+        print(f"ERROR: Unknown EDGE_WEIGHT_FORMAT {weight_format}. " +
+              f"Expected one of {edge_weight_formats}.")
+        raise Exception
+    header = [f"NAME : {instance.name}"]
+    if instance.comment:
+        header.append(f"COMMENT : {instance.comment}")
+    header += ["TYPE : TSP", f"DIMENSION : {instance.dimension}",
+               f"EDGE_WEIGHT_TYPE : {instance.edge_weight_type}"]
+    with open(path, "w") as tsplib_file:
+        if instance.weights is not None:
+            header.append(f"EDGE_WEIGHT_FORMAT : {weight_format}")
+            tsplib_file.write("\n".join(header) + "\nEDGE_WEIGHT_SECTION\n")
+            if weight_format == "FULL_MATRIX":
+                tsplib_file.write(_lines(instance.weights))
+            else:
+                rows, columns = _triangles[weight_format](instance.dimension)
+                values = instance.weights[rows, columns]
+                # One row of the triangle per line.
+                for row in np.split(values, np.flatnonzero(np.diff(rows)) + 1):
+                    tsplib_file.write(_lines(row.reshape(1, -1)))
+        else:
+            nodes = np.column_stack([np.arange(1, instance.dimension + 1), instance.points])
+            tsplib_file.write("\n".join(header) + "\nNODE_COORD_SECTION\n")
+            tsplib_file.write("".join(f"{int(v)} {x!r} {y!r}\n" for v, x, y in nodes.tolist()))
+        tsplib_file.write("EOF\n")
+
+
+def read_tour(path: str) -> List[int]:
+    """
+        Loads a TSPLIB tour as a closed list of 0-based vertices (the first
+        vertex repeated at the end).
+    """
+    with open(path) as tour_file:
+        specification, sections = _parse(tour_file.read())
+    if "TOUR_SECTION" not in sections:
+        print("ERROR: Tour file without a TOUR_SECTION.")
+        raise Exception
+    vertices = np.asarray(sections["TOUR_SECTION"].split(), dtype=np.int64)
+    end = np.flatnonzero(vertices == -1)
+    if len(end) > 0:
+        vertices = vertices[:end[0]]
+    if "DIMENSION" in specification and len(vertices) != int(specification["DIMENSION"]):
+        print(f"ERROR: The tour visits {len(vertices)} vertices, " +
+              f"expected {specification['DIMENSION']}.")
+        raise Exception
+    tour = (vertices - 1).tolist()
+    return tour + tour[:1]
+
+
+def write_tour(path: str, tour: List[int], name: str = "tour"):
+    """
+        Writes a closed or open tour of 0-based vertices as a TSPLIB tour.
+    """
+    vertices = list(tour)
+    if len(vertices) > 1 and vertices[0] == vertices[-1]:
+        vertices = vertices[:-1]
+    with open(path, "w") as tour_file:
+        tour_file.write(f"NAME : {name}\nTYPE : TOUR\nDIMENSION : {len(vertices)}\nTOUR_SECTION\n")
+        tour_file.write("".join(f"{v + 1}\n" for v in vertices))
+        tour_file.write("-1\nEOF\n")
+
+
+def main():
+    from binary import write_binary
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("instance")
+    parser.add_argument("--binary", default=None, help="Converts the instance to this file.")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Stores the TSPLIB distance matrix, instead of computing " +
+                             "it from the points when the file is loaded.")
+    arguments = parser.parse_args()
+    instance = read_tsplib(arguments.instance)
+    print(instance)
+    if arguments.binary:
+        distance_matrix = instance.distance_matrix() \
+            if arguments.matrix or instance.points is None else None
+        write_binary(arguments.binary, points=instance.points, distance_matrix=distance_matrix,
+                     edge_weight_type=instance.edge_weight_type)
+
+
+if __name__ == "__main__":
+    main()
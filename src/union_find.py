@@ -1,20 +1,96 @@
-from typing import List
+from array import array
+import numpy as np
 
 
 class UnionFind():
+    """
+        Disjoint sets over the elements 0, ..., n-1, with union by size and
+        iterative path halving, so find never recurses. Parents and sizes
+        are kept in compact typed arrays; the batch operations read the
+        parents as a numpy array that shares their memory.
+    """
+
     def __init__(self, number_of_elements: int):
-        self.array = [i for i in range(number_of_elements)]
-
-    def union(self, element_1: int, element_2: int):
-        if element_1 >= len(self.array) or \
-           element_2 >= len(self.array):
-            return
-        self.array[self.find(element_1)] = self.find(element_2)
-
-    def find(self, element):
-        next_element = self.array[element]
-        if next_element == element:
-            return element
-        root = self.find(next_element)
-        self.array[element] = root
-        return root
+        self.parent = array("q", range(number_of_elements))
+        self.size = array("q", [1])*number_of_elements
+        self.number_of_components = number_of_elements
+        self.__parent_array = np.frombuffer(self.parent, dtype=np.int64) \
+            if number_of_elements > 0 else np.zeros(0, dtype=np.int64)
+
+    def find(self, element: int) -> int:
+        parent = self.parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, element_1: int, element_2: int) -> bool:
+        """
+            Merges the sets of the two elements. Returns whether they were
+            in different sets.
+        """
+        if element_1 >= len(self.parent) or \
+           element_2 >= len(self.parent):
+            return False
+        root_1, root_2 = self.find(element_1), self.find(element_2)
+        if root_1 == root_2:
+            return False
+        if self.size[root_1] < self.size[root_2]:
+            root_1, root_2 = root_2, root_1
+        self.parent[root_2] = root_1
+        self.size[root_1] += self.size[root_2]
+        self.number_of_components -= 1
+        return True
+
+    def connected(self, element_1: int, element_2: int) -> bool:
+        return self.find(element_1) == self.find(element_2)
+
+    def find_many(self, elements: np.ndarray) -> np.ndarray:
+        """
+            Returns the roots of an array of elements, following all the
+            paths at once, and points the elements directly at their roots.
+        """
+        elements = np.asarray(elements, dtype=np.int64)
+        parent = self.__parent_array
+        roots = parent[elements]
+        while True:
+            grandparents = parent[roots]
+            if np.array_equal(grandparents, roots):
+                break
+            roots = grandparents
+        parent[elements] = roots
+        return roots
+
+    def union_many(
+        self,
+        elements_1: np.ndarray,
+        elements_2: np.ndarray,
+        stop_when_connected: bool = True
+    ) -> np.ndarray:
+        """
+            Merges the sets of elements_1[i] and elements_2[i], in order, and
+            returns a boolean array telling which pairs were in different
+            sets, as in Kruskal. With stop_when_connected, the pairs after
+            the one that leaves a single component are not looked at.
+        """
+        merged = np.zeros(len(elements_1), dtype=bool)
+        parent, size = self.parent, self.size
+        for i, (root_1, root_2) in enumerate(zip(np.asarray(elements_1).tolist(),
+                                                 np.asarray(elements_2).tolist())):
+            if stop_when_connected and self.number_of_components <= 1:
+                break
+            while parent[root_1] != root_1:
+                parent[root_1] = parent[parent[root_1]]
+                root_1 = parent[root_1]
+            while parent[root_2] != root_2:
+                parent[root_2] = parent[parent[root_2]]
+                root_2 = parent[root_2]
+            if root_1 == root_2:
+                continue
+            if size[root_1] < size[root_2]:
+                root_1, root_2 = root_2, root_1
+            parent[root_2] = root_1
+            size[root_1] += size[root_2]
+            self.number_of_components -= 1
+            merged[i] = True
+        return merged
@@ -1,8 +1,5 @@
-from typing import Set, Tuple
-import pygame
-import math
-
-from graph import EuclideanCompleteWeightedGraph
+from typing import Iterable, List, Set, Tuple
+import numpy as np
 
 
 def remove_edge_pairs(edges: Set[Tuple[int, int]]):
@@ -17,40 +14,35 @@ def remove_edge_pairs(edges: Set[Tuple[int, int]]):
     return new_edges
 
 
-'''
-def remove_hourglasses(graph: EuclideanCompleteWeightedGraph, edges: Set[Tuple[int, int]]):
+def shortcut(euler_cycle: Iterable[int]) -> List[int]:
     """
-        Receives an euclidean graph and a subset of its edges. Every time an edge
-        intersects with another in the plane, the algorithm "removes" the intersection
-        by substituting these edges by others with less weight.
+        Turns an euler cycle into a hamiltonian cycle by skipping vertices that
+        were already visited. The input may be any iterable, such as the
+        generator of EulerCycle.euler_cycle_iterator. The first vertex is
+        repeated at the end to close the cycle.
     """
-    new_edges = [e for e in edges]
-    for v_1, v_2 in edges:
-        for w_1, w_2 in edges:
-            if len(set([v_1, v_2, w_1, w_2])) != 4:  # edges can't meet
-                continue
-            pv_1 = graph.coordinates[v_1]
-            pv_2 = graph.coordinates[v_2]
-            pw_1 = graph.coordinates[w_1]
-            pw_2 = graph.coordinates[w_2]
-            if intersect(pv_1, pv_2, pw_1, pw_2):
-                print(f"{(v_1, v_2)} intersects with {(w_1, w_2)}.")
-                try:
-                    new_edges.remove((v_1, v_2))
-                    new_edges.remove((w_1, w_2))
-                    new_edges.append((v_1, w_2))
-                    new_edges.append((w_1, v_2))
-                except:
-                    pass
-    return set(new_edges)
-
-
-def ccw(A, B, C):
-    return (C[1]-A[1]) * (B[0]-A[0]) > (B[1]-A[1]) * (C[0]-A[0])
-
-# Return true if line segments AB and CD intersect
-
-
-def intersect(A, B, C, D):
-    return ccw(A, C, D) != ccw(B, C, D) and ccw(A, B, C) != ccw(A, B, D)
-'''
+    visited: Set[int] = set()
+    cycle: List[int] = []
+    for v in euler_cycle:
+        if v not in visited:
+            visited.add(v)
+            cycle.append(v)
+    if cycle != []:
+        cycle.append(cycle[0])
+    return cycle
+
+
+def shortcut_many(euler_cycles: np.ndarray) -> np.ndarray:
+    """
+        Shortcuts every row of a (k, m) array of euler cycles over the same
+        edges at once, and returns the (k, n+1) array of the hamiltonian
+        cycles, the first vertex of every row repeated at its end.
+    """
+    number_of_cycles, length = euler_cycles.shape
+    number_of_vertices = int(euler_cycles.max()) + 1 if euler_cycles.size else 0
+    keys = (np.arange(number_of_cycles)[:, None]*number_of_vertices + euler_cycles).reshape(-1)
+    _, first = np.unique(keys, return_index=True)
+    # np.unique sorts by row first, so the rows stay together.
+    first = np.sort(first.reshape(number_of_cycles, -1), axis=1)
+    cycles = euler_cycles.reshape(-1)[first]
+    return np.concatenate([cycles, cycles[:, :1]], axis=1)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from batch import BatchChristofidesSolver, batch_distance_matrices
+from graph import EuclideanCompleteWeightedGraph
+from instances import grid_points
+from solver import ChristofidesSolver
+
+
+def tour_cost(graph, tour) -> float:
+    return graph.cost(list(zip(tour[:-1], tour[1:])))
+
+
+def test_batch_matches_the_single_instance_solve():
+    points = np.random.default_rng(0).random((20, 40, 2))
+    result = BatchChristofidesSolver().solve(points)
+    solver = ChristofidesSolver(mst_method="prim", matching_method="greedy", lower_bound=None)
+    assert len(result) == 20
+    for i in range(20):
+        graph = EuclideanCompleteWeightedGraph(points[i])
+        single = solver.solve(graph)
+        tour = result.tours[i].tolist()
+        assert sorted(tour[:-1]) == list(range(40)) and tour[0] == tour[-1]
+        assert np.isclose(result.costs[i], tour_cost(graph, tour))
+        tree = [(v, p) for v, p in enumerate(result.parents[i].tolist()) if p >= 0]
+        assert np.isclose(graph.cost(tree), graph.cost(single.minimum_spanning_tree)/2)
+        matching = [(v, w) for v, w in enumerate(result.mates[i].tolist()) if v < w]
+        assert np.isclose(graph.cost(matching), graph.cost(single.minimum_perfect_matching))
+
+
+def test_chunks_matrices_and_ties():
+    points = np.stack([grid_points(36, seed) for seed in range(7)])
+    whole = BatchChristofidesSolver().solve(points)
+    chunked = BatchChristofidesSolver(max_memory=1).solve(points)
+    assert np.array_equal(whole.tours, chunked.tours)
+    from_matrices = BatchChristofidesSolver().solve_matrices(batch_distance_matrices(points))
+    assert np.allclose(whole.costs, from_matrices.costs)
+    single_precision = BatchChristofidesSolver(np.float32).solve(points)
+    assert single_precision.tours.shape == (7, 37)
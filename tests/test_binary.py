@@ -0,0 +1,26 @@
+import numpy as np
+
+from binary import read_binary, write_binary
+from graph import EuclideanCompleteWeightedGraph
+from tsplib import TsplibInstance
+
+
+def test_tsplib_points_keep_their_distances(tmp_path):
+    points = np.random.default_rng(0).random((30, 2))*60
+    for edge_weight_type in ["EUC_2D", "CEIL_2D", "GEO"]:
+        path = str(tmp_path / f"{edge_weight_type}.bin")
+        write_binary(path, points=points, edge_weight_type=edge_weight_type)
+        graph = read_binary(path).graph()
+        assert not isinstance(graph, EuclideanCompleteWeightedGraph)
+        expected = TsplibInstance("", edge_weight_type, points=points).distance_matrix()
+        assert np.array_equal(graph.distance_matrix, expected)
+
+
+def test_euclidean_points_are_memory_mapped(tmp_path):
+    points = np.random.default_rng(0).random((30, 2))
+    path = str(tmp_path / "points.bin")
+    write_binary(path, points=points, tour=list(range(30)) + [0])
+    instance = read_binary(path)
+    assert isinstance(instance.points, np.memmap)
+    assert np.array_equal(instance.points, points)
+    assert isinstance(instance.graph(), EuclideanCompleteWeightedGraph)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from cache import Fingerprint, SolveCache
+from graph import EuclideanCompleteWeightedGraph, RandomEuclideanCompleteWeightedGraph
+from solver import ChristofidesSolver
+
+
+def test_translated_and_random_graphs_share_fingerprints():
+    points = np.random.default_rng(0).random((20, 2))
+    graph = EuclideanCompleteWeightedGraph(points)
+    assert Fingerprint(graph).digest == Fingerprint(graph.translate((5, 5))).digest
+    assert Fingerprint(graph).digest == \
+        Fingerprint(EuclideanCompleteWeightedGraph(points[::-1] + 3)).digest
+    random_graph = RandomEuclideanCompleteWeightedGraph(20)
+    assert Fingerprint(random_graph).digest == \
+        Fingerprint(EuclideanCompleteWeightedGraph(random_graph.points)).digest
+
+
+def test_instances_are_told_apart_up_to_the_rounding():
+    points = np.random.default_rng(0).random((20, 2))
+    close = EuclideanCompleteWeightedGraph(points + 1e-9)
+    far = EuclideanCompleteWeightedGraph(points + np.eye(20, 2)*1e-3)
+    graph = EuclideanCompleteWeightedGraph(points)
+    assert Fingerprint(graph).digest == Fingerprint(close).digest
+    assert Fingerprint(graph).digest != Fingerprint(far).digest
+    assert Fingerprint(graph, 3).digest != Fingerprint(graph, 6).digest
+
+
+def test_cache_decimals_set_the_fingerprint_rounding():
+    points = np.random.default_rng(0).random((20, 2))
+    cache = SolveCache(decimals=2)
+    solver = ChristofidesSolver(cache=cache)
+    solver.solve(points)
+    misses = cache.misses
+    solver.solve(points + np.eye(20, 2)*1e-4)
+    assert cache.misses == misses
@@ -0,0 +1,37 @@
+import json
+import numpy as np
+
+from experiments import BatchExperiment, P2Quantile, instance_seed
+
+
+def test_instance_seeds_are_deterministic_and_distinct():
+    seeds = [instance_seed(7, index) for index in range(1000)]
+    assert seeds == [instance_seed(7, index) for index in range(1000)]
+    assert len(set(seeds)) == len(seeds)
+    assert seeds != [instance_seed(8, index) for index in range(1000)]
+
+
+def test_runs_stream_the_same_instances(tmp_path):
+    runs = []
+    for run in range(2):
+        output = str(tmp_path / f"run{run}.jsonl")
+        BatchExperiment([8, 12], 4, output, base_seed=3, processes=1,
+                        exact_max_vertices=8).run()
+        with open(output) as output_file:
+            rows = sorted((json.loads(line) for line in output_file), key=lambda row: row["index"])
+        runs.append([(row["seed"], row["n"], row["cost"], row["optimum"]) for row in rows])
+    assert runs[0] == runs[1]
+    assert len(runs[0]) == 8
+    for seed, number_of_vertices, cost, optimum in runs[0]:
+        if number_of_vertices <= 8:
+            assert optimum - 1e-9 <= cost <= 1.5*optimum + 1e-9
+        else:
+            assert optimum is None
+
+
+def test_p2_quantile_estimates_the_median():
+    values = np.random.default_rng(0).random(10000)
+    estimator = P2Quantile(0.5)
+    for value in values.tolist():
+        estimator.add(value)
+    assert abs(estimator.value() - np.median(values)) < 0.02
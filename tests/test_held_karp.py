@@ -0,0 +1,44 @@
+import itertools
+import tracemalloc
+import numpy as np
+
+from graph import CompleteWeightedGraph
+from held_karp import HeldKarp
+
+
+def random_graph(number_of_vertices: int, seed: int = 0) -> CompleteWeightedGraph:
+    points = np.random.default_rng(seed).random((number_of_vertices, 2))
+    delta = points[:, None, :] - points[None, :, :]
+    return CompleteWeightedGraph(np.hypot(delta[:, :, 0], delta[:, :, 1]))
+
+
+def brute_force(costs: np.ndarray) -> float:
+    best = np.inf
+    for order in itertools.permutations(range(1, len(costs))):
+        tour = (0,) + order + (0,)
+        best = min(best, sum(costs[v, w] for v, w in zip(tour[:-1], tour[1:])))
+    return best
+
+
+def test_matches_brute_force():
+    for number_of_vertices in range(3, 9):
+        for seed in range(3):
+            graph = random_graph(number_of_vertices, seed)
+            tour, cost = HeldKarp(graph).solve()
+            assert sorted(tour[:-1]) == list(range(number_of_vertices))
+            assert tour[0] == tour[-1]
+            assert np.isclose(cost, graph.cost(list(zip(tour[:-1], tour[1:]))))
+            assert np.isclose(cost, brute_force(graph.cost_matrix()))
+
+
+def test_memory_estimate_bounds_the_traced_peak():
+    for number_of_vertices in [2, 5, 8, 11, 14]:
+        graph = random_graph(number_of_vertices)
+        graph.cost_matrix()
+        tracemalloc.start()
+        try:
+            HeldKarp(graph).solve()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak <= HeldKarp.memory_estimate(number_of_vertices)
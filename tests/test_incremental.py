@@ -0,0 +1,110 @@
+import math
+import numpy as np
+
+from incremental import IncrementalChristofides, PointGrid
+from mst import MinimumSpanningTree
+
+
+def euclidean_mst_cost(incremental: IncrementalChristofides) -> float:
+    graph, _ = incremental.graph()
+    costs = graph.cost_matrix()
+    return sum(costs[v, w] for v, w in MinimumSpanningTree(graph).minimum_spanning_tree())/2
+
+
+def tree_cost(incremental: IncrementalChristofides) -> float:
+    points = incremental.points
+    return sum(math.dist(points[v], points[w]) for v, w in incremental.tree)
+
+
+def assert_invariants(incremental: IncrementalChristofides):
+    vertices = incremental.vertices()
+    assert len(vertices) == incremental.number_of_active_vertices
+    # The tree spans the active vertices.
+    assert len(incremental.tree) == len(vertices) - 1
+    assert set(incremental.tree_adjacency) == set(vertices)
+    for v in vertices:
+        neighbours = incremental.tree_adjacency[v]
+        assert incremental.degrees[v] == len(neighbours)
+        assert all((min(v, w), max(v, w)) in incremental.tree for w in neighbours)
+    seen, stack = {vertices[0]}, [vertices[0]]
+    while stack:
+        for w in incremental.tree_adjacency[stack.pop()]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    assert seen == set(vertices)
+    # The matching pairs up the odd degree vertices.
+    odd = [v for v in vertices if incremental.degrees[v] % 2 == 1]
+    assert sorted(incremental.mate) == odd
+    assert all(incremental.mate[incremental.mate[v]] == v != incremental.mate[v] for v in odd)
+    # The tour visits every vertex once and its cost is up to date.
+    tour = incremental.tour()
+    assert tour[0] == tour[-1]
+    assert sorted(tour[:-1]) == vertices
+    cost = sum(math.dist(incremental.points[v], incremental.points[w])
+               for v, w in zip(tour[:-1], tour[1:]))
+    assert np.isclose(incremental.cost, cost)
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = rng.random((400, 2))
+    grid = PointGrid(0.05)
+    for v, (x, y) in enumerate(points.tolist()):
+        grid.add(v, (x, y))
+    for v in range(0, 400, 3):
+        grid.remove(v, tuple(points[v].tolist()))
+    remaining = np.arange(1, 400)[np.arange(1, 400) % 3 != 0]
+    for query in [(0.5, 0.5), (0.01, 0.99), (30.0, 30.0), (-5.0, 0.5)]:
+        distances = np.hypot(*(points[remaining] - query).T)
+        expected = remaining[np.argsort(distances)[:6]].tolist()
+        assert [w for _, w in grid.nearest(query, 6, points)] == expected
+        found = grid.nearest_in_sectors(query, 8, points)
+        sectors = (np.arctan2(*(points[remaining] - query).T[::-1]) % (2*math.pi))//(math.pi/4)
+        for sector in range(8):
+            in_sector = remaining[sectors == sector]
+            if len(in_sector) > 0:
+                nearest = in_sector[np.argmin(np.hypot(*(points[in_sector] - query).T))]
+                assert int(nearest) in [w for _, w in found]
+        assert len(found) == len(set(sectors.tolist()))
+
+
+def test_insertions_keep_the_euclidean_mst():
+    rng = np.random.default_rng(1)
+    incremental = IncrementalChristofides(rng.random((200, 2)).tolist())
+    assert np.isclose(tree_cost(incremental), euclidean_mst_cost(incremental))
+    # Points outside the current ones, whose MST neighbours are not always
+    # among their nearest neighbours.
+    for _ in range(150):
+        incremental.insert(tuple(rng.normal(2, 0.4, 2)))
+    incremental.insert((30.0, 30.0))
+    assert_invariants(incremental)
+    assert np.isclose(tree_cost(incremental), euclidean_mst_cost(incremental))
+
+
+def test_deletions_and_moves_keep_the_invariants():
+    rng = np.random.default_rng(2)
+    incremental = IncrementalChristofides(rng.random((200, 2)).tolist())
+    for step in range(200):
+        vertices = incremental.vertices()
+        vertice = vertices[rng.integers(len(vertices))]
+        if step % 2 == 0:
+            incremental.delete(vertice)
+            incremental.insert(tuple(rng.random(2)))
+        else:
+            incremental.move(vertice, tuple(rng.normal(0.5, 0.5, 2)))
+        if step % 20 == 19:
+            assert_invariants(incremental)
+            emst = euclidean_mst_cost(incremental)
+            assert emst - 1e-9 <= tree_cost(incremental) <= 1.01*emst
+
+
+def test_rebuilt_tour_visits_every_vertex():
+    rng = np.random.default_rng(3)
+    incremental = IncrementalChristofides(rng.random((50, 2)).tolist())
+    for _ in range(20):
+        incremental.insert(tuple(rng.random(2)))
+        incremental.delete(incremental.vertices()[0])
+    tour = incremental.christofides_tour()
+    assert sorted(tour[:-1]) == incremental.vertices()
+    assert_invariants(incremental)
@@ -0,0 +1,18 @@
+import numpy as np
+
+from instrumentation import Instrumentation
+
+
+def test_nested_stages_keep_the_peak_of_the_outer_stage():
+    instrumentation = Instrumentation(trace_memory=True)
+    instrumentation.start()
+    with instrumentation.stage("outer"):
+        large = np.ones(2**20)
+        del large
+        with instrumentation.stage("inner"):
+            small = np.ones(2**16)
+            del small
+    report = instrumentation.stop()
+    assert report["outer"].peak_memory >= 8*2**20
+    assert 8*2**16 <= report["inner"].peak_memory < 8*2**20
+
@@ -0,0 +1,36 @@
+import numpy as np
+
+from graph import EuclideanCompleteWeightedGraph
+from local_search import TourImprovement
+from solver import ChristofidesSolver
+
+
+def duplicated_points() -> np.ndarray:
+    points = np.random.default_rng(0).random((200, 2))
+    points[100:] = points[:100]
+    return points
+
+
+def tour_cost(points: np.ndarray, tour) -> float:
+    delta = points[tour[:-1]] - points[tour[1:]]
+    return float(np.hypot(delta[:, 0], delta[:, 1]).sum())
+
+
+def test_two_opt_terminates_with_duplicate_points():
+    points = duplicated_points()
+    for improvement in ["2-opt", "2-opt+or-opt"]:
+        result = ChristofidesSolver(improvement=improvement).solve(points)
+        assert sorted(result.tour[:-1]) == list(range(len(points)))
+        assert result.tour[0] == result.tour[-1]
+
+
+def test_candidates_that_are_the_vertex_itself_are_skipped():
+    points = duplicated_points()
+    graph = EuclideanCompleteWeightedGraph(points)
+    improvement = TourImprovement(graph)
+    improvement.neighbours = [[v] + neighbours for v, neighbours in
+                              enumerate(improvement.neighbours)]
+    tour = list(range(len(points))) + [0]
+    improved = improvement.improve(tour)
+    assert sorted(improved[:-1]) == list(range(len(points)))
+    assert tour_cost(points, improved) < tour_cost(points, tour)
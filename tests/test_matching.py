@@ -0,0 +1,109 @@
+import numpy as np
+
+from graph import CompleteWeightedGraph, EuclideanCompleteWeightedGraph, sparse_graph_from_edges
+from matching import kdtree_neighbours
+from mwpm import MinimumWeightPerfectMatching
+
+
+def brute_force(costs: np.ndarray, vertices: tuple = None) -> float:
+    if vertices is None:
+        vertices = tuple(range(len(costs)))
+    if not vertices:
+        return 0.0
+    first, rest = vertices[0], vertices[1:]
+    return min(costs[first, w] + brute_force(costs, rest[:i] + rest[i + 1:])
+               for i, w in enumerate(rest))
+
+
+def matching_cost(costs: np.ndarray, matching) -> float:
+    return sum(costs[v, w] for v, w in matching)
+
+
+def assert_perfect(matching, number_of_vertices: int):
+    vertices = [v for edge in matching for v in edge]
+    assert len(matching) == number_of_vertices//2
+    assert sorted(vertices) == list(range(number_of_vertices))
+
+
+def test_blossom_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for number_of_vertices in [2, 4, 6, 8, 10]:
+        for _ in range(5):
+            points = rng.random((number_of_vertices, 2))
+            graph = EuclideanCompleteWeightedGraph(points)
+            costs = graph.cost_matrix()
+            matching = MinimumWeightPerfectMatching(
+                graph, "blossom").minimum_weight_perfect_matching()
+            assert_perfect(matching, number_of_vertices)
+            assert np.isclose(matching_cost(costs, matching), brute_force(costs))
+            weights = rng.integers(1, 50, (number_of_vertices, number_of_vertices))
+            weights = (weights + weights.T).astype(np.float64)
+            np.fill_diagonal(weights, 0.0)
+            matching = MinimumWeightPerfectMatching(
+                CompleteWeightedGraph(weights), "blossom").minimum_weight_perfect_matching()
+            assert np.isclose(matching_cost(weights, matching), brute_force(weights))
+
+
+def test_sparse_blossom_matches_brute_force():
+    rng = np.random.default_rng(1)
+    for _ in range(5):
+        # A ring keeps a perfect matching; the chords are the other edges.
+        v_array = np.concatenate([np.arange(8), rng.integers(0, 8, 6)])
+        w_array = np.concatenate([(np.arange(8) + 1) % 8, rng.integers(0, 8, 6)])
+        costs = rng.integers(1, 50, len(v_array)).astype(np.float64)
+        graph = sparse_graph_from_edges(8, v_array, w_array, costs)
+        weights = np.full((8, 8), np.inf)
+        for v, w, cost in zip(v_array, w_array, costs):
+            if v != w:
+                weights[v, w] = weights[w, v] = min(weights[v, w], cost)
+        matching = MinimumWeightPerfectMatching(graph).minimum_weight_perfect_matching()
+        assert_perfect(matching, 8)
+        assert np.isclose(matching_cost(weights, matching), brute_force(weights))
+
+
+def test_approximations_are_perfect_and_bounded():
+    rng = np.random.default_rng(2)
+    for number_of_vertices in [2, 4, 10, 40, 120]:
+        points = rng.random((number_of_vertices, 2))
+        graph = EuclideanCompleteWeightedGraph(points)
+        costs = graph.cost_matrix()
+        exact = matching_cost(costs, MinimumWeightPerfectMatching(
+            graph, "blossom").minimum_weight_perfect_matching())
+        for method in MinimumWeightPerfectMatching.methods:
+            matching = MinimumWeightPerfectMatching(graph, method).minimum_weight_perfect_matching()
+            assert_perfect(matching, number_of_vertices)
+            assert matching_cost(costs, matching) >= exact - 1e-9
+            assert matching_cost(costs, matching) <= 2*exact + 1e-9
+
+
+def test_two_opt_never_worsens_greedy():
+    rng = np.random.default_rng(3)
+    for _ in range(5):
+        graph = EuclideanCompleteWeightedGraph(rng.random((60, 2)))
+        costs = graph.cost_matrix()
+        for greedy in ["greedy", "kdtree_greedy"]:
+            before = MinimumWeightPerfectMatching(graph, greedy).minimum_weight_perfect_matching()
+            after = MinimumWeightPerfectMatching(
+                graph, greedy + "_2opt").minimum_weight_perfect_matching()
+            assert matching_cost(costs, after) <= matching_cost(costs, before) + 1e-9
+
+
+def test_auto_is_exact_on_small_graphs_and_scales_on_large_ones():
+    rng = np.random.default_rng(4)
+    graph = EuclideanCompleteWeightedGraph(rng.random((20, 2)))
+    assert MinimumWeightPerfectMatching(graph).minimum_weight_perfect_matching() == \
+        MinimumWeightPerfectMatching(graph, "blossom").minimum_weight_perfect_matching()
+    number_of_vertices = 4*MinimumWeightPerfectMatching.blossom_max_vertices
+    graph = EuclideanCompleteWeightedGraph(rng.random((number_of_vertices, 2)))
+    assert MinimumWeightPerfectMatching(graph).minimum_weight_perfect_matching() == \
+        MinimumWeightPerfectMatching(graph, "kdtree_greedy_2opt").minimum_weight_perfect_matching()
+    dense = CompleteWeightedGraph(graph.cost_matrix())
+    assert MinimumWeightPerfectMatching(dense).minimum_weight_perfect_matching() == \
+        MinimumWeightPerfectMatching(dense, "greedy_2opt").minimum_weight_perfect_matching()
+
+
+def test_kdtree_neighbours_exclude_duplicates_of_self():
+    points = np.repeat(np.random.default_rng(5).random((10, 2)), 3, axis=0)
+    neighbours = kdtree_neighbours(points, 4)
+    for v in range(len(points)):
+        assert v not in neighbours[v]
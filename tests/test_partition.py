@@ -0,0 +1,37 @@
+import numpy as np
+
+from instances import clustered_points, uniform_points
+from partition import PartitionedChristofides, two_opt_path
+
+
+def path_length(points: np.ndarray) -> float:
+    delta = points[1:] - points[:-1]
+    return float(np.hypot(delta[:, 0], delta[:, 1]).sum())
+
+
+def test_tours_are_permutations_of_the_points():
+    for method in PartitionedChristofides.methods:
+        for points in [uniform_points(2000, 0), clustered_points(2000, 1)]:
+            result = PartitionedChristofides(cell_size=200, method=method, processes=1,
+                                             repair_window=20).solve(points)
+            assert len(result.cells) > 1
+            assert sorted(result.tour[:-1]) == list(range(len(points)))
+            assert result.tour[0] == result.tour[-1]
+            assert np.isclose(result.cost, path_length(points[result.tour]))
+            cell_vertices = np.sort(np.concatenate(result.cells))
+            assert np.array_equal(cell_vertices, np.arange(len(points)))
+
+
+def test_repair_never_lengthens_the_tour():
+    points = uniform_points(2000, 2)
+    repaired = PartitionedChristofides(cell_size=200, processes=1).solve(points)
+    stitched = PartitionedChristofides(cell_size=200, processes=1, repair=False).solve(points)
+    assert repaired.cost <= stitched.cost + 1e-9
+
+
+def test_two_opt_path_keeps_the_ends():
+    points = uniform_points(60, 3)
+    order = two_opt_path(points)
+    assert sorted(order.tolist()) == list(range(60))
+    assert order[0] == 0 and order[-1] == 59
+    assert path_length(points[order]) <= path_length(points) + 1e-12
@@ -0,0 +1,53 @@
+import numpy as np
+
+from graph import sparse_graph_from_edges
+from held_karp import HeldKarp
+from solver import ChristofidesSolver
+
+
+def ring_with_chords(number_of_vertices: int, number_of_chords: int, seed: int = 0):
+    generator = np.random.default_rng(seed)
+    v_array = np.concatenate([np.arange(number_of_vertices),
+                              generator.integers(number_of_vertices, size=number_of_chords)])
+    w_array = np.concatenate([(np.arange(number_of_vertices) + 1) % number_of_vertices,
+                              generator.integers(number_of_vertices, size=number_of_chords)])
+    costs = generator.integers(1, 20, size=len(v_array)).astype(np.float64)
+    return v_array, w_array, costs
+
+
+def floyd_warshall(number_of_vertices: int, v_array, w_array, costs) -> np.ndarray:
+    distances = np.full((number_of_vertices, number_of_vertices), np.inf)
+    np.fill_diagonal(distances, 0.0)
+    for v, w, cost in zip(v_array.tolist(), w_array.tolist(), costs.tolist()):
+        if v != w:
+            distances[v, w] = distances[w, v] = min(distances[v, w], cost)
+    for k in range(number_of_vertices):
+        distances = np.minimum(distances, distances[:, k, None] + distances[None, k, :])
+    return distances
+
+
+def test_parallel_edges_and_self_loops():
+    graph = sparse_graph_from_edges(3, np.array([0, 1, 0, 2]), np.array([1, 0, 0, 1]),
+                                    np.array([5.0, 3.0, 1.0, 2.0]))
+    assert graph.edges() == [(0, 1), (1, 0), (1, 2), (2, 1)]
+    assert graph.cost([(0, 1)]) == 3.0
+
+
+def test_metric_closure_is_the_shortest_paths():
+    v_array, w_array, costs = ring_with_chords(40, 30)
+    graph = sparse_graph_from_edges(40, v_array, w_array, costs)
+    expected = floyd_warshall(40, v_array, w_array, costs)
+    vertices = [3, 7, 11, 20, 39]
+    closure = graph.metric_closure(vertices)
+    assert np.allclose(closure.cost_matrix(), expected[np.ix_(vertices, vertices)])
+    assert np.allclose(graph.path_costs(np.array([0, 5]), np.array([20, 6])),
+                       expected[[0, 5], [20, 6]])
+
+
+def test_solve_within_christofides_bound():
+    v_array, w_array, costs = ring_with_chords(10, 8, seed=1)
+    graph = sparse_graph_from_edges(10, v_array, w_array, costs)
+    result = ChristofidesSolver(lower_bound=None).solve(graph)
+    assert sorted(result.tour[:-1]) == list(range(10))
+    _, optimum = HeldKarp(graph.metric_closure(list(range(10)))).solve()
+    assert optimum - 1e-9 <= result.cost <= 1.5*optimum + 1e-9
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from held_karp import HeldKarp
+from tsplib import TsplibInstance, edge_weight_formats, read_tour, read_tsplib, \
+    write_tour, write_tsplib
+
+burma14 = """NAME: burma14
+TYPE: TSP
+DIMENSION: 14
+EDGE_WEIGHT_TYPE: GEO
+NODE_COORD_SECTION
+1 16.47 96.10
+2 16.47 94.44
+3 20.09 92.54
+4 22.39 93.37
+5 25.23 97.24
+6 22.00 96.05
+7 20.47 97.02
+8 17.20 96.29
+9 16.30 97.38
+10 14.05 98.12
+11 16.53 97.38
+12 21.52 95.59
+13 19.41 97.13
+14 20.09 94.55
+EOF
+"""
+
+
+def test_coordinates_round_trip(tmp_path):
+    points = np.random.default_rng(0).random((50, 2))*1000
+    for edge_weight_type in ["EUC_2D", "CEIL_2D", "GEO"]:
+        path = str(tmp_path / "instance.tsp")
+        write_tsplib(path, TsplibInstance("instance", edge_weight_type, points=points))
+        instance = read_tsplib(path)
+        assert instance.edge_weight_type == edge_weight_type
+        assert np.array_equal(instance.points, points)
+
+
+def test_explicit_formats_round_trip(tmp_path):
+    weights = np.random.default_rng(0).integers(1, 100, (12, 12)).astype(np.float64)
+    weights = weights + weights.T
+    np.fill_diagonal(weights, 0.0)
+    for weight_format in edge_weight_formats:
+        path = str(tmp_path / "instance.tsp")
+        write_tsplib(path, TsplibInstance("instance", "EXPLICIT", weights=weights), weight_format)
+        assert np.array_equal(read_tsplib(path).weights, weights)
+
+
+def test_tour_round_trip(tmp_path):
+    tour = [3, 0, 4, 1, 2, 3]
+    path = str(tmp_path / "instance.tour")
+    write_tour(path, tour)
+    assert read_tour(path) == tour
+
+
+def test_geo_distances_give_the_published_optimum(tmp_path):
+    path = tmp_path / "burma14.tsp"
+    path.write_text(burma14)
+    _, cost = HeldKarp(read_tsplib(str(path)).graph()).solve()
+    assert cost == 3323
+
+
+def test_empty_type_is_rejected(tmp_path, capsys):
+    path = tmp_path / "empty.tsp"
+    path.write_text(burma14.replace("TYPE: TSP", "TYPE:"))
+    with pytest.raises(Exception):
+        read_tsplib(str(path))
+    assert "ERROR: The TYPE of the instance is empty." in capsys.readouterr().out